@@ -52,10 +52,17 @@ pulumi.log.info("✓ Storage configured")
 # =============================================================================
 # 4. LOAD BALANCING
 # =============================================================================
-from loadbalancing import alb, alb_dns_name, target_groups
+from loadbalancing import alb, alb_dns_name, target_groups, alb_resource_labels
 
 pulumi.log.info("✓ Load balancing configured")
 
+# =============================================================================
+# 4.5. CDN (CloudFront)
+# =============================================================================
+from cdn import distributions
+
+pulumi.log.info("✓ CDN configured")
+
 # =============================================================================
 # 5. COMPUTE (ECS)
 # =============================================================================
@@ -71,30 +78,35 @@ goeventcity_service = create_web_service(
     name="goeventcity",
     domain_config=domains["goeventcity"],
     target_group_arn=target_groups["goeventcity"].arn,
+    alb_resource_label=alb_resource_labels["goeventcity"],
 )
 
 daynews_service = create_web_service(
     name="daynews",
     domain_config=domains["daynews"],
     target_group_arn=target_groups["daynews"].arn,
+    alb_resource_label=alb_resource_labels["daynews"],
 )
 
 downtownguide_service = create_web_service(
     name="downtownguide",
     domain_config=domains["downtownguide"],
     target_group_arn=target_groups["downtownguide"].arn,
+    alb_resource_label=alb_resource_labels["downtownguide"],
 )
 
 golocalvoices_service = create_web_service(
     name="golocalvoices",
     domain_config=domains["golocalvoices"],
     target_group_arn=target_groups["golocalvoices"].arn,
+    alb_resource_label=alb_resource_labels["golocalvoices"],
 )
 
 alphasite_service = create_web_service(
     name="alphasite",
     domain_config=domains["alphasite"],
     target_group_arn=target_groups["alphasite"].arn,
+    alb_resource_label=alb_resource_labels["alphasite"],
 )
 
 pulumi.log.info("✓ Compute configured")
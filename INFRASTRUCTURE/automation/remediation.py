@@ -1,7 +1,23 @@
 """
 Auto-remediation Lambda function for ECS auto-scaling.
+
+The handler is the scaling controller in scaling_controller/ (exercised
+locally by tests/test_scaling_controller.py). It reacts to alarms
+on ECS services, scales them proportionally to the breach, and lifts the
+Application Auto Scaling max up to max_auto_scale_ceiling when the regular
+policies are already pinned at max_capacity.
+
+A schedule invokes the controller every cooldown_minutes to put raised
+maxima back once a service has gone a full cooldown without scaling.
+
+Alarms opt in by name: only this stack's alarms ending in
+automation["alarm_suffix"] reach the controller, so alarms that already
+drive scaling policies or only notify are left alone. The opted-in alarms
+are the saturation alarms compute/autoscaling.py creates per scaled service.
 """
 
+import json
+import os
 import pulumi
 import pulumi_aws as aws
 from config import project_name, env, common_tags, automation
@@ -50,84 +66,78 @@ if automation["enabled"]:
         }),
     )
 
-    # Lambda function code
-    lambda_code = """
-import json
-import boto3
-
-ecs = boto3.client('ecs')
-
-def lambda_handler(event, context):
-    # Parse CloudWatch alarm
-    alarm = json.loads(event['Records'][0]['Sns']['Message'])
-    
-    # Extract service name from alarm
-    # This is a simplified version - adjust based on your alarm structure
-    cluster_name = alarm.get('Trigger', {}).get('Dimensions', [{}])[0].get('value', '')
-    service_name = alarm.get('Trigger', {}).get('Dimensions', [{}])[1].get('value', '')
-    
-    if not cluster_name or not service_name:
-        return {'statusCode': 400, 'body': 'Missing cluster or service name'}
-    
-    # Get current service configuration
-    response = ecs.describe_services(
-        cluster=cluster_name,
-        services=[service_name]
+    # DynamoDB table holding per-service cooldown state
+    controller_state_table = aws.dynamodb.Table(
+        f"{project_name}-{env}-scaling-controller-state",
+        name=f"{project_name}-{env}-scaling-controller-state",
+        billing_mode="PAY_PER_REQUEST",
+        hash_key="service_key",
+        attributes=[
+            aws.dynamodb.TableAttributeArgs(
+                name="service_key",
+                type="S",
+            ),
+        ],
+        tags=common_tags,
     )
-    
-    if not response['services']:
-        return {'statusCode': 404, 'body': 'Service not found'}
-    
-    current_desired = response['services'][0]['desiredCount']
-    max_capacity = """ + str(automation["max_auto_scale_ceiling"]) + """
-    scale_up_percent = """ + str(automation["scale_up_percentage"]) + """ / 100
-    
-    # Calculate new desired count
-    new_desired = min(
-        int(current_desired * (1 + scale_up_percent)),
-        max_capacity
+
+    # Lambda policy for cooldown state and autoscaling limits
+    aws.iam.RolePolicy(
+        f"{project_name}-{env}-lambda-controller-policy",
+        role=lambda_role.id,
+        policy=pulumi.Output.all(table_arn=controller_state_table.arn).apply(lambda args: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["dynamodb:GetItem", "dynamodb:UpdateItem", "dynamodb:Scan"],
+                    "Resource": args["table_arn"],
+                },
+                {
+                    "Effect": "Allow",
+                    "Action": [
+                        "application-autoscaling:DescribeScalableTargets",
+                        "application-autoscaling:RegisterScalableTarget",
+                    ],
+                    "Resource": "*",
+                },
+            ],
+        })),
     )
-    
-    if new_desired > current_desired:
-        # Update service
-        ecs.update_service(
-            cluster=cluster_name,
-            service=service_name,
-            desiredCount=new_desired
-        )
-        
-        return {
-            'statusCode': 200,
-            'body': f'Scaled {service_name} from {current_desired} to {new_desired}'
-        }
-    
-    return {'statusCode': 200, 'body': 'No scaling needed'}
-"""
 
-    # Lambda function
+    # Lambda function (source in automation/scaling_controller/)
     auto_remediation_lambda = aws.lambda_.Function(
         f"{project_name}-{env}-remediation-lambda",
         name=f"{project_name}-{env}-remediation",
         runtime="python3.11",
         role=lambda_role.arn,
         handler="index.lambda_handler",
-        code=pulumi.AssetArchive({
-            "index.py": pulumi.StringAsset(lambda_code),
-        }),
+        code=pulumi.FileArchive(os.path.join(os.path.dirname(__file__), "scaling_controller")),
         timeout=60,
         memory_size=128,
+        environment=aws.lambda_.FunctionEnvironmentArgs(
+            variables={
+                "STATE_TABLE": controller_state_table.name,
+                "CLUSTER_NAME": cluster.name,
+                "MAX_AUTO_SCALE_CEILING": str(automation["max_auto_scale_ceiling"]),
+                "COOLDOWN_MINUTES": str(automation["cooldown_minutes"]),
+                "SCALE_UP_PERCENTAGE": str(automation["scale_up_percentage"]),
+                "ALARM_SUFFIX": automation["alarm_suffix"],
+            },
+        ),
         tags=common_tags,
     )
 
-    # EventBridge Rule for capacity warnings
+    # EventBridge Rule for capacity warnings: this stack's remediation alarms entering ALARM
     capacity_warning_rule = aws.cloudwatch.EventRule(
         f"{project_name}-{env}-capacity-warning-rule",
         name=f"{project_name}-{env}-capacity-warning",
-        event_pattern=pulumi.Output.from_input({
-            "source": ["aws.ecs"],
-            "detail-type": ["ECS Service Action"],
+        event_pattern=json.dumps({
+            "source": ["aws.cloudwatch"],
+            "detail-type": ["CloudWatch Alarm State Change"],
             "detail": {
-                "eventName": ["SERVICE_STEADY_STATE"],
+                "alarmName": [{"wildcard": f"{project_name}-{env}-*{automation['alarm_suffix']}"}],
+                "state": {"value": ["ALARM"]},
             },
         }),
         tags=common_tags,
@@ -145,12 +155,36 @@ def lambda_handler(event, context):
         f"{project_name}-{env}-lambda-eventbridge-permission",
         statement_id="AllowExecutionFromEventBridge",
         action="lambda:InvokeFunction",
-        function_name=auto_remediation_lambda.name,
+        function=auto_remediation_lambda.name,
         principal="events.amazonaws.com",
         source_arn=capacity_warning_rule.arn,
     )
 
+    # Scheduled restore of raised Application Auto Scaling maxima
+    max_capacity_restore_rule = aws.cloudwatch.EventRule(
+        f"{project_name}-{env}-max-capacity-restore-rule",
+        name=f"{project_name}-{env}-max-capacity-restore",
+        schedule_expression=f"rate({automation['cooldown_minutes']} minutes)",
+        tags=common_tags,
+    )
+
+    aws.cloudwatch.EventTarget(
+        f"{project_name}-{env}-max-capacity-restore-target",
+        rule=max_capacity_restore_rule.name,
+        arn=auto_remediation_lambda.arn,
+    )
+
+    aws.lambda_.Permission(
+        f"{project_name}-{env}-lambda-restore-schedule-permission",
+        statement_id="AllowExecutionFromRestoreSchedule",
+        action="lambda:InvokeFunction",
+        function=auto_remediation_lambda.name,
+        principal="events.amazonaws.com",
+        source_arn=max_capacity_restore_rule.arn,
+    )
+
 else:
     auto_remediation_lambda = None
     capacity_warning_rule = None
+    max_capacity_restore_rule = None
 
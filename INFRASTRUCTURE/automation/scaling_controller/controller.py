@@ -0,0 +1,231 @@
+"""
+Rate-aware ECS scaling controller.
+
+Turns alarm notifications into bounded desiredCount changes:
+
+- Accepts CloudWatch alarms delivered through SNS and EventBridge
+  "CloudWatch Alarm State Change" events; other payloads, and alarms whose
+  name lacks alarm_suffix, are ignored.
+- Resolves every (cluster, service) named by the alarm's dimensions and
+  describes them with one describe_services call per cluster.
+- Scales proportionally to how far the metric breached its threshold,
+  capped per action by max_step_percentage and overall by ceiling.
+- Enforces a per-service cooldown through a persisted state store so
+  concurrent or repeated invocations can't stack scale-outs.
+- Lifting the Application Auto Scaling MaxCapacity is temporary: the
+  original is kept in the state store and put back by the scheduled
+  invocation once the service has gone a full cooldown without scaling.
+
+Clients are injected so the controller runs unchanged against boto3 or the
+stubs in tests/test_scaling_controller.py.
+"""
+
+import json
+import math
+import re
+import time
+from collections import namedtuple
+
+# A breached metric for one ECS service
+Signal = namedtuple("Signal", ["cluster", "service", "value", "threshold", "alarm"])
+
+DESCRIBE_SERVICES_LIMIT = 10
+_DATAPOINT_RE = re.compile(r"([-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?) \(")
+
+
+def _signals_from_dimensions(dimensions, value, threshold, alarm, default_cluster):
+    service = dimensions.get("ServiceName")
+    cluster = dimensions.get("ClusterName") or default_cluster
+    if not service or not cluster or value is None or threshold is None:
+        return []
+    return [Signal(cluster, service, float(value), float(threshold), alarm)]
+
+
+def _parse_sns_alarm(message, default_cluster):
+    """Parse the JSON message CloudWatch publishes to SNS."""
+    if message.get("NewStateValue") != "ALARM":
+        return []
+    trigger = message.get("Trigger", {})
+    dimensions = {d.get("name"): d.get("value") for d in trigger.get("Dimensions", [])}
+    datapoints = [float(v) for v in _DATAPOINT_RE.findall(message.get("NewStateReason", ""))]
+    value = max(datapoints) if datapoints else None
+    return _signals_from_dimensions(
+        dimensions, value, trigger.get("Threshold"), message.get("AlarmName", ""), default_cluster,
+    )
+
+
+def _parse_eventbridge_alarm(detail, default_cluster):
+    """Parse an EventBridge "CloudWatch Alarm State Change" detail."""
+    state = detail.get("state", {})
+    if state.get("value") != "ALARM":
+        return []
+    try:
+        reason = json.loads(state.get("reasonData") or "{}")
+    except ValueError:
+        reason = {}
+    datapoints = reason.get("recentDatapoints") or []
+    value = max(datapoints) if datapoints else None
+    threshold = reason.get("threshold")
+
+    signals = []
+    for metric in detail.get("configuration", {}).get("metrics", []):
+        dimensions = metric.get("metricStat", {}).get("metric", {}).get("dimensions", {})
+        signals.extend(_signals_from_dimensions(
+            dimensions, value, threshold, detail.get("alarmName", ""), default_cluster,
+        ))
+    return signals
+
+
+def parse_event(event, default_cluster="", alarm_suffix=""):
+    """
+    Extract scaling signals from a Lambda event.
+
+    Alarms whose name doesn't end with alarm_suffix are dropped.
+
+    Returns:
+        List of Signal; empty when the event carries nothing actionable.
+    """
+    signals = []
+    for record in event.get("Records", []):
+        sns = record.get("Sns")
+        if not sns:
+            continue
+        try:
+            message = json.loads(sns.get("Message", ""))
+        except ValueError:
+            continue
+        signals.extend(_parse_sns_alarm(message, default_cluster))
+
+    if event.get("detail-type") == "CloudWatch Alarm State Change":
+        signals.extend(_parse_eventbridge_alarm(event.get("detail", {}), default_cluster))
+
+    # One signal per service; keep the worst breach
+    worst = {}
+    for signal in signals:
+        if not signal.alarm.endswith(alarm_suffix):
+            continue
+        key = (signal.cluster, signal.service)
+        ratio = signal.value / signal.threshold if signal.threshold else 0
+        if key not in worst or ratio > worst[key][0]:
+            worst[key] = (ratio, signal)
+    return [signal for _, signal in worst.values()]
+
+
+def proportional_desired(current, value, threshold, ceiling, max_step_percentage):
+    """
+    Desired count for a breach of value over threshold.
+
+    Scales current capacity by value/threshold, adds at most
+    max_step_percentage of current (minimum one task) per action, and never
+    exceeds ceiling. Returns current when there is no breach.
+    """
+    if threshold <= 0 or value <= threshold or current >= ceiling:
+        return current
+    base = max(current, 1)
+    wanted = math.ceil(base * value / threshold)
+    max_step = max(1, math.ceil(base * max_step_percentage / 100))
+    return min(max(wanted, current + 1), current + max_step, ceiling)
+
+
+class ScalingController:
+    """Apply scaling signals to ECS services within cooldown and ceiling limits."""
+
+    def __init__(self, ecs, state, ceiling, cooldown_minutes, max_step_percentage,
+                 autoscaling=None, default_cluster="", alarm_suffix="", clock=time.time):
+        self.ecs = ecs
+        self.state = state
+        self.autoscaling = autoscaling
+        self.ceiling = ceiling
+        self.cooldown_seconds = cooldown_minutes * 60
+        self.max_step_percentage = max_step_percentage
+        self.default_cluster = default_cluster
+        self.alarm_suffix = alarm_suffix
+        self.clock = clock
+
+    def handle(self, event):
+        if event.get("detail-type") == "Scheduled Event":
+            actions = self.restore_expired()
+            return {"statusCode": 200, "body": f"Restored {len(actions)} max capacity", "actions": actions}
+
+        signals = parse_event(event, self.default_cluster, self.alarm_suffix)
+        if not signals:
+            return {"statusCode": 200, "body": "No actionable alarm in event", "actions": []}
+
+        services = self._describe(signals)
+        actions = [self._apply(signal, services.get((signal.cluster, signal.service))) for signal in signals]
+        return {"statusCode": 200, "body": f"Processed {len(actions)} service(s)", "actions": actions}
+
+    def _describe(self, signals):
+        """describe_services batched per cluster (API limit of 10 services per call)."""
+        by_cluster = {}
+        for signal in signals:
+            by_cluster.setdefault(signal.cluster, []).append(signal.service)
+
+        found = {}
+        for cluster, names in by_cluster.items():
+            for start in range(0, len(names), DESCRIBE_SERVICES_LIMIT):
+                response = self.ecs.describe_services(
+                    cluster=cluster, services=names[start:start + DESCRIBE_SERVICES_LIMIT],
+                )
+                for service in response.get("services", []):
+                    found[(cluster, service["serviceName"])] = service
+        return found
+
+    def _apply(self, signal, service):
+        action = {"service": signal.service, "cluster": signal.cluster, "alarm": signal.alarm}
+        if service is None:
+            return {**action, "result": "not_found"}
+
+        current = service["desiredCount"]
+        if service.get("pendingCount", 0) > 0:
+            # Previous scale-out is still starting tasks; let it land first
+            return {**action, "result": "pending", "desired": current}
+
+        desired = proportional_desired(
+            current, signal.value, signal.threshold, self.ceiling, self.max_step_percentage,
+        )
+        if desired <= current:
+            return {**action, "result": "at_limit" if current >= self.ceiling else "no_breach", "desired": current}
+
+        key = f"{signal.cluster}/{signal.service}"
+        now = self.clock()
+        if not self.state.try_acquire(key, now, self.cooldown_seconds, desired):
+            return {**action, "result": "cooldown", "desired": current}
+
+        self._raise_autoscaling_max(key, signal.cluster, signal.service, desired)
+        self.ecs.update_service(cluster=signal.cluster, service=signal.service, desiredCount=desired)
+        return {**action, "result": "scaled", "from": current, "desired": desired}
+
+    def _raise_autoscaling_max(self, key, cluster, service, desired):
+        """Lift the Application Auto Scaling max so it doesn't pull desired back down."""
+        if self.autoscaling is None:
+            return
+        resource_id = f"service/{cluster}/{service}"
+        response = self.autoscaling.describe_scalable_targets(
+            ServiceNamespace="ecs", ResourceIds=[resource_id],
+            ScalableDimension="ecs:service:DesiredCount",
+        )
+        for target in response.get("ScalableTargets", []):
+            if target["MaxCapacity"] < desired:
+                # Record before raising, so a failed invocation can't lose the original
+                self.state.record_raise(key, target["MaxCapacity"])
+                self.autoscaling.register_scalable_target(
+                    ServiceNamespace="ecs", ResourceId=resource_id,
+                    ScalableDimension="ecs:service:DesiredCount", MaxCapacity=desired,
+                )
+
+    def restore_expired(self):
+        """Put back the MaxCapacity of services that went a full cooldown without scaling."""
+        if self.autoscaling is None:
+            return []
+        actions = []
+        for key, original_max in self.state.expired_raises(self.clock(), self.cooldown_seconds):
+            cluster, service = key.split("/", 1)
+            # Auto Scaling scales desired in to the restored max on its own
+            self.autoscaling.register_scalable_target(
+                ServiceNamespace="ecs", ResourceId=f"service/{cluster}/{service}",
+                ScalableDimension="ecs:service:DesiredCount", MaxCapacity=original_max,
+            )
+            self.state.clear_raise(key)
+            actions.append({"service": service, "cluster": cluster, "result": "restored", "max": original_max})
+        return actions
@@ -0,0 +1,36 @@
+"""
+Lambda entry point for the scaling controller.
+"""
+
+import json
+import os
+
+import boto3
+
+from controller import ScalingController
+from state import DynamoDbStateStore
+
+_controller = None
+
+
+def build_controller():
+    return ScalingController(
+        ecs=boto3.client("ecs"),
+        state=DynamoDbStateStore(boto3.client("dynamodb"), os.environ["STATE_TABLE"]),
+        autoscaling=boto3.client("application-autoscaling"),
+        ceiling=int(os.environ.get("MAX_AUTO_SCALE_CEILING", "50")),
+        cooldown_minutes=int(os.environ.get("COOLDOWN_MINUTES", "5")),
+        max_step_percentage=int(os.environ.get("SCALE_UP_PERCENTAGE", "50")),
+        default_cluster=os.environ.get("CLUSTER_NAME", ""),
+        alarm_suffix=os.environ.get("ALARM_SUFFIX", ""),
+    )
+
+
+def lambda_handler(event, context):
+    global _controller
+    if _controller is None:
+        # Reuse clients across warm invocations
+        _controller = build_controller()
+    result = _controller.handle(event)
+    print(json.dumps(result))
+    return result
@@ -0,0 +1,97 @@
+"""
+Cooldown state for the scaling controller.
+
+try_acquire() records a scaling action only if the service has not been
+scaled within the cooldown window, and reports whether it succeeded.
+
+record_raise() keeps the Application Auto Scaling MaxCapacity a service had
+before the controller first lifted it; expired_raises() lists services whose
+last scaling action is older than the cooldown so the original can be put
+back, after which clear_raise() forgets it.
+"""
+
+
+class DynamoDbStateStore:
+    """Cooldown state in a DynamoDB table keyed by "cluster/service"."""
+
+    def __init__(self, dynamodb, table_name):
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+
+    def try_acquire(self, key, now, cooldown_seconds, desired):
+        # Conditional write makes the cooldown check atomic across concurrent invocations;
+        # an update (not a put) keeps any recorded original_max on the item
+        try:
+            self.dynamodb.update_item(
+                TableName=self.table_name,
+                Key={"service_key": {"S": key}},
+                UpdateExpression="SET last_scaled_at = :now, last_desired = :desired",
+                ConditionExpression="attribute_not_exists(service_key) OR last_scaled_at < :cutoff",
+                ExpressionAttributeValues={
+                    ":now": {"N": str(int(now))},
+                    ":desired": {"N": str(desired)},
+                    ":cutoff": {"N": str(int(now - cooldown_seconds))},
+                },
+            )
+        except self.dynamodb.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    def record_raise(self, key, original_max):
+        # if_not_exists keeps the first original across repeated raises
+        self.dynamodb.update_item(
+            TableName=self.table_name,
+            Key={"service_key": {"S": key}},
+            UpdateExpression="SET original_max = if_not_exists(original_max, :max)",
+            ExpressionAttributeValues={":max": {"N": str(original_max)}},
+        )
+
+    def expired_raises(self, now, cooldown_seconds):
+        # One item per service, so a filtered scan stays small
+        raises = []
+        kwargs = {
+            "TableName": self.table_name,
+            "FilterExpression": "attribute_exists(original_max) AND last_scaled_at < :cutoff",
+            "ExpressionAttributeValues": {":cutoff": {"N": str(int(now - cooldown_seconds))}},
+        }
+        while True:
+            response = self.dynamodb.scan(**kwargs)
+            raises.extend(
+                (item["service_key"]["S"], int(item["original_max"]["N"])) for item in response.get("Items", [])
+            )
+            if "LastEvaluatedKey" not in response:
+                return raises
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def clear_raise(self, key):
+        self.dynamodb.update_item(
+            TableName=self.table_name,
+            Key={"service_key": {"S": key}},
+            UpdateExpression="REMOVE original_max",
+        )
+
+
+class InMemoryStateStore:
+    """Process-local state for tests."""
+
+    def __init__(self):
+        self.items = {}
+
+    def try_acquire(self, key, now, cooldown_seconds, desired):
+        item = self.items.setdefault(key, {})
+        if item.get("last_scaled_at", float("-inf")) >= now - cooldown_seconds:
+            return False
+        item.update(last_scaled_at=now, last_desired=desired)
+        return True
+
+    def record_raise(self, key, original_max):
+        self.items.setdefault(key, {}).setdefault("original_max", original_max)
+
+    def expired_raises(self, now, cooldown_seconds):
+        return [
+            (key, item["original_max"]) for key, item in self.items.items()
+            if "original_max" in item and item["last_scaled_at"] < now - cooldown_seconds
+        ]
+
+    def clear_raise(self, key):
+        self.items.get(key, {}).pop("original_max", None)
@@ -0,0 +1,10 @@
+"""
+CDN module for Fibonacco infrastructure.
+
+Exports:
+    distributions: CloudFront distributions by site name (empty when config.cdn is disabled)
+"""
+
+from .cloudfront import distributions
+
+__all__ = ["distributions"]
@@ -0,0 +1,219 @@
+"""
+CloudFront distributions in front of the ALB and S3.
+
+One distribution per site in config.domains that has an ACM certificate in
+config.cdn["certificate_arns"]. The site domain must be an alias: the ALB
+listener rules and Laravel both route on the Host header, which CloudFront
+would otherwise send as the dxxxx.cloudfront.net name.
+- config.cdn["s3_paths"] (hashed /build assets, media) come from app_bucket
+  through Origin Access Control with a long TTL.
+- Everything else goes to the ALB. The cache key includes the Host header
+  (the ALB routes sites by host), the Inertia request headers (an Inertia
+  visit gets JSON where a full load gets HTML) and the session cookie, so
+  anonymous pages can be cached when Laravel marks them public while
+  signed-in responses never leak between users.
+
+Both behaviors compress with Brotli and gzip, and all origins sit behind
+an Origin Shield in the ALB's region. Distributions are only created when the
+ALB has a listener forwarding the configured origin protocol.
+"""
+
+import json
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, cdn, domains
+from storage import app_bucket
+from loadbalancing import alb, alb_origin_protocols
+
+ALB_ORIGIN_ID = "alb"
+S3_ORIGIN_ID = "s3-app-storage"
+
+distributions = {}
+
+origin_protocol = "https" if cdn["origin_protocol_policy"] == "https-only" else "http"
+cdn_enabled = cdn["enabled"] and origin_protocol in alb_origin_protocols
+if cdn["enabled"] and not cdn_enabled:
+    pulumi.log.warn(
+        f"CDN skipped: the ALB has no listener forwarding {origin_protocol.upper()} "
+        f"to the target groups in {env}"
+    )
+
+if cdn_enabled:
+    # Dynamic pages: vary on Host, Inertia headers and session cookie; origin Cache-Control decides TTL
+    dynamic_cache_policy = aws.cloudfront.CachePolicy(
+        f"{project_name}-{env}-cdn-dynamic",
+        name=f"{project_name}-{env}-dynamic",
+        comment="Host-keyed cache for ALB-served pages",
+        default_ttl=cdn["default_ttl"],
+        max_ttl=cdn["max_ttl"],
+        min_ttl=cdn["min_ttl"],
+        parameters_in_cache_key_and_forwarded_to_origin=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginArgs(
+            enable_accept_encoding_brotli=True,
+            enable_accept_encoding_gzip=True,
+            headers_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginHeadersConfigArgs(
+                header_behavior="whitelist",
+                headers=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginHeadersConfigHeadersArgs(
+                    items=["Host"] + cdn["cache_key_headers"],
+                ),
+            ),
+            cookies_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginCookiesConfigArgs(
+                cookie_behavior="whitelist",
+                cookies=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginCookiesConfigCookiesArgs(
+                    items=cdn["cache_key_cookies"],
+                ),
+            ),
+            query_strings_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginQueryStringsConfigArgs(
+                query_string_behavior="all",
+            ),
+        ),
+    )
+
+    # Static assets: immutable hashed files, nothing varies the response
+    static_cache_policy = aws.cloudfront.CachePolicy(
+        f"{project_name}-{env}-cdn-static",
+        name=f"{project_name}-{env}-static",
+        comment="Long-lived cache for build assets and media",
+        default_ttl=cdn["static_ttl"],
+        max_ttl=cdn["static_ttl"],
+        min_ttl=0,
+        parameters_in_cache_key_and_forwarded_to_origin=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginArgs(
+            enable_accept_encoding_brotli=True,
+            enable_accept_encoding_gzip=True,
+            headers_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginHeadersConfigArgs(
+                header_behavior="none",
+            ),
+            cookies_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginCookiesConfigArgs(
+                cookie_behavior="none",
+            ),
+            query_strings_config=aws.cloudfront.CachePolicyParametersInCacheKeyAndForwardedToOriginQueryStringsConfigArgs(
+                query_string_behavior="none",
+            ),
+        ),
+    )
+
+    # Laravel still needs every cookie, header and query string on uncached requests
+    alb_origin_request_policy = aws.cloudfront.OriginRequestPolicy(
+        f"{project_name}-{env}-cdn-alb-origin-request",
+        name=f"{project_name}-{env}-alb-origin-request",
+        comment="Forward viewer headers, cookies and query strings to the ALB",
+        headers_config=aws.cloudfront.OriginRequestPolicyHeadersConfigArgs(
+            header_behavior="allViewer",
+        ),
+        cookies_config=aws.cloudfront.OriginRequestPolicyCookiesConfigArgs(
+            cookie_behavior="all",
+        ),
+        query_strings_config=aws.cloudfront.OriginRequestPolicyQueryStringsConfigArgs(
+            query_string_behavior="all",
+        ),
+    )
+
+    s3_origin_access_control = aws.cloudfront.OriginAccessControl(
+        f"{project_name}-{env}-cdn-oac",
+        name=f"{project_name}-{env}-app-storage",
+        description="CloudFront access to the app storage bucket",
+        origin_access_control_origin_type="s3",
+        signing_behavior="always",
+        signing_protocol="sigv4",
+    )
+
+    origin_shield = aws.cloudfront.DistributionOriginOriginShieldArgs(
+        enabled=True,
+        origin_shield_region=cdn["origin_shield_region"],
+    )
+
+    for service_name, domain_config in domains.items():
+        certificate_arn = cdn["certificate_arns"].get(service_name)
+        if not certificate_arn:
+            pulumi.log.warn(f"CDN skipped for {service_name}: no certificate in cdn_certificate_arns")
+            continue
+
+        distribution = aws.cloudfront.Distribution(
+            f"{project_name}-{env}-{service_name}-cdn",
+            enabled=True,
+            comment=f"{domain_config['domain']} ({env})",
+            aliases=[domain_config["domain"]],
+            price_class=cdn["price_class"],
+            http_version="http2and3",
+            is_ipv6_enabled=True,
+            origins=[
+                aws.cloudfront.DistributionOriginArgs(
+                    origin_id=ALB_ORIGIN_ID,
+                    domain_name=alb.dns_name,
+                    custom_origin_config=aws.cloudfront.DistributionOriginCustomOriginConfigArgs(
+                        http_port=80,
+                        https_port=443,
+                        origin_protocol_policy=cdn["origin_protocol_policy"],
+                        origin_ssl_protocols=["TLSv1.2"],
+                        origin_read_timeout=60,
+                        origin_keepalive_timeout=60,
+                    ),
+                    origin_shield=origin_shield,
+                ),
+                aws.cloudfront.DistributionOriginArgs(
+                    origin_id=S3_ORIGIN_ID,
+                    domain_name=app_bucket.bucket_regional_domain_name,
+                    origin_access_control_id=s3_origin_access_control.id,
+                    origin_shield=origin_shield,
+                ),
+            ],
+            default_cache_behavior=aws.cloudfront.DistributionDefaultCacheBehaviorArgs(
+                target_origin_id=ALB_ORIGIN_ID,
+                viewer_protocol_policy="redirect-to-https",
+                allowed_methods=["GET", "HEAD", "OPTIONS", "PUT", "POST", "PATCH", "DELETE"],
+                cached_methods=["GET", "HEAD"],
+                cache_policy_id=dynamic_cache_policy.id,
+                origin_request_policy_id=alb_origin_request_policy.id,
+                compress=True,
+            ),
+            ordered_cache_behaviors=[
+                aws.cloudfront.DistributionOrderedCacheBehaviorArgs(
+                    path_pattern=path,
+                    target_origin_id=S3_ORIGIN_ID,
+                    viewer_protocol_policy="redirect-to-https",
+                    allowed_methods=["GET", "HEAD", "OPTIONS"],
+                    cached_methods=["GET", "HEAD"],
+                    cache_policy_id=static_cache_policy.id,
+                    compress=True,
+                )
+                for path in cdn["s3_paths"]
+            ],
+            restrictions=aws.cloudfront.DistributionRestrictionsArgs(
+                geo_restriction=aws.cloudfront.DistributionRestrictionsGeoRestrictionArgs(
+                    restriction_type="none",
+                ),
+            ),
+            viewer_certificate=aws.cloudfront.DistributionViewerCertificateArgs(
+                acm_certificate_arn=certificate_arn,
+                ssl_support_method="sni-only",
+                minimum_protocol_version="TLSv1.2_2021",
+            ),
+            tags={**common_tags, "Name": f"{project_name}-{env}-{service_name}-cdn", "Site": service_name},
+        )
+        distributions[service_name] = distribution
+
+    # Allow only these distributions to read the app bucket
+    if distributions:
+        aws.s3.BucketPolicy(
+            f"{project_name}-{env}-app-storage-cdn-policy",
+            bucket=app_bucket.id,
+            policy=pulumi.Output.all(
+                bucket_arn=app_bucket.arn,
+                distribution_arns=[d.arn for d in distributions.values()],
+            ).apply(lambda args: json.dumps({
+                "Version": "2012-10-17",
+                "Statement": [{
+                    "Sid": "AllowCloudFrontRead",
+                    "Effect": "Allow",
+                    "Principal": {"Service": "cloudfront.amazonaws.com"},
+                    "Action": "s3:GetObject",
+                    "Resource": [
+                        f"{args['bucket_arn']}/{path.strip('/*')}/*" for path in cdn["s3_paths"]
+                    ],
+                    "Condition": {
+                        "StringEquals": {"AWS:SourceArn": args["distribution_arns"]},
+                    },
+                }],
+            })),
+        )
+
+    pulumi.export("cdn_domains", {name: d.domain_name for name, d in distributions.items()})
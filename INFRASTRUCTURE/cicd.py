@@ -2,12 +2,20 @@
 CI/CD Infrastructure - CodePipeline and CodeBuild
 
 Sets up AWS CodePipeline with CodeBuild projects for building Docker images
-and deploying to ECS.
+and deploying to ECS. Each image is built natively on x86_64 and ARM64
+(Graviton) builders, then merged into a multi-arch manifest. A Detect stage
+(cicd_scripts/change_detection.py) decides which images changed; the others
+skip their builds and deploys. Each deploy stage ends by tagging the images
+it rolled out as builds["deployed_tag"], the tag Pulumi's task definitions pin.
 """
 
+import json
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags
+from config import project_name, env, common_tags, builds, domains
+
+# CloudWatch namespace for build metrics (cache hit ratio)
+BUILD_METRIC_NAMESPACE = "Fibonacco/Builds"
 
 # =============================================================================
 # IAM Roles for CodePipeline and CodeBuild
@@ -143,6 +151,16 @@ codebuild_policy = aws.iam.RolePolicy(
                 "actions": ["s3:*"],
                 "resources": ["*"],
             },
+            {
+                "effect": "Allow",
+                "actions": ["cloudwatch:PutMetricData"],
+                "resources": ["*"],
+                "conditions": [{
+                    "test": "StringEquals",
+                    "variable": "cloudwatch:namespace",
+                    "values": [BUILD_METRIC_NAMESPACE],
+                }],
+            },
         ]
     ).json,
 )
@@ -152,79 +170,40 @@ codebuild_policy = aws.iam.RolePolicy(
 # =============================================================================
 
 # Import ECR repositories
-from storage import repositories
+from storage import repositories, cache_repositories
 
 # Get AWS account ID from config (set via: pulumi config set aws_account_id 195430954683)
 config = pulumi.Config()
 aws_account_id = config.require("aws_account_id")
 
-# Services that need Docker builds
+# Services that need Docker builds. Every site runs the same web image, so it
+# is built once into the "web" repository and promoted by digest to each
+# site repository listed in promote_to (each site's container and ECS service
+# share its name). Other images deploy to ecs_service/container directly.
+# Deploy stages run SSR, then web, then Horizon; tag_bundle_fingerprint marks
+# SSR images with the bundle fingerprint the web deploy checks against.
 services = [
-    {"name": "goeventcity", "dockerfile": "docker/Dockerfile.web"},
-    {"name": "daynews", "dockerfile": "docker/Dockerfile.web"},
-    {"name": "downtownguide", "dockerfile": "docker/Dockerfile.web"},
-    {"name": "alphasite", "dockerfile": "docker/Dockerfile.web"},
-    {"name": "golocalvoices", "dockerfile": "docker/Dockerfile.web"},
-    {"name": "base-app", "dockerfile": "docker/Dockerfile.base-app"},
-    {"name": "inertia-ssr", "dockerfile": "docker/Dockerfile.inertia-ssr"},
+    {"name": "web", "dockerfile": "docker/Dockerfile.web", "promote_to": list(domains)},
+    {"name": "base-app", "dockerfile": "docker/Dockerfile.base-app", "ecs_service": "horizon", "container": "horizon"},
+    {
+        "name": "inertia-ssr",
+        "dockerfile": "docker/Dockerfile.inertia-ssr",
+        "ecs_service": "ssr",
+        "container": "inertia-ssr",
+        "tag_bundle_fingerprint": True,
+    },
 ]
 
-codebuild_projects = {}
+# Docker tag suffix for each architecture's single-arch image
+ARCH_TAG_SUFFIXES = {"X86_64": "amd64", "ARM64": "arm64"}
 
-for service in services:
-    service_name = service["name"]
-    dockerfile = service["dockerfile"]
-    
-    # Get ECR repository
-    ecr_repo = repositories.get(service_name)
-    if not ecr_repo:
-        pulumi.log.warn(f"ECR repository not found for {service_name}, skipping CodeBuild project")
-        continue
-    
-    # CodeBuild project for this service
-    project = aws.codebuild.Project(
-        f"{project_name}-{service_name}-build",
-        name=f"{project_name}-{env}-{service_name}-build",
-        description=f"Build Docker image for {service_name}",
-        service_role=codebuild_role.arn,
-            artifacts=aws.codebuild.ProjectArtifactsArgs(
-                type="CODEPIPELINE",
-            ),
-        environment=aws.codebuild.ProjectEnvironmentArgs(
-            type="LINUX_CONTAINER",
-            image="aws/codebuild/standard:7.0",
-            compute_type="BUILD_GENERAL1_MEDIUM",
-            privileged_mode=True,  # Required for Docker builds
-            environment_variables=[
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="AWS_DEFAULT_REGION",
-                    value="us-east-1",
-                ),
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="AWS_ACCOUNT_ID",
-                    value=aws_account_id,
-                ),
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="ECR_REPOSITORY",
-                    value=ecr_repo.repository_url,
-                ),
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="IMAGE_TAG",
-                    value="latest",
-                ),
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="DOCKERFILE",
-                    value=dockerfile,
-                ),
-                aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(
-                    name="SERVICE_NAME",
-                    value=service_name,
-                ),
-            ],
-        ),
-        source=aws.codebuild.ProjectSourceArgs(
-            type="CODEPIPELINE",
-            buildspec="""version: 0.2
+# Native build on one architecture; pushes <commit>-<arch suffix>. Exits early
+# when the Detect stage passes BUILD_REQUIRED=false.
+# BuildKit reuses layers from the registry cache in CACHE_REPOSITORY first and
+# the CodeBuild local cache second, then exports to both.
+ARCH_BUILDSPEC = """version: 0.2
+env:
+  shell: bash
 phases:
   pre_build:
     commands:
@@ -232,9 +211,10 @@ phases:
       - echo "Service=$SERVICE_NAME"
       - echo "Dockerfile=$DOCKERFILE"
       - echo "ECR Repository=$ECR_REPOSITORY"
+      - echo "Cache Repository=$CACHE_REPOSITORY"
       - echo "AWS Account=$AWS_ACCOUNT_ID"
       - echo "Region=$AWS_DEFAULT_REGION"
-      - echo "Image Tag=$IMAGE_TAG"
+      - echo "Platform=$DOCKER_PLATFORM"
       - echo "Commit SHA=$CODEBUILD_RESOLVED_SOURCE_VERSION"
       - echo "Logging in to Amazon ECR..."
       - ECR_PASSWORD=$(aws ecr get-login-password --region $AWS_DEFAULT_REGION)
@@ -245,35 +225,298 @@ phases:
       - echo "Build started on `date`"
       - echo "Checking Dockerfile exists..."
       - ls -la $DOCKERFILE || true
-      - echo "Building Docker image..."
+      - ARCH_TAG=$CODEBUILD_RESOLVED_SOURCE_VERSION-$ARCH_TAG_SUFFIX
+      - CACHE_REF=$CACHE_REPOSITORY:$ARCH_TAG_SUFFIX
+      - mkdir -p $LOCAL_CACHE_DIR
+      - docker buildx create --name ci --driver docker-container --use
   build:
     commands:
       - echo "=== BUILD PHASE ==="
-      - echo "Building Docker image with tags $IMAGE_TAG and $CODEBUILD_RESOLVED_SOURCE_VERSION"
-      - docker build -f $DOCKERFILE -t $ECR_REPOSITORY:$IMAGE_TAG -t $ECR_REPOSITORY:$CODEBUILD_RESOLVED_SOURCE_VERSION .
+      - echo "Building $DOCKER_PLATFORM image with tag $ARCH_TAG (cache $CACHE_REF)"
+      - |
+        if [ "$BUILD_REQUIRED" = "false" ]; then
+          echo "No changes for $SERVICE_NAME, skipping build"
+        else
+          set -o pipefail
+          docker buildx build --platform $DOCKER_PLATFORM -f $DOCKERFILE -t $ECR_REPOSITORY:$ARCH_TAG \\
+            --cache-from type=registry,ref=$CACHE_REF \\
+            --cache-from type=local,src=$LOCAL_CACHE_DIR \\
+            --cache-to type=registry,ref=$CACHE_REF,mode=max,image-manifest=true,oci-mediatypes=true \\
+            --cache-to type=local,dest=$LOCAL_CACHE_DIR.new,mode=max \\
+            --progress=plain --push . 2>&1 | tee build.log
+        fi
       - echo "Build completed on `date`"
-      - echo "Verifying images were created..."
-      - sh -c "docker images | grep $ECR_REPOSITORY || true"
   post_build:
     commands:
       - echo "=== POST-BUILD PHASE ==="
-      - echo "Pushing Docker images..."
-      - docker push $ECR_REPOSITORY:$IMAGE_TAG
-      - docker push $ECR_REPOSITORY:$CODEBUILD_RESOLVED_SOURCE_VERSION
-      - echo "Images pushed successfully"
-      - echo "Writing image definitions file..."
-      - printf '[{"name":"%s","imageUri":"%s:%s"}]' $SERVICE_NAME $ECR_REPOSITORY $CODEBUILD_RESOLVED_SOURCE_VERSION > imagedefinitions.json
-      - cat imagedefinitions.json
+      - |
+        if [ "$BUILD_REQUIRED" != "false" ]; then
+          if [ -d $LOCAL_CACHE_DIR.new ]; then rm -rf $LOCAL_CACHE_DIR && mv $LOCAL_CACHE_DIR.new $LOCAL_CACHE_DIR; fi
+          python3 INFRASTRUCTURE/cicd_scripts/build_cache_report.py build.log || true
+          aws cloudwatch put-metric-data --namespace $BUILD_METRIC_NAMESPACE --metric-name CacheHitRatio \\
+            --dimensions Service=$SERVICE_NAME,Architecture=$ARCH_TAG_SUFFIX \\
+            --value $(python3 INFRASTRUCTURE/cicd_scripts/build_cache_report.py --ratio build.log) || true
+        fi
       - echo "=== BUILD COMPLETE ==="
+cache:
+  paths:
+    - /root/.buildx-cache/**/*
+"""
+
+# Merges the per-architecture images into one manifest list tagged <commit> and
+# latest (or, when BUILD_REQUIRED is "false", reuses the current latest), and
+# writes imagedefinitions pinned to the manifest digest. With
+# PROMOTE_REPOSITORIES ("site=repository_url ..."), copies that manifest by
+# digest into each site repository and writes imagedefinitions-<site>.json;
+# otherwise writes imagedefinitions.json for CONTAINER_NAME. With
+# TAG_BUNDLE_FINGERPRINT, also tags the image bundle-<fingerprint>.
+MANIFEST_BUILDSPEC = """version: 0.2
+env:
+  shell: bash
+phases:
+  pre_build:
+    commands:
+      - echo "=== PRE-BUILD PHASE ==="
+      - echo "Service=$SERVICE_NAME"
+      - echo "Architectures=$ARCH_TAG_SUFFIXES"
+      - echo "Commit SHA=$CODEBUILD_RESOLVED_SOURCE_VERSION"
+      - ECR_PASSWORD=$(aws ecr get-login-password --region $AWS_DEFAULT_REGION)
+      - sh -c "echo \"$ECR_PASSWORD\" | docker login --username AWS --password-stdin $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com"
+  build:
+    commands:
+      - echo "=== MANIFEST PHASE ==="
+      - |
+        if [ "$BUILD_REQUIRED" = "false" ]; then
+          echo "No changes for $SERVICE_NAME, keeping the current image"
+          IMAGE_REF=$IMAGE_TAG
+        else
+          TAGS="-t $ECR_REPOSITORY:$IMAGE_TAG -t $ECR_REPOSITORY:$CODEBUILD_RESOLVED_SOURCE_VERSION"
+          if [ "$TAG_BUNDLE_FINGERPRINT" = "true" ]; then
+            TAGS="$TAGS -t $ECR_REPOSITORY:bundle-$(python3 INFRASTRUCTURE/cicd_scripts/change_detection.py fingerprint)"
+          fi
+          SOURCES=""; for suffix in $ARCH_TAG_SUFFIXES; do SOURCES="$SOURCES $ECR_REPOSITORY:$CODEBUILD_RESOLVED_SOURCE_VERSION-$suffix"; done
+          docker buildx imagetools create $TAGS $SOURCES
+          IMAGE_REF=$CODEBUILD_RESOLVED_SOURCE_VERSION
+        fi
+      - DIGEST=$(docker buildx imagetools inspect $ECR_REPOSITORY:$IMAGE_REF --format '{{.Manifest.Digest}}')
+      - echo "$SERVICE_NAME image $ECR_REPOSITORY@$DIGEST"
+  post_build:
+    commands:
+      - |
+        if [ -n "$PROMOTE_REPOSITORIES" ]; then
+          for target in $PROMOTE_REPOSITORIES; do
+            SITE=${target%%=*}
+            SITE_REPOSITORY=${target#*=}
+            if [ "$BUILD_REQUIRED" != "false" ]; then
+              docker buildx imagetools create -t $SITE_REPOSITORY:$IMAGE_TAG -t $SITE_REPOSITORY:$IMAGE_REF $ECR_REPOSITORY@$DIGEST
+            fi
+            printf '[{"name":"%s","imageUri":"%s@%s"}]' $SITE $SITE_REPOSITORY $DIGEST > imagedefinitions-$SITE.json
+          done
+        else
+          printf '[{"name":"%s","imageUri":"%s@%s"}]' $CONTAINER_NAME $ECR_REPOSITORY $DIGEST > imagedefinitions.json
+        fi
+      - cat imagedefinitions*.json
+      - echo "=== MANIFEST COMPLETE ==="
 artifacts:
   files:
-    - imagedefinitions.json
-""",
+    - imagedefinitions*.json
+"""
+
+# Runs after a service's ECS deploy succeeds: tags each image in the
+# imagedefinitions*.json input as DEPLOYED_TAG. Task definitions Pulumi
+# registers pin that tag's digest (compute/services.py image_uri), so only
+# the pipeline moves what a `pulumi up` deploys.
+PROMOTE_BUILDSPEC = """version: 0.2
+env:
+  shell: bash
+phases:
+  pre_build:
+    commands:
+      - ECR_PASSWORD=$(aws ecr get-login-password --region $AWS_DEFAULT_REGION)
+      - sh -c "echo \"$ECR_PASSWORD\" | docker login --username AWS --password-stdin $AWS_ACCOUNT_ID.dkr.ecr.$AWS_DEFAULT_REGION.amazonaws.com"
+  build:
+    commands:
+      - echo "=== PROMOTE PHASE ==="
+      - |
+        for definitions in imagedefinitions*.json; do
+          IMAGE=$(python3 -c 'import json, sys; print(json.load(open(sys.argv[1]))[0]["imageUri"])' $definitions)
+          echo "Tagging $IMAGE as $DEPLOYED_TAG"
+          docker buildx imagetools create -t ${IMAGE%@*}:$DEPLOYED_TAG $IMAGE
+        done
+"""
+
+# Blocks web deploys unless the running SSR service serves the bundle this
+# checkout builds: its image must carry the bundle-<fingerprint> tag.
+SKEW_CHECK_BUILDSPEC = """version: 0.2
+env:
+  shell: bash
+phases:
+  build:
+    commands:
+      - echo "=== SSR SKEW CHECK ==="
+      - EXPECTED_TAG=bundle-$(python3 INFRASTRUCTURE/cicd_scripts/change_detection.py fingerprint)
+      - TASK_DEFINITION=$(aws ecs describe-services --cluster $CLUSTER_NAME --services $SSR_SERVICE_NAME --query 'services[0].taskDefinition' --output text)
+      - SSR_IMAGE=$(aws ecs describe-task-definition --task-definition $TASK_DEFINITION --query "taskDefinition.containerDefinitions[?name=='$SSR_CONTAINER_NAME'].image | [0]" --output text)
+      - echo "Running SSR image $SSR_IMAGE, expecting tag $EXPECTED_TAG"
+      - |
+        case "$SSR_IMAGE" in
+          *@sha256:*) IMAGE_ID="imageDigest=${SSR_IMAGE##*@}" ;;
+          *) IMAGE_ID="imageTag=${SSR_IMAGE##*:}" ;;
+        esac
+        SSR_TAGS=$(aws ecr describe-images --repository-name $SSR_REPOSITORY --image-ids $IMAGE_ID --query 'imageDetails[0].imageTags' --output text)
+        if ! echo "$SSR_TAGS" | tr '\\t' '\\n' | grep -qx "$EXPECTED_TAG"; then
+          echo "SSR is serving a different bundle (tags: $SSR_TAGS); deploy SSR for this commit first"
+          exit 1
+        fi
+      - echo "SSR bundle matches"
+"""
+
+
+# Must match the cache paths in ARCH_BUILDSPEC
+LOCAL_CACHE_DIR = "/root/.buildx-cache"
+
+# Decides which images to rebuild. Each image's base is the commit tag on its
+# current `latest`, so skipped images accumulate changes until they rebuild.
+DETECT_BUILDSPEC = """version: 0.2
+env:
+  shell: bash
+  exported-variables:
+{exported_variables}
+phases:
+  build:
+    commands:
+      - echo "=== DETECT PHASE ==="
+      - |
+        BASES=""
+        for target in $SERVICE_REPOSITORIES; do
+          SERVICE=${{target%%=*}}
+          REPOSITORY=${{target#*=}}
+          TAGS=$(aws ecr describe-images --repository-name $REPOSITORY --image-ids imageTag=latest --query 'imageDetails[0].imageTags' --output text 2>/dev/null | tr '\\t' '\\n')
+          COMMIT=$(echo "$TAGS" | grep -E '^[0-9a-f]{{40}}$' | head -1)
+          # Rebuild fingerprinted images that predate bundle tags
+          if [[ " $FINGERPRINTED_SERVICES " == *" $SERVICE "* ]] && ! echo "$TAGS" | grep -q '^bundle-'; then COMMIT=""; fi
+          echo "$SERVICE: current image built from ${{COMMIT:-unknown}}"
+          BASES="$BASES --base $SERVICE=$COMMIT"
+        done
+      - eval "$(python3 INFRASTRUCTURE/cicd_scripts/change_detection.py detect --repo $GITHUB_REPOSITORY --head $CODEBUILD_RESOLVED_SOURCE_VERSION $BASES)"
+{echo_variables}
+"""
+
+# GitHub repository the pipeline builds
+GITHUB_OWNER = "shinejohn"  # Update with your GitHub username/org
+GITHUB_REPO = "Community-Platform"  # Update with your repo name
+
+
+def change_variable(service_name: str) -> str:
+    """Detect stage variable for an image (matches change_detection.variable_name)."""
+    return service_name.upper().replace("-", "_")
+
+
+def _build_environment(arch_config: dict, variables: dict, secrets: dict = None) -> aws.codebuild.ProjectEnvironmentArgs:
+    """CodeBuild environment for an architecture entry in config.builds."""
+    return aws.codebuild.ProjectEnvironmentArgs(
+        type=arch_config["environment_type"],
+        image=arch_config["image"],
+        compute_type=arch_config["compute_type"],
+        privileged_mode=True,  # Required for Docker builds
+        environment_variables=[
+            aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(name=name, value=value)
+            for name, value in variables.items()
+        ] + [
+            aws.codebuild.ProjectEnvironmentEnvironmentVariableArgs(name=name, value=secret_id, type="SECRETS_MANAGER")
+            for name, secret_id in (secrets or {}).items()
+        ],
+    )
+
+
+# Per-architecture build projects: {service: {architecture: project}}
+codebuild_arch_projects = {}
+# Manifest-merge projects whose imagedefinitions.json feeds the Deploy stage
+codebuild_projects = {}
+
+for service in services:
+    service_name = service["name"]
+    dockerfile = service["dockerfile"]
+    
+    # Get ECR repository
+    ecr_repo = repositories.get(service_name)
+    if not ecr_repo:
+        pulumi.log.warn(f"ECR repository not found for {service_name}, skipping CodeBuild project")
+        continue
+
+    common_variables = {
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCOUNT_ID": aws_account_id,
+        "ECR_REPOSITORY": ecr_repo.repository_url,
+        "IMAGE_TAG": "latest",
+        "DOCKERFILE": dockerfile,
+        "SERVICE_NAME": service_name,
+    }
+
+    codebuild_arch_projects[service_name] = {}
+    for architecture, arch_config in builds["architectures"].items():
+        suffix = ARCH_TAG_SUFFIXES[architecture]
+        codebuild_arch_projects[service_name][architecture] = aws.codebuild.Project(
+            f"{project_name}-{service_name}-build-{suffix}",
+            name=f"{project_name}-{env}-{service_name}-build-{suffix}",
+            description=f"Build {arch_config['platform']} Docker image for {service_name}",
+            service_role=codebuild_role.arn,
+            artifacts=aws.codebuild.ProjectArtifactsArgs(
+                type="CODEPIPELINE",
+            ),
+            environment=_build_environment(arch_config, {
+                **common_variables,
+                "DOCKER_PLATFORM": arch_config["platform"],
+                "ARCH_TAG_SUFFIX": suffix,
+                "CACHE_REPOSITORY": cache_repositories[service_name].repository_url,
+                "LOCAL_CACHE_DIR": LOCAL_CACHE_DIR,
+                "BUILD_METRIC_NAMESPACE": BUILD_METRIC_NAMESPACE,
+            }),
+            # Fallback when the registry cache is cold; only hits on the same build host
+            cache=aws.codebuild.ProjectCacheArgs(
+                type="LOCAL",
+                modes=["LOCAL_CUSTOM_CACHE"],
+            ),
+            source=aws.codebuild.ProjectSourceArgs(
+                type="CODEPIPELINE",
+                buildspec=ARCH_BUILDSPEC,
+            ),
+            logs_config=aws.codebuild.ProjectLogsConfigArgs(
+                cloudwatch_logs=aws.codebuild.ProjectLogsConfigCloudwatchLogsArgs(
+                    group_name=f"/aws/codebuild/{project_name}-{env}-{service_name}",
+                    stream_name=f"build-{suffix}",
+                ),
+            ),
+            tags=common_tags,
+        )
+
+    # Manifest merge runs on x86; it only copies manifests between tags
+    project = aws.codebuild.Project(
+        f"{project_name}-{service_name}-manifest",
+        name=f"{project_name}-{env}-{service_name}-manifest",
+        description=f"Publish multi-arch manifest for {service_name}",
+        service_role=codebuild_role.arn,
+        artifacts=aws.codebuild.ProjectArtifactsArgs(
+            type="CODEPIPELINE",
+        ),
+        environment=_build_environment(builds["architectures"]["X86_64"], {
+            **common_variables,
+            "ARCH_TAG_SUFFIXES": " ".join(ARCH_TAG_SUFFIXES[arch] for arch in builds["architectures"]),
+            "PROMOTE_REPOSITORIES": pulumi.Output.all(*[
+                repositories[site].repository_url.apply(lambda url, site=site: f"{site}={url}")
+                for site in service.get("promote_to", [])
+            ]).apply(" ".join),
+            "CONTAINER_NAME": service.get("container", service_name),
+            "TAG_BUNDLE_FINGERPRINT": "true" if service.get("tag_bundle_fingerprint") else "false",
+        }),
+        source=aws.codebuild.ProjectSourceArgs(
+            type="CODEPIPELINE",
+            buildspec=MANIFEST_BUILDSPEC,
         ),
         logs_config=aws.codebuild.ProjectLogsConfigArgs(
             cloudwatch_logs=aws.codebuild.ProjectLogsConfigCloudwatchLogsArgs(
                 group_name=f"/aws/codebuild/{project_name}-{env}-{service_name}",
-                stream_name="build",
+                stream_name="manifest",
             ),
         ),
         tags=common_tags,
@@ -281,10 +524,207 @@ artifacts:
     
     codebuild_projects[service_name] = project
 
+# Change detection: reads the GitHub compare API with the pipeline's token
+github_token_secret = aws.secretsmanager.Secret(
+    f"{project_name}-{env}-github-token",
+    name=f"fibonacco/{env}/github-token",
+    description="GitHub token for pipeline change detection",
+    tags=common_tags,
+)
+
+aws.secretsmanager.SecretVersion(
+    f"{project_name}-{env}-github-token-version",
+    secret_id=github_token_secret.id,
+    secret_string=config.require_secret("github_token"),
+)
+
+aws.iam.RolePolicy(
+    f"{project_name}-codebuild-detect-policy",
+    role=codebuild_role.id,
+    policy=github_token_secret.arn.apply(lambda arn: json.dumps({
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": ["ecr:DescribeImages"],
+                "Resource": "*",
+            },
+            {
+                "Effect": "Allow",
+                "Action": ["secretsmanager:GetSecretValue"],
+                "Resource": arn,
+            },
+        ],
+    })),
+)
+
+change_variables = [change_variable(name) for name in codebuild_projects]
+
+detect_project = aws.codebuild.Project(
+    f"{project_name}-detect-changes",
+    name=f"{project_name}-{env}-detect-changes",
+    description="Decide which images changed since their last build",
+    service_role=codebuild_role.arn,
+    artifacts=aws.codebuild.ProjectArtifactsArgs(
+        type="CODEPIPELINE",
+    ),
+    environment=_build_environment(builds["architectures"]["X86_64"], {
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "GITHUB_REPOSITORY": f"{GITHUB_OWNER}/{GITHUB_REPO}",
+        "FINGERPRINTED_SERVICES": " ".join(service["name"] for service in services if service.get("tag_bundle_fingerprint")),
+        "SERVICE_REPOSITORIES": pulumi.Output.all(*[
+            repositories[name].name.apply(lambda repo, name=name: f"{name}={repo}")
+            for name in codebuild_projects
+        ]).apply(" ".join),
+    }, secrets={
+        "GITHUB_TOKEN": github_token_secret.arn,
+    }),
+    source=aws.codebuild.ProjectSourceArgs(
+        type="CODEPIPELINE",
+        buildspec=DETECT_BUILDSPEC.format(
+            exported_variables="\n".join(f"    - {name}" for name in change_variables),
+            echo_variables="\n".join(f'      - echo "{name}=${name}"' for name in change_variables),
+        ),
+    ),
+    logs_config=aws.codebuild.ProjectLogsConfigArgs(
+        cloudwatch_logs=aws.codebuild.ProjectLogsConfigCloudwatchLogsArgs(
+            group_name=f"/aws/codebuild/{project_name}-{env}-detect-changes",
+            stream_name="detect",
+        ),
+    ),
+    tags=common_tags,
+)
+
+
+promote_project = aws.codebuild.Project(
+    f"{project_name}-promote-deployed",
+    name=f"{project_name}-{env}-promote-deployed",
+    description=f"Tag successfully deployed images as {builds['deployed_tag']}",
+    service_role=codebuild_role.arn,
+    artifacts=aws.codebuild.ProjectArtifactsArgs(
+        type="CODEPIPELINE",
+    ),
+    environment=_build_environment(builds["architectures"]["X86_64"], {
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCOUNT_ID": aws_account_id,
+        "DEPLOYED_TAG": builds["deployed_tag"],
+    }),
+    source=aws.codebuild.ProjectSourceArgs(
+        type="CODEPIPELINE",
+        buildspec=PROMOTE_BUILDSPEC,
+    ),
+    logs_config=aws.codebuild.ProjectLogsConfigArgs(
+        cloudwatch_logs=aws.codebuild.ProjectLogsConfigCloudwatchLogsArgs(
+            group_name=f"/aws/codebuild/{project_name}-{env}-promote-deployed",
+            stream_name="promote",
+        ),
+    ),
+    tags=common_tags,
+)
+
+ssr_build = next(service for service in services if service.get("tag_bundle_fingerprint"))
+
+skew_check_project = aws.codebuild.Project(
+    f"{project_name}-ssr-skew-check",
+    name=f"{project_name}-{env}-ssr-skew-check",
+    description="Verify the running SSR service matches the web bundle before deploying web",
+    service_role=codebuild_role.arn,
+    artifacts=aws.codebuild.ProjectArtifactsArgs(
+        type="CODEPIPELINE",
+    ),
+    environment=_build_environment(builds["architectures"]["X86_64"], {
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "CLUSTER_NAME": f"{project_name}-{env}",
+        "SSR_SERVICE_NAME": f"{project_name}-{env}-{ssr_build['ecs_service']}",
+        "SSR_CONTAINER_NAME": ssr_build["container"],
+        "SSR_REPOSITORY": repositories[ssr_build["name"]].name,
+    }),
+    source=aws.codebuild.ProjectSourceArgs(
+        type="CODEPIPELINE",
+        buildspec=SKEW_CHECK_BUILDSPEC,
+    ),
+    logs_config=aws.codebuild.ProjectLogsConfigArgs(
+        cloudwatch_logs=aws.codebuild.ProjectLogsConfigCloudwatchLogsArgs(
+            group_name=f"/aws/codebuild/{project_name}-{env}-ssr-skew-check",
+            stream_name="check",
+        ),
+    ),
+    tags=common_tags,
+)
+
+
+def _build_required(service_name: str) -> str:
+    """CodeBuild action override passing the Detect stage's decision as BUILD_REQUIRED."""
+    return json.dumps([{
+        "name": "BUILD_REQUIRED",
+        "value": f"#{{Changes.{change_variable(service_name)}}}",
+        "type": "PLAINTEXT",
+    }])
+
+
 # =============================================================================
 # CodePipeline
 # =============================================================================
 
+
+def _ecs_deploy_action(ecs_service: str, artifact: str, file_name: str = "imagedefinitions.json",
+                       run_order: int = 1) -> aws.codepipeline.PipelineStageActionArgs:
+    """ECS standard deploy of an imagedefinitions file to <project>-<env>-<ecs_service>."""
+    return aws.codepipeline.PipelineStageActionArgs(
+        name=f"Deploy-{ecs_service}",
+        category="Deploy",
+        owner="AWS",
+        provider="ECS",
+        version="1",
+        run_order=run_order,
+        input_artifacts=[artifact],
+        configuration={
+            "ClusterName": f"{project_name}-{env}",
+            "ServiceName": f"{project_name}-{env}-{ecs_service}",
+            "FileName": file_name,
+        },
+    )
+
+
+def _promote_action(artifact: str, run_order: int) -> aws.codepipeline.PipelineStageActionArgs:
+    """Tag the images in an imagedefinitions artifact as deployed, after its deploy actions."""
+    return aws.codepipeline.PipelineStageActionArgs(
+        name="PromoteDeployed",
+        category="Build",
+        owner="AWS",
+        provider="CodeBuild",
+        version="1",
+        run_order=run_order,
+        input_artifacts=[artifact],
+        configuration={
+            "ProjectName": promote_project.name,
+        },
+    )
+
+
+def _deploy_condition(service_name: str) -> aws.codepipeline.PipelineStageBeforeEntryArgs:
+    """Enter a deploy stage only when the Detect stage marked the image changed; otherwise skip it."""
+    return aws.codepipeline.PipelineStageBeforeEntryArgs(
+        condition=aws.codepipeline.PipelineStageBeforeEntryConditionArgs(
+            result="SKIP",
+            rules=[aws.codepipeline.PipelineStageBeforeEntryConditionRuleArgs(
+                name=f"{change_variable(service_name)}-changed",
+                rule_type_id=aws.codepipeline.PipelineStageBeforeEntryConditionRuleRuleTypeIdArgs(
+                    category="Rule",
+                    owner="AWS",
+                    provider="VariableCheck",
+                    version="1",
+                ),
+                configuration={
+                    "Variable": f"#{{Changes.{change_variable(service_name)}}}",
+                    "Value": "true",
+                    "Operator": "EQ",
+                },
+            )],
+        ),
+    )
+
+
 # S3 bucket for CodePipeline artifacts
 pipeline_artifacts_bucket = aws.s3.Bucket(
     f"{project_name}-pipeline-artifacts",
@@ -306,6 +746,7 @@ pipeline = aws.codepipeline.Pipeline(
     f"{project_name}-pipeline",
     name=f"{project_name}-{env}-pipeline",
     role_arn=codepipeline_role.arn,
+    pipeline_type="V2",  # Stage entry conditions skip unchanged deploys
     artifact_stores=[aws.codepipeline.PipelineArtifactStoreArgs(
         location=pipeline_artifacts_bucket.bucket,
         type="S3",
@@ -322,20 +763,56 @@ pipeline = aws.codepipeline.Pipeline(
                 version="1",
                 output_artifacts=["source_output"],
                 configuration={
-                    "Owner": "shinejohn",  # Update with your GitHub username/org
-                    "Repo": "Community-Platform",  # Update with your repo name
+                    "Owner": GITHUB_OWNER,
+                    "Repo": GITHUB_REPO,
                     "Branch": "main",
                     "OAuthToken": config.require_secret("github_token"),  # Set via: pulumi config set --secret github_token <token>
                     "PollForSourceChanges": "true",  # Poll GitHub for changes every few minutes
                 },
             )],
         ),
-        # Build Stage - CodeBuild for each service
+        # Detect Stage - export Changes.<IMAGE>=true|false for the stages below
+        aws.codepipeline.PipelineStageArgs(
+            name="Detect",
+            actions=[aws.codepipeline.PipelineStageActionArgs(
+                name="DetectChanges",
+                category="Build",
+                owner="AWS",
+                provider="CodeBuild",
+                version="1",
+                namespace="Changes",
+                input_artifacts=["source_output"],
+                configuration={
+                    "ProjectName": detect_project.name,
+                },
+            )],
+        ),
+        # Build Stage - native CodeBuild per service and architecture, in parallel
         aws.codepipeline.PipelineStageArgs(
             name="Build",
             actions=[
                 aws.codepipeline.PipelineStageActionArgs(
-                    name=f"Build-{service_name}",
+                    name=f"Build-{service_name}-{ARCH_TAG_SUFFIXES[architecture]}",
+                    category="Build",
+                    owner="AWS",
+                    provider="CodeBuild",
+                    version="1",
+                    input_artifacts=["source_output"],
+                    configuration={
+                        "ProjectName": project.name,
+                        "EnvironmentVariables": _build_required(service_name),
+                    },
+                )
+                for service_name, arch_projects in codebuild_arch_projects.items()
+                for architecture, project in arch_projects.items()
+            ],
+        ),
+        # Manifest Stage - merge architectures into one tag and emit imagedefinitions.json
+        aws.codepipeline.PipelineStageArgs(
+            name="Manifest",
+            actions=[
+                aws.codepipeline.PipelineStageActionArgs(
+                    name=f"Manifest-{service_name}",
                     category="Build",
                     owner="AWS",
                     provider="CodeBuild",
@@ -344,30 +821,55 @@ pipeline = aws.codepipeline.Pipeline(
                     output_artifacts=[f"{service_name}_output"],
                     configuration={
                         "ProjectName": project.name,
+                        "EnvironmentVariables": _build_required(service_name),
                     },
                 )
                 for service_name, project in codebuild_projects.items()
             ],
         ),
-        # Deploy Stage - ECS for web services only (not base-app or inertia-ssr)
+        # SSR first, so web never renders against an older server bundle
+        aws.codepipeline.PipelineStageArgs(
+            name="DeploySSR",
+            before_entry=_deploy_condition(ssr_build["name"]),
+            actions=[
+                _ecs_deploy_action(ssr_build["ecs_service"], f"{ssr_build['name']}_output"),
+                _promote_action(f"{ssr_build['name']}_output", run_order=2),
+            ],
+        ),
+        # Web: skew check, then every site the web image was promoted to
         aws.codepipeline.PipelineStageArgs(
             name="Deploy",
+            before_entry=_deploy_condition("web"),
             actions=[
                 aws.codepipeline.PipelineStageActionArgs(
-                    name=f"Deploy-{service_name}",
-                    category="Deploy",
+                    name="VerifySSRBundle",
+                    category="Test",
                     owner="AWS",
-                    provider="ECS",
+                    provider="CodeBuild",
                     version="1",
-                    input_artifacts=[f"{service_name}_output"],
+                    run_order=1,
+                    input_artifacts=["source_output"],
                     configuration={
-                        "ClusterName": f"{project_name}-{env}",
-                        "ServiceName": f"{project_name}-{env}-{service_name}",
-                        "FileName": f"{service_name}_output::imagedefinitions.json",
+                        "ProjectName": skew_check_project.name,
                     },
-                )
-                for service_name in codebuild_projects.keys()
-                if service_name not in ["base-app", "inertia-ssr"]  # Only deploy web services
+                ),
+            ] + [
+                _ecs_deploy_action(site, f"{service['name']}_output", f"imagedefinitions-{site}.json", run_order=2)
+                for service in services
+                for site in service.get("promote_to", [])
+            ] + [
+                _promote_action(f"{service['name']}_output", run_order=3)
+                for service in services
+                if service.get("promote_to")
+            ],
+        ),
+        # Queue workers last; Horizon finishes in-flight jobs on SIGTERM
+        aws.codepipeline.PipelineStageArgs(
+            name="DeployHorizon",
+            before_entry=_deploy_condition("base-app"),
+            actions=[
+                _ecs_deploy_action("horizon", "base-app_output"),
+                _promote_action("base-app_output", run_order=2),
             ],
         ),
     ],
@@ -0,0 +1,100 @@
+"""
+BuildKit cache hit report for CodeBuild image builds.
+
+Parses `docker buildx build --progress=plain` output and reports which
+Dockerfile steps were served from cache (registry or local) and how long
+the uncached ones took. Runs in the CodeBuild container from the source
+checkout, standard library only:
+
+    python3 INFRASTRUCTURE/cicd_scripts/build_cache_report.py build.log
+    python3 INFRASTRUCTURE/cicd_scripts/build_cache_report.py --ratio build.log
+
+--ratio prints only the hit ratio (0-1) for `aws cloudwatch put-metric-data`.
+"""
+
+import re
+import sys
+
+# "#8 [base 4/6] RUN composer install" / "#12 [3/7] COPY . ."
+STEP_PATTERN = re.compile(r"^#(\d+) \[(?:[\w.-]+ )?\d+/\d+\] (.+)$")
+CACHED_PATTERN = re.compile(r"^#(\d+) CACHED$")
+DONE_PATTERN = re.compile(r"^#(\d+) DONE (\d+(?:\.\d+)?)s$")
+ERROR_PATTERN = re.compile(r"^#(\d+) ERROR")
+
+
+def parse_build_log(lines):
+    """
+    Return Dockerfile steps from BuildKit plain progress output.
+
+    Returns:
+        List of {"id", "name", "status": "cached" | "built" | "error" | "unknown", "seconds"}
+        in first-seen order.
+    """
+    steps = {}
+    for line in lines:
+        line = line.rstrip("\n")
+        match = STEP_PATTERN.match(line)
+        if match:
+            steps.setdefault(match.group(1), {
+                "id": match.group(1),
+                "name": match.group(2),
+                "status": "unknown",
+                "seconds": 0.0,
+            })
+            continue
+
+        match = CACHED_PATTERN.match(line)
+        if match and match.group(1) in steps:
+            steps[match.group(1)]["status"] = "cached"
+            continue
+
+        match = DONE_PATTERN.match(line)
+        if match and match.group(1) in steps:
+            step = steps[match.group(1)]
+            step["seconds"] = float(match.group(2))
+            if step["status"] != "cached":
+                step["status"] = "built"
+            continue
+
+        match = ERROR_PATTERN.match(line)
+        if match and match.group(1) in steps:
+            steps[match.group(1)]["status"] = "error"
+
+    return list(steps.values())
+
+
+def cache_hit_ratio(steps):
+    """Fraction of finished steps served from cache (0.0 when nothing ran)."""
+    finished = [step for step in steps if step["status"] in ("cached", "built")]
+    if not finished:
+        return 0.0
+    return sum(1 for step in finished if step["status"] == "cached") / len(finished)
+
+
+def format_report(steps):
+    """Render the summary and the slowest uncached steps."""
+    cached = [step for step in steps if step["status"] == "cached"]
+    built = sorted((step for step in steps if step["status"] == "built"), key=lambda step: -step["seconds"])
+    lines = [
+        f"Cache hits: {len(cached)}/{len(cached) + len(built)} steps "
+        f"({cache_hit_ratio(steps):.0%}), uncached build time {sum(step['seconds'] for step in built):.1f}s",
+    ]
+    for step in built[:10]:
+        lines.append(f"  {step['seconds']:8.1f}s  {step['name'][:100]}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    ratio_only = "--ratio" in args
+    paths = [arg for arg in args if arg != "--ratio"]
+    if len(paths) != 1:
+        sys.exit("usage: build_cache_report.py [--ratio] build.log")
+
+    with open(paths[0], errors="replace") as handle:
+        parsed = parse_build_log(handle)
+
+    if ratio_only:
+        print(f"{cache_hit_ratio(parsed):.4f}")
+    else:
+        print(format_report(parsed))
@@ -0,0 +1,188 @@
+"""
+Map changed source paths to the images CI has to rebuild.
+
+SERVICE_PATHS is the declarative mapping: fnmatch patterns per image, matched
+against repository-relative paths. Paths matching IGNORED_PATHS affect no
+image; any other path that matches no service is treated as affecting all of
+them, so a new top-level directory can never silently skip a build.
+
+Runs in the CodeBuild Detect action from the source checkout, standard
+library only:
+
+    python3 INFRASTRUCTURE/cicd_scripts/change_detection.py detect \\
+        --repo owner/name --head <sha> --base web=<sha> --base inertia-ssr=<sha> ...
+
+prints `export WEB=true` style lines (one per image) for the buildspec to
+eval. `fingerprint` prints a hash of the BUNDLE_PATHS files in the checkout;
+SSR images are tagged with it so web deploys can verify the running SSR
+server renders the same bundle. Offline, against a saved
+`git diff --name-only`:
+
+    python3 INFRASTRUCTURE/cicd_scripts/change_detection.py fingerprint [root]
+    python3 INFRASTRUCTURE/cicd_scripts/change_detection.py paths changed.txt
+"""
+
+import hashlib
+import json
+import os
+import sys
+import urllib.request
+from fnmatch import fnmatch
+
+# Inputs of the Vite client and SSR bundles. Web and SSR must serve bundles
+# built from the same inputs; see `fingerprint`.
+BUNDLE_PATHS = [
+    "resources/js/*", "resources/css/*", "package.json", "package-lock.json",
+    "bun.lock", "vite.config.ts", "tsconfig.json", "components.json",
+]
+
+SERVICE_PATHS = {
+    "web": BUNDLE_PATHS + [
+        "app/*", "bootstrap/*", "config/*", "database/*", "lang/*", "packages/*",
+        "public/*", "resources/*", "routes/*", "storage/*", "artisan",
+        "composer.json", "composer.lock", "docker/Dockerfile.web", "docker/standalone/*",
+    ],
+    "inertia-ssr": BUNDLE_PATHS + [
+        "docker/Dockerfile.inertia-ssr",
+    ],
+    "base-app": [
+        "app/*", "bootstrap/*", "config/*", "database/*", "lang/*", "packages/*",
+        "routes/*", "resources/views/*", "artisan", "composer.json", "composer.lock",
+        "docker/Dockerfile.base-app",
+    ],
+}
+
+# Paths that never end up in an image
+IGNORED_PATHS = [
+    "*.md", "docs/*", "wiki/*", "tests/*", "test-results/*", "playwright-report/*",
+    "playwright*.ts", "phpunit.xml", "pint.json", "biome.json", ".github/*",
+    "INFRASTRUCTURE/*", "scripts/*", "buildspec.yml", "railway*",
+]
+
+GITHUB_COMPARE_URL = "https://api.github.com/repos/{repo}/compare/{base}...{head}"
+# GitHub truncates compare results beyond this many files
+GITHUB_COMPARE_FILE_LIMIT = 300
+
+
+def affected_services(paths, service_paths=SERVICE_PATHS, ignored=IGNORED_PATHS):
+    """Return the set of images whose inputs include any of `paths`."""
+    affected = set()
+    for path in paths:
+        matched = {
+            service for service, patterns in service_paths.items()
+            if any(fnmatch(path, pattern) for pattern in patterns)
+        }
+        if matched:
+            affected |= matched
+        elif not any(fnmatch(path, pattern) for pattern in ignored):
+            return set(service_paths)
+    return affected
+
+
+def fingerprint(root=".", patterns=BUNDLE_PATHS):
+    """Short sha256 over the paths and contents of files under `root` matching `patterns`."""
+    digest = hashlib.sha256()
+    matched = []
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if name not in (".git", "node_modules", "vendor")]
+        for name in files:
+            path = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/")
+            if any(fnmatch(path, pattern) for pattern in patterns):
+                matched.append(path)
+    for path in sorted(matched):
+        digest.update(path.encode() + b"\0")
+        with open(os.path.join(root, path), "rb") as handle:
+            digest.update(hashlib.sha256(handle.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def variable_name(service):
+    """Exported pipeline variable for an image, e.g. inertia-ssr -> INERTIA_SSR."""
+    return service.upper().replace("-", "_")
+
+
+def github_changed_paths(repo, base, head, token=None):
+    """
+    Files changed between two commits via the GitHub compare API.
+
+    Returns None when the comparison can't be trusted (truncated or failed),
+    which callers treat as "everything changed".
+    """
+    request = urllib.request.Request(
+        GITHUB_COMPARE_URL.format(repo=repo, base=base, head=head),
+        headers={"Accept": "application/vnd.github+json", **({"Authorization": f"Bearer {token}"} if token else {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=20) as response:
+            comparison = json.load(response)
+    except Exception as error:
+        print(f"compare {base}...{head} failed: {error}", file=sys.stderr)
+        return None
+
+    files = comparison.get("files", [])
+    if len(files) >= GITHUB_COMPARE_FILE_LIMIT:
+        return None
+    paths = []
+    for item in files:
+        paths.append(item["filename"])
+        if item.get("previous_filename"):
+            paths.append(item["previous_filename"])
+    return paths
+
+
+def detect(repo, head, bases, token=None):
+    """
+    Decide per image whether to rebuild.
+
+    Args:
+        bases: {service: commit of its current image, or "" if unknown}
+
+    Returns:
+        {service: True | False}
+    """
+    decisions = {}
+    for service in SERVICE_PATHS:
+        base = bases.get(service, "")
+        if not base:
+            decisions[service] = True
+        elif base == head:
+            decisions[service] = False
+        else:
+            paths = github_changed_paths(repo, base, head, token)
+            decisions[service] = paths is None or service in affected_services(paths)
+    return decisions
+
+
+def _parse_bases(args):
+    bases = {}
+    for arg in args:
+        service, _, commit = arg.partition("=")
+        bases[service] = commit if commit != "None" else ""
+    return bases
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+
+    if command == "fingerprint" and len(args) <= 1:
+        print(fingerprint(*args))
+
+    elif command == "paths" and len(args) == 1:
+        with open(args[0]) as handle:
+            changed = [line.strip() for line in handle if line.strip()]
+        print(" ".join(sorted(affected_services(changed))) or "(none)")
+
+    elif command == "detect":
+        options = {"--repo": None, "--head": None}
+        base_args = []
+        for flag, value in zip(args[::2], args[1::2]):
+            if flag == "--base":
+                base_args.append(value)
+            else:
+                options[flag] = value
+        result = detect(options["--repo"], options["--head"], _parse_bases(base_args), os.environ.get("GITHUB_TOKEN"))
+        for service, rebuild in result.items():
+            print(f"export {variable_name(service)}={'true' if rebuild else 'false'}")
+
+    else:
+        sys.exit(__doc__)
@@ -0,0 +1,226 @@
+"""
+Application Auto Scaling for ECS services.
+
+Registers each ECS service as a scalable target bounded by the
+min_capacity/max_capacity values in config.py, then attaches CPU, memory
+and (for web services) ALB RequestCountPerTarget target tracking policies,
+plus a CPU step scaling policy for sudden bursts. Queue workers can instead
+track the backlog-per-task metric published by queue_metrics.py.
+
+With automation enabled, CPU/memory-scaled services also get sustained
+saturation alarms named "...-auto-remediate", which trigger the scaling
+controller (automation/remediation.py) when the policies can't keep up.
+"""
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, autoscaling, queue_metrics, automation
+from .cluster import cluster
+
+# {service name: {"cpu" | "memory": MetricAlarm}} triggering the scaling controller
+remediation_alarms = {}
+
+
+def _scalable_target(prefix: str, service: aws.ecs.Service, capacity: dict):
+    """Register an ECS service's desired count with Application Auto Scaling."""
+    return aws.appautoscaling.Target(
+        f"{prefix}-scaling-target",
+        service_namespace="ecs",
+        scalable_dimension="ecs:service:DesiredCount",
+        resource_id=pulumi.Output.concat("service/", cluster.name, "/", service.name),
+        min_capacity=capacity["min_capacity"],
+        max_capacity=capacity["max_capacity"],
+        tags=common_tags,
+    )
+
+
+def _target_tracking_policy(name: str, target: aws.appautoscaling.Target, metric_type: str,
+                            target_value: float, resource_label: pulumi.Input[str] = None):
+    """Create a target tracking policy for a predefined ECS/ALB metric."""
+    return aws.appautoscaling.Policy(
+        name,
+        name=name,
+        policy_type="TargetTrackingScaling",
+        resource_id=target.resource_id,
+        scalable_dimension=target.scalable_dimension,
+        service_namespace=target.service_namespace,
+        target_tracking_scaling_policy_configuration=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationArgs(
+            target_value=target_value,
+            predefined_metric_specification=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationPredefinedMetricSpecificationArgs(
+                predefined_metric_type=metric_type,
+                resource_label=resource_label,
+            ),
+            scale_in_cooldown=autoscaling["scale_in_cooldown"],
+            scale_out_cooldown=autoscaling["scale_out_cooldown"],
+        ),
+    )
+
+
+def _step_adjustments(steps: list):
+    """Convert config step definitions into step adjustment args."""
+    return [
+        aws.appautoscaling.PolicyStepScalingPolicyConfigurationStepAdjustmentArgs(
+            metric_interval_lower_bound=None if step["lower"] is None else str(step["lower"]),
+            metric_interval_upper_bound=None if step["upper"] is None else str(step["upper"]),
+            scaling_adjustment=step["adjustment"],
+        )
+        for step in steps
+    ]
+
+
+def _remediation_alarms(name: str, service: aws.ecs.Service, kinds: list):
+    """Saturation alarms the scaling controller reacts to (by name suffix)."""
+    prefix = f"{project_name}-{env}-{name}"
+    alarms = {}
+    for kind in kinds:
+        alarm = automation["alarms"][kind]
+        alarms[kind] = aws.cloudwatch.MetricAlarm(
+            f"{prefix}-{kind}-remediation-alarm",
+            name=f"{prefix}-{kind}-saturated{automation['alarm_suffix']}",
+            comparison_operator="GreaterThanOrEqualToThreshold",
+            evaluation_periods=alarm["evaluation_periods"],
+            metric_name=alarm["metric_name"],
+            namespace="AWS/ECS",
+            period=alarm["period"],
+            statistic="Average",
+            threshold=alarm["threshold"],
+            alarm_description=(
+                f"{name} {kind} at or above {alarm['threshold']}% despite autoscaling; "
+                "the scaling controller adds tasks and lifts max capacity"
+            ),
+            dimensions={"ClusterName": cluster.name, "ServiceName": service.name},
+            tags=common_tags,
+        )
+    remediation_alarms[name] = alarms
+    return alarms
+
+
+def create_service_autoscaling(name: str, service: aws.ecs.Service, capacity: dict,
+                               alb_resource_label: pulumi.Input[str] = None):
+    """
+    Attach autoscaling to an ECS service.
+
+    Args:
+        name: Short service name (e.g. "daynews", "ssr", "horizon")
+        service: ECS service to scale
+        capacity: Config dict providing min_capacity and max_capacity
+        alb_resource_label: "<alb arn suffix>/<target group arn suffix>" for
+            RequestCountPerTarget tracking; omit for services without a target group
+
+    Returns:
+        Dict with the scalable target and created policies, or None if disabled.
+    """
+    if not autoscaling["enabled"]:
+        return None
+
+    prefix = f"{project_name}-{env}-{name}"
+
+    target = _scalable_target(prefix, service, capacity)
+
+    policies = {
+        "cpu": _target_tracking_policy(
+            f"{prefix}-cpu-tracking", target,
+            "ECSServiceAverageCPUUtilization", autoscaling["cpu_target"],
+        ),
+        "memory": _target_tracking_policy(
+            f"{prefix}-memory-tracking", target,
+            "ECSServiceAverageMemoryUtilization", autoscaling["memory_target"],
+        ),
+    }
+
+    if alb_resource_label is not None:
+        policies["requests"] = _target_tracking_policy(
+            f"{prefix}-requests-tracking", target,
+            "ALBRequestCountPerTarget", autoscaling["requests_per_target"],
+            resource_label=alb_resource_label,
+        )
+
+    step = autoscaling["step_scaling"]
+    if step["enabled"]:
+        step_policy = aws.appautoscaling.Policy(
+            f"{prefix}-cpu-step",
+            name=f"{prefix}-cpu-step",
+            policy_type="StepScaling",
+            resource_id=target.resource_id,
+            scalable_dimension=target.scalable_dimension,
+            service_namespace=target.service_namespace,
+            step_scaling_policy_configuration=aws.appautoscaling.PolicyStepScalingPolicyConfigurationArgs(
+                adjustment_type="ChangeInCapacity",
+                cooldown=step["cooldown"],
+                metric_aggregation_type="Maximum",
+                step_adjustments=_step_adjustments(step["steps"]),
+            ),
+        )
+
+        aws.cloudwatch.MetricAlarm(
+            f"{prefix}-cpu-step-alarm",
+            name=f"{prefix}-cpu-burst",
+            comparison_operator="GreaterThanOrEqualToThreshold",
+            evaluation_periods=step["evaluation_periods"],
+            metric_name="CPUUtilization",
+            namespace="AWS/ECS",
+            period=step["period"],
+            statistic="Maximum",
+            threshold=step["cpu_threshold"],
+            alarm_description=f"Step scale {name} when CPU bursts past {step['cpu_threshold']}%",
+            alarm_actions=[step_policy.arn],
+            dimensions={"ClusterName": cluster.name, "ServiceName": service.name},
+            tags=common_tags,
+        )
+
+        policies["cpu_step"] = step_policy
+
+    if automation["enabled"]:
+        # CPU bursts already drive the step policy; a CPU alarm would scale twice
+        _remediation_alarms(name, service, ["memory"] if step["enabled"] else ["cpu", "memory"])
+
+    return {"target": target, "policies": policies}
+
+
+def create_queue_backlog_autoscaling(name: str, service: aws.ecs.Service, capacity: dict):
+    """
+    Scale a queue worker service on BacklogPerTask instead of CPU.
+
+    Workers mostly wait on I/O, so CPU barely moves while queues back up.
+    BacklogPerTask (waiting jobs / running tasks) is published every minute
+    by the queue metrics collector Lambda.
+
+    Returns:
+        Dict with the scalable target and created policies, or None if disabled.
+    """
+    if not autoscaling["enabled"]:
+        return None
+
+    prefix = f"{project_name}-{env}-{name}"
+    target = _scalable_target(prefix, service, capacity)
+
+    backlog_policy = aws.appautoscaling.Policy(
+        f"{prefix}-backlog-tracking",
+        name=f"{prefix}-backlog-tracking",
+        policy_type="TargetTrackingScaling",
+        resource_id=target.resource_id,
+        scalable_dimension=target.scalable_dimension,
+        service_namespace=target.service_namespace,
+        target_tracking_scaling_policy_configuration=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationArgs(
+            target_value=queue_metrics["backlog_per_task_target"],
+            customized_metric_specification=aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationArgs(
+                metric_name="BacklogPerTask",
+                namespace=queue_metrics["namespace"],
+                statistic="Average",
+                dimensions=[
+                    aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationDimensionArgs(
+                        name="Environment",
+                        value=env,
+                    ),
+                    aws.appautoscaling.PolicyTargetTrackingScalingPolicyConfigurationCustomizedMetricSpecificationDimensionArgs(
+                        name="ServiceName",
+                        value=service.name,
+                    ),
+                ],
+            ),
+            scale_in_cooldown=autoscaling["scale_in_cooldown"],
+            scale_out_cooldown=autoscaling["scale_out_cooldown"],
+        ),
+    )
+
+    return {"target": target, "policies": {"backlog": backlog_policy}}
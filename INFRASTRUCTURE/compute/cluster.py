@@ -4,7 +4,7 @@ ECS Cluster configuration.
 
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags, is_production
+from config import project_name, env, common_tags, is_production, capacity_providers
 from networking import vpc
 
 # ECS Cluster
@@ -20,6 +20,51 @@ cluster = aws.ecs.Cluster(
     tags=common_tags,
 )
 
+# Fargate / Fargate Spot capacity providers (strategies per service in config.capacity_providers)
+if capacity_providers["enabled"]:
+    cluster_capacity_providers = aws.ecs.ClusterCapacityProviders(
+        f"{project_name}-{env}-cluster-capacity-providers",
+        cluster_name=cluster.name,
+        capacity_providers=["FARGATE", "FARGATE_SPOT"],
+        default_capacity_provider_strategies=[
+            aws.ecs.ClusterCapacityProvidersDefaultCapacityProviderStrategyArgs(
+                capacity_provider="FARGATE",
+                base=0,
+                weight=1,
+            )
+        ],
+    )
+else:
+    cluster_capacity_providers = None
+
+
+def service_placement(role: str) -> dict:
+    """
+    Launch arguments for an aws.ecs.Service of the given role.
+
+    Returns capacity_provider_strategies from config.capacity_providers, or
+    launch_type="FARGATE" when capacity providers are disabled.
+    """
+    if not capacity_providers["enabled"]:
+        return {"launch_type": "FARGATE"}
+
+    strategy = capacity_providers["strategies"][role]
+    providers = [
+        aws.ecs.ServiceCapacityProviderStrategyArgs(
+            capacity_provider="FARGATE",
+            base=strategy["base"],
+            weight=strategy["on_demand_weight"],
+        ),
+    ]
+    if strategy["spot_weight"]:
+        providers.append(aws.ecs.ServiceCapacityProviderStrategyArgs(
+            capacity_provider="FARGATE_SPOT",
+            weight=strategy["spot_weight"],
+        ))
+    # Strategy changes only take effect on a new deployment
+    return {"capacity_provider_strategies": providers, "force_new_deployment": True}
+
+
 # Security Group for ECS Tasks
 # Note: ALB security group reference will be added via security group rule after ALB is created
 ecs_security_group = aws.ec2.SecurityGroup(
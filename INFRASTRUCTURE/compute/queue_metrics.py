@@ -0,0 +1,135 @@
+"""
+Scheduled Lambda that publishes Horizon queue depth and job age to CloudWatch.
+
+The handler lives in queue_metrics_collector/index.py; see its docstring for
+the metrics it emits.
+"""
+
+import os
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, cache, queue_metrics
+from networking import vpc, private_subnets
+from database.elasticache import redis_endpoints, redis_clusters
+from .cluster import cluster
+
+if queue_metrics["enabled"]:
+    # IAM Role for the collector
+    collector_role = aws.iam.Role(
+        f"{project_name}-{env}-queue-metrics-role",
+        assume_role_policy=pulumi.Output.from_input({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Action": "sts:AssumeRole",
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": "lambda.amazonaws.com",
+                },
+            }],
+        }),
+        tags=common_tags,
+    )
+
+    # VPC access (includes basic execution / CloudWatch Logs)
+    aws.iam.RolePolicyAttachment(
+        f"{project_name}-{env}-queue-metrics-vpc",
+        role=collector_role.name,
+        policy_arn="arn:aws:iam::aws:policy/service-role/AWSLambdaVPCAccessExecutionRole",
+    )
+
+    aws.iam.RolePolicy(
+        f"{project_name}-{env}-queue-metrics-policy",
+        role=collector_role.id,
+        policy=pulumi.Output.from_input({
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Action": ["cloudwatch:PutMetricData"],
+                    "Resource": "*",
+                    "Condition": {
+                        "StringEquals": {"cloudwatch:namespace": queue_metrics["namespace"]},
+                    },
+                },
+                {
+                    "Effect": "Allow",
+                    "Action": ["ecs:DescribeServices"],
+                    "Resource": "*",
+                },
+            ],
+        }),
+    )
+
+    # Security Group for the collector (egress only; Redis allows the VPC CIDR)
+    collector_security_group = aws.ec2.SecurityGroup(
+        f"{project_name}-{env}-queue-metrics-sg",
+        description="Security group for the queue metrics collector Lambda",
+        vpc_id=vpc.id,
+        egress=[
+            aws.ec2.SecurityGroupEgressArgs(
+                from_port=0,
+                to_port=0,
+                protocol="-1",
+                cidr_blocks=["0.0.0.0/0"],
+            )
+        ],
+        tags={**common_tags, "Name": f"{project_name}-{env}-queue-metrics-sg"},
+    )
+
+    queue_metrics_lambda = aws.lambda_.Function(
+        f"{project_name}-{env}-queue-metrics",
+        name=f"{project_name}-{env}-queue-metrics",
+        runtime="python3.11",
+        role=collector_role.arn,
+        handler="index.lambda_handler",
+        code=pulumi.FileArchive(os.path.join(os.path.dirname(__file__), "queue_metrics_collector")),
+        timeout=30,
+        memory_size=128,
+        vpc_config=aws.lambda_.FunctionVpcConfigArgs(
+            subnet_ids=[subnet.id for subnet in private_subnets],
+            security_group_ids=[collector_security_group.id],
+        ),
+        environment=aws.lambda_.FunctionEnvironmentArgs(
+            variables={
+                "APP_ENV": env,
+                "METRIC_NAMESPACE": queue_metrics["namespace"],
+                "REDIS_HOST": redis_endpoints["queue"],
+                "REDIS_PORT": redis_clusters["queue"].port.apply(str),
+                "REDIS_TLS": "true" if cache["transit_encryption_enabled"] else "false",
+                "QUEUE_KEY_PREFIX": queue_metrics["key_prefix"],
+                "QUEUES": ",".join(queue_metrics["queues"]),
+                "CLUSTER_NAME": cluster.name,
+                "SERVICE_NAME": f"{project_name}-{env}-horizon",
+            },
+        ),
+        tags={**common_tags, "Name": f"{project_name}-{env}-queue-metrics"},
+    )
+
+    # Schedule
+    queue_metrics_schedule = aws.cloudwatch.EventRule(
+        f"{project_name}-{env}-queue-metrics-schedule",
+        name=f"{project_name}-{env}-queue-metrics",
+        description="Publish Horizon queue depth and job age",
+        schedule_expression=queue_metrics["schedule"],
+        tags=common_tags,
+    )
+
+    aws.cloudwatch.EventTarget(
+        f"{project_name}-{env}-queue-metrics-target",
+        rule=queue_metrics_schedule.name,
+        arn=queue_metrics_lambda.arn,
+    )
+
+    aws.lambda_.Permission(
+        f"{project_name}-{env}-queue-metrics-permission",
+        statement_id="AllowExecutionFromEventBridge",
+        action="lambda:InvokeFunction",
+        function=queue_metrics_lambda.name,
+        principal="events.amazonaws.com",
+        source_arn=queue_metrics_schedule.arn,
+    )
+
+    pulumi.export("queue_metrics_lambda_name", queue_metrics_lambda.name)
+
+else:
+    queue_metrics_lambda = None
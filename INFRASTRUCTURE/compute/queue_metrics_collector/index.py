@@ -0,0 +1,169 @@
+"""
+Horizon queue metrics collector (Lambda source).
+
+Runs on a schedule inside the VPC, reads Laravel Redis queue state and
+publishes it to CloudWatch:
+
+    <namespace> / {Environment, Queue}
+        QueueLength          - jobs waiting in queues:<name>
+        OldestJobAgeSeconds  - age of the job at the head of the list
+        DelayedJobs          - jobs in queues:<name>:delayed
+        ReservedJobs         - jobs in queues:<name>:reserved
+
+    <namespace> / {Environment, ServiceName}
+        BacklogTotal         - sum of QueueLength over all queues
+        BacklogPerTask       - BacklogTotal / running Horizon tasks
+
+BacklogPerTask is the metric Horizon's target tracking policy scales on.
+
+Only the standard library and boto3 (bundled with the Lambda runtime) are
+used; Redis is spoken to through a minimal RESP client so no layer or
+vendored dependency is needed.
+"""
+
+import json
+import os
+import socket
+import ssl
+import time
+
+import boto3
+
+NAMESPACE = os.environ.get("METRIC_NAMESPACE", "Fibonacco/Queues")
+ENVIRONMENT = os.environ.get("APP_ENV", "dev")
+REDIS_HOST = os.environ.get("REDIS_HOST", "")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
+REDIS_TLS = os.environ.get("REDIS_TLS", "true") == "true"
+KEY_PREFIX = os.environ.get("QUEUE_KEY_PREFIX", "laravel_database_")
+QUEUES = [q for q in os.environ.get("QUEUES", "default").split(",") if q]
+CLUSTER_NAME = os.environ.get("CLUSTER_NAME", "")
+SERVICE_NAME = os.environ.get("SERVICE_NAME", "")
+
+
+class RedisClient:
+    """Minimal RESP2 client supporting the handful of read commands we need."""
+
+    def __init__(self, host, port, use_tls=True, timeout=5):
+        sock = socket.create_connection((host, port), timeout=timeout)
+        if use_tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        self._sock = sock
+        self._file = sock.makefile("rb")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def execute(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = str(arg).encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RuntimeError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count == -1:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Unexpected RESP reply: {line!r}")
+
+
+def job_age_seconds(payload, now):
+    """Age of a queued job from its JSON payload (Horizon sets pushedAt)."""
+    if payload is None:
+        return 0.0
+    try:
+        job = json.loads(payload)
+    except (TypeError, ValueError):
+        return 0.0
+    pushed_at = job.get("pushedAt") or job.get("createdAt")
+    if pushed_at is None:
+        return 0.0
+    return max(0.0, now - float(pushed_at))
+
+
+def collect_queue_stats(redis, queues, prefix, now):
+    """Read length, delayed/reserved counts and head-of-queue age per queue."""
+    stats = {}
+    for queue in queues:
+        key = f"{prefix}queues:{queue}"
+        stats[queue] = {
+            "QueueLength": redis.execute("LLEN", key),
+            "DelayedJobs": redis.execute("ZCARD", f"{key}:delayed"),
+            "ReservedJobs": redis.execute("ZCARD", f"{key}:reserved"),
+            # Laravel RPUSHes and LPOPs, so index 0 is the oldest waiting job
+            "OldestJobAgeSeconds": job_age_seconds(redis.execute("LINDEX", key, 0), now),
+        }
+    return stats
+
+
+def build_metric_data(stats, running_tasks, environment, service_name):
+    """Convert queue stats into CloudWatch PutMetricData entries."""
+    data = []
+    for queue, values in stats.items():
+        dimensions = [
+            {"Name": "Environment", "Value": environment},
+            {"Name": "Queue", "Value": queue},
+        ]
+        for metric, value in values.items():
+            data.append({
+                "MetricName": metric,
+                "Dimensions": dimensions,
+                "Value": float(value),
+                "Unit": "Seconds" if metric == "OldestJobAgeSeconds" else "Count",
+            })
+
+    backlog = sum(values["QueueLength"] for values in stats.values())
+    service_dimensions = [
+        {"Name": "Environment", "Value": environment},
+        {"Name": "ServiceName", "Value": service_name},
+    ]
+    data.append({"MetricName": "BacklogTotal", "Dimensions": service_dimensions,
+                 "Value": float(backlog), "Unit": "Count"})
+    data.append({"MetricName": "BacklogPerTask", "Dimensions": service_dimensions,
+                 "Value": float(backlog) / max(running_tasks, 1), "Unit": "Count"})
+    return data
+
+
+def running_task_count(ecs, cluster, service):
+    response = ecs.describe_services(cluster=cluster, services=[service])
+    if not response["services"]:
+        return 0
+    return response["services"][0]["runningCount"]
+
+
+def lambda_handler(event, context):
+    redis = RedisClient(REDIS_HOST, REDIS_PORT, use_tls=REDIS_TLS)
+    try:
+        stats = collect_queue_stats(redis, QUEUES, KEY_PREFIX, time.time())
+    finally:
+        redis.close()
+
+    running = running_task_count(boto3.client("ecs"), CLUSTER_NAME, SERVICE_NAME)
+    data = build_metric_data(stats, running, ENVIRONMENT, SERVICE_NAME)
+
+    cloudwatch = boto3.client("cloudwatch")
+    # PutMetricData accepts at most 1000 entries per call; stay well below it
+    for start in range(0, len(data), 500):
+        cloudwatch.put_metric_data(Namespace=NAMESPACE, MetricData=data[start:start + 500])
+
+    return {"statusCode": 200, "body": json.dumps({"running_tasks": running, "queues": stats})}
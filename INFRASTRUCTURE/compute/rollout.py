@@ -0,0 +1,64 @@
+"""
+Rolling deployment duration estimate for ECS services behind the ALB.
+
+ECS replaces tasks in waves bounded by deployment_minimum_healthy_percent
+(how many old tasks may stop early) and deployment_maximum_percent (how many
+new tasks may start early). Each wave waits for task startup, the ALB
+healthy threshold and the deregistration delay of the tasks it replaces.
+Pure Python (no Pulumi imports) so profiles can be compared offline:
+
+    python compute/rollout.py 20 50 200
+    python compute/rollout.py <desired count> <min healthy %> <max %>
+
+with the remaining timings taken from DEFAULT_TIMINGS.
+"""
+
+import math
+import sys
+
+# Seconds; mirrors config.rollout for offline use
+DEFAULT_TIMINGS = {
+    "task_startup_seconds": 45,
+    "health_check_interval": 10,
+    "healthy_threshold": 2,
+    "deregistration_delay": 30,
+}
+
+
+def wave_size(desired_count, minimum_healthy_percent, maximum_percent):
+    """Tasks ECS can replace per wave (at least 1)."""
+    surge = math.floor(desired_count * maximum_percent / 100) - desired_count
+    may_stop = desired_count - math.ceil(desired_count * minimum_healthy_percent / 100)
+    return max(1, surge + may_stop)
+
+
+def estimate_rollout_seconds(desired_count, minimum_healthy_percent, maximum_percent, timings):
+    """
+    Estimate wall-clock seconds for a rolling deployment.
+
+    Returns:
+        (seconds, waves)
+    """
+    waves = math.ceil(desired_count / wave_size(desired_count, minimum_healthy_percent, maximum_percent))
+    per_wave = (
+        timings["task_startup_seconds"]
+        + timings["health_check_interval"] * timings["healthy_threshold"]
+        + timings["deregistration_delay"]
+    )
+    return waves * per_wave, waves
+
+
+def format_rollout_estimate(name, desired_count, minimum_healthy_percent, maximum_percent, timings):
+    """One-line summary for preview output."""
+    seconds, waves = estimate_rollout_seconds(desired_count, minimum_healthy_percent, maximum_percent, timings)
+    return (
+        f"Rollout {name}: {desired_count} tasks at {minimum_healthy_percent}-{maximum_percent}% "
+        f"in {waves} wave(s), ~{seconds // 60}m{seconds % 60:02d}s"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit("usage: python compute/rollout.py <desired count> <min healthy %> <max %>")
+    count, minimum, maximum = (int(arg) for arg in sys.argv[1:])
+    print(format_rollout_estimate("service", count, minimum, maximum, DEFAULT_TIMINGS))
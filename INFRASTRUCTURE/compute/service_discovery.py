@@ -1,10 +1,13 @@
 """
 AWS Cloud Map Service Discovery configuration for ECS services.
+
+The namespace backs both SSR discovery modes (config.ecs_ssr["discovery_mode"]):
+DNS records registered here, or ECS Service Connect.
 """
 
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags
+from config import project_name, env, common_tags, ecs_ssr
 from networking import vpc
 
 # Private DNS Namespace for service discovery
@@ -16,29 +19,38 @@ private_dns_namespace = aws.servicediscovery.PrivateDnsNamespace(
     tags=common_tags,
 )
 
-# Service Discovery Service for SSR
-ssr_service_discovery = aws.servicediscovery.Service(
-    f"{project_name}-{env}-ssr-discovery",
-    name="ssr",
-    description=f"Inertia SSR service discovery for {project_name} {env}",
-    dns_config=aws.servicediscovery.ServiceDnsConfigArgs(
-        namespace_id=private_dns_namespace.id,
-        dns_records=[
-            aws.servicediscovery.ServiceDnsConfigDnsRecordArgs(
-                ttl=60,
-                type="A",
-            )
-        ],
-        routing_policy="MULTIVALUE",
-    ),
-    health_check_custom_config=aws.servicediscovery.ServiceHealthCheckCustomConfigArgs(
-        failure_threshold=1,
-    ),
-    tags=common_tags,
-)
+# SSR address for web tasks. In service_connect mode the Cloud Map service is
+# created by ECS (compute/services.py) and "ssr" resolves to the local proxy.
+if ecs_ssr["discovery_mode"] == "service_connect":
+    ssr_service_discovery = None
+    ssr_url = f"http://ssr:{ecs_ssr['port']}"
+
+else:
+    # Service Discovery Service for SSR
+    ssr_service_discovery = aws.servicediscovery.Service(
+        f"{project_name}-{env}-ssr-discovery",
+        name="ssr",
+        description=f"Inertia SSR service discovery for {project_name} {env}",
+        dns_config=aws.servicediscovery.ServiceDnsConfigArgs(
+            namespace_id=private_dns_namespace.id,
+            dns_records=[
+                aws.servicediscovery.ServiceDnsConfigDnsRecordArgs(
+                    ttl=60,
+                    type="A",
+                )
+            ],
+            routing_policy="MULTIVALUE",
+        ),
+        health_check_custom_config=aws.servicediscovery.ServiceHealthCheckCustomConfigArgs(
+            failure_threshold=1,
+        ),
+        tags=common_tags,
+    )
+    ssr_url = f"http://ssr.{project_name}-{env}.local:{ecs_ssr['port']}"
+
+    pulumi.export("ssr_service_discovery_arn", ssr_service_discovery.arn)
+    pulumi.export("ssr_service_discovery_id", ssr_service_discovery.id)
 
 pulumi.export("service_discovery_namespace_id", private_dns_namespace.id)
 pulumi.export("service_discovery_namespace_name", private_dns_namespace.name)
-pulumi.export("ssr_service_discovery_arn", ssr_service_discovery.arn)
-pulumi.export("ssr_service_discovery_id", ssr_service_discovery.id)
-
+pulumi.export("ssr_url", ssr_url)
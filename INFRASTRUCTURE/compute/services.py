@@ -5,13 +5,56 @@ ECS Services configuration (SSR, Horizon, and web services).
 import json
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags, ecs, ecs_ssr, ecs_horizon
-from .cluster import cluster, ecs_security_group
-from .service_discovery import ssr_service_discovery
+from config import project_name, env, common_tags, ecs, ecs_ssr, ecs_horizon, autoscaling, queue_metrics, web_service_override_keys, builds, rollout, tracing, session_cookie, cache
+from .cluster import cluster, cluster_capacity_providers, ecs_security_group, service_placement
+from .autoscaling import create_service_autoscaling, create_queue_backlog_autoscaling
+from .rollout import format_rollout_estimate
+from .service_discovery import private_dns_namespace, ssr_service_discovery, ssr_url
+from .tracing import collector_policy_document, otel_environment, collector_dependency, collector_containers
 from networking import private_subnets
 from storage import repositories
 from secrets import app_secret
 
+
+def image_uri(repository: aws.ecr.Repository) -> pulumi.Output[str]:
+    """
+    Image reference for a task definition.
+
+    With builds["pin_image_digests"], resolves builds["deployed_tag"] to its
+    digest so tasks started later (scale-out, Spot replacement) run exactly
+    the image the pipeline last deployed. Falls back to :latest while the
+    repository has no deployed image (a new stack).
+    """
+    if not builds["pin_image_digests"]:
+        return repository.repository_url.apply(lambda url: f"{url}:latest")
+
+    def resolve(args):
+        url, name = args
+        try:
+            image = aws.ecr.get_image(repository_name=name, image_tag=builds["deployed_tag"])
+        except Exception:
+            pulumi.log.warn(f"No {builds['deployed_tag']} image in {name} yet; using :latest")
+            return f"{url}:latest"
+        return f"{url}@{image.image_digest}"
+
+    return pulumi.Output.all(repository.repository_url, repository.name).apply(resolve)
+
+
+def deployment_args(profile: dict, load_balanced: bool = False) -> dict:
+    """Rolling deployment settings for an aws.ecs.Service from an ecs profile and config.rollout."""
+    args = {
+        "deployment_minimum_healthy_percent": profile["deployment_minimum_healthy_percent"],
+        "deployment_maximum_percent": profile["deployment_maximum_percent"],
+        "deployment_circuit_breaker": aws.ecs.ServiceDeploymentCircuitBreakerArgs(
+            enable=rollout["circuit_breaker"],
+            rollback=rollout["circuit_breaker"],
+        ),
+    }
+    if load_balanced:
+        args["health_check_grace_period_seconds"] = profile["health_check_grace_period"]
+    return args
+
+
 # IAM Role for ECS Tasks
 task_execution_role = aws.iam.Role(
     f"{project_name}-{env}-task-execution-role",
@@ -74,6 +117,20 @@ task_role = aws.iam.Role(
     tags=common_tags,
 )
 
+# Tracing: the ADOT collector sidecar exports with the task role
+if tracing["enabled"]:
+    tracing_policy = aws.iam.Policy(
+        f"{project_name}-{env}-tracing-policy",
+        policy=json.dumps(collector_policy_document),
+        tags=common_tags,
+    )
+
+    aws.iam.RolePolicyAttachment(
+        f"{project_name}-{env}-tracing-policy-attachment",
+        role=task_role.name,
+        policy_arn=tracing_policy.arn,
+    )
+
 # Inertia SSR Task Definition
 ssr_task_definition = aws.ecs.TaskDefinition(
     f"{project_name}-{env}-ssr-task",
@@ -82,19 +139,26 @@ ssr_task_definition = aws.ecs.TaskDefinition(
     requires_compatibilities=["FARGATE"],
     cpu=str(ecs_ssr["cpu"]),
     memory=str(ecs_ssr["memory"]),
+    runtime_platform=aws.ecs.TaskDefinitionRuntimePlatformArgs(
+        operating_system_family="LINUX",
+        cpu_architecture=ecs_ssr["cpu_architecture"],
+    ),
     execution_role_arn=task_execution_role.arn,
     task_role_arn=task_role.arn,
     container_definitions=pulumi.Output.all(
-        url=repositories['inertia-ssr'].repository_url,
+        image=image_uri(repositories['inertia-ssr']),
         secret_arn=app_secret.arn
     ).apply(lambda args: json.dumps([{
         "name": "inertia-ssr",
-        "image": f"{args['url']}:latest",
+        "image": args["image"],
         "essential": True,
         "command": ["php", "artisan", "inertia:start-ssr"],
+        "stopTimeout": ecs_ssr["stop_timeout"],
         "portMappings": [{
+            "name": "ssr",  # Service Connect port name
             "containerPort": ecs_ssr["port"],
             "protocol": "tcp",
+            "appProtocol": "http",
         }],
         "environment": [
             {"name": "NODE_ENV", "value": env},
@@ -102,15 +166,20 @@ ssr_task_definition = aws.ecs.TaskDefinition(
             {"name": "APP_ENV", "value": env},
             {"name": "APP_DEBUG", "value": "false"},
             {"name": "DB_SSLMODE", "value": "require"},
-        ],
+        ] + otel_environment("ssr"),
         "secrets": [
             {"name": "DB_CONNECTION", "valueFrom": f"{args['secret_arn']}:DB_CONNECTION::"},
             {"name": "DB_HOST", "valueFrom": f"{args['secret_arn']}:DB_HOST::"},
+            {"name": "DB_READ_HOST", "valueFrom": f"{args['secret_arn']}:DB_READ_HOST::"},
             {"name": "DB_PORT", "valueFrom": f"{args['secret_arn']}:DB_PORT::"},
             {"name": "DB_DATABASE", "valueFrom": f"{args['secret_arn']}:DB_DATABASE::"},
             {"name": "DB_USERNAME", "valueFrom": f"{args['secret_arn']}:DB_USERNAME::"},
             {"name": "DB_PASSWORD", "valueFrom": f"{args['secret_arn']}:DB_PASSWORD::"},
             {"name": "REDIS_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_HOST::"},
+            {"name": "REDIS_READ_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_READ_HOST::"},
+            {"name": "REDIS_CACHE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_CACHE_HOST::"},
+            {"name": "REDIS_QUEUE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_QUEUE_HOST::"},
+            {"name": "REDIS_SESSION_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_SESSION_HOST::"},
             {"name": "REDIS_PORT", "valueFrom": f"{args['secret_arn']}:REDIS_PORT::"},
             {"name": "APP_KEY", "valueFrom": f"{args['secret_arn']}:APP_KEY::"},
         ],
@@ -122,7 +191,8 @@ ssr_task_definition = aws.ecs.TaskDefinition(
                 "awslogs-stream-prefix": "ecs",
             },
         },
-    }])),
+        **collector_dependency(),
+    }] + collector_containers(f"/ecs/{project_name}/{env}/ssr"))),
     tags=common_tags,
 )
 
@@ -134,6 +204,57 @@ ssr_log_group = aws.cloudwatch.LogGroup(
     tags=common_tags,
 )
 
+# Once Application Auto Scaling owns desired_count, don't reset it on every deploy.
+# Services referencing capacity providers must wait for the cluster association.
+scaled_service_opts = pulumi.ResourceOptions(
+    ignore_changes=["desired_count"] if autoscaling["enabled"] else None,
+    depends_on=[cluster_capacity_providers] if cluster_capacity_providers else None,
+)
+
+# SSR discovery: Service Connect server (web tasks are clients) or Cloud Map DNS
+ssr_service_connect = ecs_ssr["discovery_mode"] == "service_connect"
+
+
+def _service_connect_logs(log_group_name: str) -> aws.ecs.ServiceServiceConnectConfigurationLogConfigurationArgs:
+    """Send the Service Connect proxy's logs to the service's own log group."""
+    return aws.ecs.ServiceServiceConnectConfigurationLogConfigurationArgs(
+        log_driver="awslogs",
+        options={
+            "awslogs-group": log_group_name,
+            "awslogs-region": "us-east-1",
+            "awslogs-stream-prefix": "service-connect",
+        },
+    )
+
+
+if ssr_service_connect:
+    # Envoy handles pooling, retries and outlier ejection; "ssr" is the client alias
+    # (discovery name differs so it can't clash with the DNS-mode Cloud Map service)
+    ssr_discovery_args = {
+        "service_connect_configuration": aws.ecs.ServiceServiceConnectConfigurationArgs(
+            enabled=True,
+            namespace=private_dns_namespace.arn,
+            services=[aws.ecs.ServiceServiceConnectConfigurationServiceArgs(
+                port_name="ssr",
+                discovery_name="ssr-connect",
+                client_alias=[aws.ecs.ServiceServiceConnectConfigurationServiceClientAliasArgs(
+                    port=ecs_ssr["port"],
+                    dns_name="ssr",
+                )],
+                timeout=aws.ecs.ServiceServiceConnectConfigurationServiceTimeoutArgs(
+                    per_request_timeout_seconds=ecs_ssr["request_timeout"],
+                ),
+            )],
+            log_configuration=_service_connect_logs(f"/ecs/{project_name}/{env}/ssr"),
+        ),
+    }
+else:
+    ssr_discovery_args = {
+        "service_registries": aws.ecs.ServiceServiceRegistriesArgs(
+            registry_arn=ssr_service_discovery.arn,
+        ),
+    }
+
 # Inertia SSR Service with Service Discovery
 ssr_service = aws.ecs.Service(
     f"{project_name}-{env}-ssr-service",
@@ -141,19 +262,27 @@ ssr_service = aws.ecs.Service(
     cluster=cluster.arn,
     task_definition=ssr_task_definition.arn,
     desired_count=ecs_ssr["desired_count"],
-    launch_type="FARGATE",
+    **service_placement("ssr"),
+    **deployment_args(ecs),
     network_configuration=aws.ecs.ServiceNetworkConfigurationArgs(
         subnets=[subnet.id for subnet in private_subnets],
         security_groups=[ecs_security_group.id],
         assign_public_ip=False,
     ),
-    service_registries=aws.ecs.ServiceServiceRegistriesArgs(
-        registry_arn=ssr_service_discovery.arn,
-    ),
+    **ssr_discovery_args,
     enable_execute_command=True,
     tags=common_tags,
+    opts=scaled_service_opts,
 )
 
+ssr_autoscaling = create_service_autoscaling("ssr", ssr_service, ecs_ssr)
+
+# Sharded cache groups need Laravel's cluster connection (config/database.php)
+redis_cache_environment = [
+    {"name": "REDIS_CACHE_CONNECTION", "value": "cache_cluster"},
+    {"name": "REDIS_CACHE_READ_CONNECTION", "value": "cache_cluster"},
+] if cache["cluster_mode_enabled"] else []
+
 # Horizon Task Definition
 horizon_task_definition = aws.ecs.TaskDefinition(
     f"{project_name}-{env}-horizon-task",
@@ -162,32 +291,44 @@ horizon_task_definition = aws.ecs.TaskDefinition(
     requires_compatibilities=["FARGATE"],
     cpu=str(ecs_horizon["cpu"]),
     memory=str(ecs_horizon["memory"]),
+    runtime_platform=aws.ecs.TaskDefinitionRuntimePlatformArgs(
+        operating_system_family="LINUX",
+        cpu_architecture=ecs_horizon["cpu_architecture"],
+    ),
     execution_role_arn=task_execution_role.arn,
     task_role_arn=task_role.arn,
     container_definitions=pulumi.Output.all(
-        url=repositories['base-app'].repository_url,
+        image=image_uri(repositories['base-app']),
         secret_arn=app_secret.arn
     ).apply(lambda args: json.dumps([{
         "name": "horizon",
-        "image": f"{args['url']}:latest",
+        "image": args["image"],
         "essential": True,
         "command": ["php", "artisan", "horizon"],
+        # Horizon stops taking jobs on SIGTERM and finishes the running ones
+        "stopTimeout": ecs_horizon["stop_timeout"],
         "environment": [
             {"name": "APP_ENV", "value": env},
             {"name": "APP_DEBUG", "value": "false"},
             {"name": "QUEUE_CONNECTION", "value": "redis"},
             {"name": "CACHE_STORE", "value": "redis"},
             {"name": "SESSION_DRIVER", "value": "redis"},
+            {"name": "SESSION_CONNECTION", "value": "session"},
             {"name": "DB_SSLMODE", "value": "require"},
-        ],
+        ] + redis_cache_environment + otel_environment("horizon"),
         "secrets": [
             {"name": "DB_CONNECTION", "valueFrom": f"{args['secret_arn']}:DB_CONNECTION::"},
             {"name": "DB_HOST", "valueFrom": f"{args['secret_arn']}:DB_HOST::"},
+            {"name": "DB_READ_HOST", "valueFrom": f"{args['secret_arn']}:DB_READ_HOST::"},
             {"name": "DB_PORT", "valueFrom": f"{args['secret_arn']}:DB_PORT::"},
             {"name": "DB_DATABASE", "valueFrom": f"{args['secret_arn']}:DB_DATABASE::"},
             {"name": "DB_USERNAME", "valueFrom": f"{args['secret_arn']}:DB_USERNAME::"},
             {"name": "DB_PASSWORD", "valueFrom": f"{args['secret_arn']}:DB_PASSWORD::"},
             {"name": "REDIS_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_HOST::"},
+            {"name": "REDIS_READ_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_READ_HOST::"},
+            {"name": "REDIS_CACHE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_CACHE_HOST::"},
+            {"name": "REDIS_QUEUE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_QUEUE_HOST::"},
+            {"name": "REDIS_SESSION_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_SESSION_HOST::"},
             {"name": "REDIS_PORT", "valueFrom": f"{args['secret_arn']}:REDIS_PORT::"},
             {"name": "APP_KEY", "valueFrom": f"{args['secret_arn']}:APP_KEY::"},
         ],
@@ -199,7 +340,8 @@ horizon_task_definition = aws.ecs.TaskDefinition(
                 "awslogs-stream-prefix": "ecs",
             },
         },
-    }])),
+        **collector_dependency(),
+    }] + collector_containers(f"/ecs/{project_name}/{env}/horizon"))),
     tags=common_tags,
 )
 
@@ -218,7 +360,8 @@ horizon_service = aws.ecs.Service(
     cluster=cluster.arn,
     task_definition=horizon_task_definition.arn,
     desired_count=ecs_horizon["desired_count"],
-    launch_type="FARGATE",
+    **service_placement("horizon"),
+    **deployment_args(ecs),
     network_configuration=aws.ecs.ServiceNetworkConfigurationArgs(
         subnets=[subnet.id for subnet in private_subnets],
         security_groups=[ecs_security_group.id],
@@ -226,26 +369,55 @@ horizon_service = aws.ecs.Service(
     ),
     enable_execute_command=True,
     tags=common_tags,
+    opts=scaled_service_opts,
 )
 
+# Horizon workers wait on I/O, so scale on queue backlog when it is being published
+if queue_metrics["enabled"]:
+    horizon_autoscaling = create_queue_backlog_autoscaling("horizon", horizon_service, ecs_horizon)
+else:
+    horizon_autoscaling = create_service_autoscaling("horizon", horizon_service, ecs_horizon)
+
+
+# Log groups of the web services created so far, by site (request metrics read these)
+web_log_groups = {}
+
+
+def web_service_profile(domain_config: dict) -> dict:
+    """Shared ecs profile with the site's sizing and architecture overrides applied."""
+    return {**ecs, **{key: domain_config[key] for key in web_service_override_keys if key in domain_config}}
+
+
+def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.Output[str],
+                       alb_resource_label: pulumi.Output[str] = None):
+    """
+    Create a web service (GoEventCity, Day.News, or Downtown Guide).
+
+    Sizing comes from web_service_profile(domain_config). alb_resource_label
+    ("<alb arn suffix>/<target group arn suffix>") enables
+    RequestCountPerTarget scaling in addition to CPU and memory.
+    """
+    profile = web_service_profile(domain_config)
 
-def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.Output[str]):
-    """Create a web service (GoEventCity, Day.News, or Downtown Guide)."""
     task_def = aws.ecs.TaskDefinition(
         f"{project_name}-{env}-{name}-task",
         family=f"{project_name}-{env}-{name}",
         network_mode="awsvpc",
         requires_compatibilities=["FARGATE"],
-        cpu=str(ecs["cpu"]),
-        memory=str(ecs["memory"]),
+        cpu=str(profile["cpu"]),
+        memory=str(profile["memory"]),
+        runtime_platform=aws.ecs.TaskDefinitionRuntimePlatformArgs(
+            operating_system_family="LINUX",
+            cpu_architecture=profile["cpu_architecture"],
+        ),
         execution_role_arn=task_execution_role.arn,
         task_role_arn=task_role.arn,
         container_definitions=pulumi.Output.all(
-            url=repositories[name].repository_url,
+            image=image_uri(repositories[name]),
             secret_arn=app_secret.arn
         ).apply(lambda args: json.dumps([{
             "name": name,
-            "image": f"{args['url']}:latest",
+            "image": args["image"],
             "essential": True,
             "portMappings": [{
                 "containerPort": 8000,
@@ -258,22 +430,35 @@ def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.
                 {"name": "CACHE_STORE", "value": "redis"},
                 {"name": "QUEUE_CONNECTION", "value": "redis"},
                 {"name": "SESSION_DRIVER", "value": "redis"},
+                {"name": "SESSION_CONNECTION", "value": "session"},
+                # Pinned to the cookie the CDN cache key varies on
+                {"name": "SESSION_COOKIE", "value": session_cookie},
                 {"name": "LOG_CHANNEL", "value": "stderr"},  # Log to stderr for CloudWatch
+                # One JSON object per line, so metric filters and Logs Insights can read fields
+                {"name": "LOG_STDERR_FORMATTER", "value": "Monolog\\Formatter\\JsonFormatter"},
                 {"name": "LOG_LEVEL", "value": "debug" if env == "dev" else "info"},
-                {"name": "INERTIA_SSR_URL", "value": f"http://ssr.{project_name}-{env}.local:13714"},
+                # Site dimension of the per-request log line (monitoring/request_metrics.py)
+                {"name": "REQUEST_METRICS_SITE", "value": name},
+                {"name": "INERTIA_SSR_URL", "value": ssr_url},
                 {"name": "INERTIA_SSR_ENABLED", "value": "true"},
                 {"name": "REDIS_SCHEME", "value": "tls"},
                 {"name": "REDIS_TLS", "value": "true"},
                 {"name": "DB_SSLMODE", "value": "require"},
-            ],
+                {"name": "PHP_FPM_PM_MAX_CHILDREN", "value": str(profile["php_fpm_workers"])},
+            ] + redis_cache_environment + otel_environment(name),
             "secrets": [
                 {"name": "DB_CONNECTION", "valueFrom": f"{args['secret_arn']}:DB_CONNECTION::"},
                 {"name": "DB_HOST", "valueFrom": f"{args['secret_arn']}:DB_HOST::"},
+                {"name": "DB_READ_HOST", "valueFrom": f"{args['secret_arn']}:DB_READ_HOST::"},
                 {"name": "DB_PORT", "valueFrom": f"{args['secret_arn']}:DB_PORT::"},
                 {"name": "DB_DATABASE", "valueFrom": f"{args['secret_arn']}:DB_DATABASE::"},
                 {"name": "DB_USERNAME", "valueFrom": f"{args['secret_arn']}:DB_USERNAME::"},
                 {"name": "DB_PASSWORD", "valueFrom": f"{args['secret_arn']}:DB_PASSWORD::"},
                 {"name": "REDIS_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_HOST::"},
+                {"name": "REDIS_READ_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_READ_HOST::"},
+                {"name": "REDIS_CACHE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_CACHE_HOST::"},
+                {"name": "REDIS_QUEUE_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_QUEUE_HOST::"},
+                {"name": "REDIS_SESSION_HOST", "valueFrom": f"{args['secret_arn']}:REDIS_SESSION_HOST::"},
                 {"name": "REDIS_PORT", "valueFrom": f"{args['secret_arn']}:REDIS_PORT::"},
                 {"name": "APP_KEY", "valueFrom": f"{args['secret_arn']}:APP_KEY::"},
             ],
@@ -285,7 +470,8 @@ def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.
                     "awslogs-stream-prefix": "ecs",
                 },
             },
-        }])),
+            **collector_dependency(),
+        }] + collector_containers(f"/ecs/{project_name}/{env}/{name}"))),
         tags=common_tags,
     )
 
@@ -296,6 +482,7 @@ def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.
         retention_in_days=7,
         tags=common_tags,
     )
+    web_log_groups[name] = log_group
 
     # Service
     service = aws.ecs.Service(
@@ -303,8 +490,15 @@ def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.
         name=f"{project_name}-{env}-{name}",
         cluster=cluster.arn,
         task_definition=task_def.arn,
-        desired_count=ecs["desired_count"],
-        launch_type="FARGATE",
+        desired_count=profile["desired_count"],
+        **service_placement("web"),
+        **deployment_args(profile, load_balanced=True),
+        # Client-only Service Connect: resolves the "ssr" alias through the local proxy
+        service_connect_configuration=aws.ecs.ServiceServiceConnectConfigurationArgs(
+            enabled=True,
+            namespace=private_dns_namespace.arn,
+            log_configuration=_service_connect_logs(f"/ecs/{project_name}/{env}/{name}"),
+        ) if ssr_service_connect else None,
         network_configuration=aws.ecs.ServiceNetworkConfigurationArgs(
             subnets=[subnet.id for subnet in private_subnets],
             security_groups=[ecs_security_group.id],
@@ -319,7 +513,20 @@ def create_web_service(name: str, domain_config: dict, target_group_arn: pulumi.
         ],
         enable_execute_command=True,
         tags=common_tags,
+        opts=scaled_service_opts,
     )
 
+    create_service_autoscaling(name, service, profile, alb_resource_label=alb_resource_label)
+
+    if pulumi.runtime.is_dry_run():
+        # Worst case: a deploy while scaled out to max_capacity
+        pulumi.log.info(format_rollout_estimate(
+            name,
+            profile["max_capacity"],
+            profile["deployment_minimum_healthy_percent"],
+            profile["deployment_maximum_percent"],
+            rollout,
+        ))
+
     return service
 
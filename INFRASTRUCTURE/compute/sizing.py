@@ -0,0 +1,150 @@
+"""
+Offline Fargate sizing report for the web services.
+
+Reads Container Insights utilization exported from CloudWatch as long-format
+CSV (one datapoint per row) and recommends a task size per service:
+
+    Timestamp,ServiceName,MetricName,Value
+    2026-10-01T00:00:00Z,fibonacco-production-goeventcity,CpuUtilized,212.5
+    2026-10-01T00:00:00Z,fibonacco-production-goeventcity,MemoryUtilized,640
+    2026-10-01T00:00:00Z,fibonacco-production-goeventcity,RunningTaskCount,2
+
+CpuUtilized (CPU units) and MemoryUtilized (MiB) are service totals, so they
+are divided by RunningTaskCount for the same timestamp. The recommendation
+keeps p95 per-task CPU under CPU_HEADROOM of the task and peak per-task memory
+under MEMORY_HEADROOM, then picks the cheapest valid Fargate combination.
+Pure Python (no Pulumi imports):
+
+    python compute/sizing.py utilization.csv [more.csv ...]
+
+The printed snippets go into config.domains (see web_service_override_keys).
+"""
+
+import csv
+import math
+import sys
+from collections import defaultdict
+
+# Target utilization at p95 CPU / peak memory
+CPU_HEADROOM = 0.6
+MEMORY_HEADROOM = 0.8
+
+# Valid Fargate (cpu units -> memory MiB) combinations
+FARGATE_SIZES = {
+    256: [512, 1024, 2048],
+    512: [1024 * gib for gib in range(1, 5)],
+    1024: [1024 * gib for gib in range(2, 9)],
+    2048: [1024 * gib for gib in range(4, 17)],
+    4096: [1024 * gib for gib in range(8, 31)],
+}
+
+# us-east-1 Linux/x86 on-demand
+PRICE_PER_VCPU_HOUR = 0.04048
+PRICE_PER_GB_HOUR = 0.004445
+HOURS_PER_MONTH = 730
+
+# PHP-FPM children per task: roughly one worker per 64 MiB of task memory
+FPM_WORKER_MEMORY_MIB = 64
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def load_datapoints(paths):
+    """Return {service: {timestamp: {metric: value}}} from exported CSVs."""
+    services = defaultdict(lambda: defaultdict(dict))
+    for path in paths:
+        with open(path, newline="") as handle:
+            for row in csv.DictReader(handle):
+                services[row["ServiceName"]][row["Timestamp"]][row["MetricName"]] = float(row["Value"])
+    return services
+
+
+def per_task_usage(samples):
+    """Per-task (cpu units, memory MiB) for each timestamp with all three metrics."""
+    cpu, memory = [], []
+    for metrics in samples.values():
+        tasks = metrics.get("RunningTaskCount")
+        if not tasks or "CpuUtilized" not in metrics or "MemoryUtilized" not in metrics:
+            continue
+        cpu.append(metrics["CpuUtilized"] / tasks)
+        memory.append(metrics["MemoryUtilized"] / tasks)
+    return cpu, memory
+
+
+def monthly_cost(cpu, memory, tasks):
+    """On-demand monthly cost of `tasks` running tasks of the given size."""
+    hourly = cpu / 1024 * PRICE_PER_VCPU_HOUR + memory / 1024 * PRICE_PER_GB_HOUR
+    return hourly * HOURS_PER_MONTH * tasks
+
+
+def recommend_size(cpu_needed, memory_needed):
+    """Cheapest Fargate (cpu, memory) covering the requirement, or the largest size."""
+    candidates = [
+        (monthly_cost(cpu, memory, 1), cpu, memory)
+        for cpu, memories in FARGATE_SIZES.items()
+        for memory in memories
+        if cpu >= cpu_needed and memory >= memory_needed
+    ]
+    if not candidates:
+        largest = max(FARGATE_SIZES)
+        return largest, FARGATE_SIZES[largest][-1]
+    _, cpu, memory = min(candidates)
+    return cpu, memory
+
+
+def build_report(services):
+    """Return a list of recommendation dicts, one per service with usable data."""
+    report = []
+    for service, samples in sorted(services.items()):
+        cpu, memory = per_task_usage(samples)
+        if not cpu:
+            continue
+        cpu_p95 = percentile(cpu, 95)
+        memory_peak = max(memory)
+        task_cpu, task_memory = recommend_size(cpu_p95 / CPU_HEADROOM, memory_peak / MEMORY_HEADROOM)
+        tasks = [metrics["RunningTaskCount"] for metrics in samples.values() if metrics.get("RunningTaskCount")]
+        avg_tasks = sum(tasks) / len(tasks)
+        report.append({
+            "service": service,
+            "datapoints": len(cpu),
+            "cpu_p95": cpu_p95,
+            "memory_peak": memory_peak,
+            "cpu": task_cpu,
+            "memory": task_memory,
+            "php_fpm_workers": max(2, task_memory // FPM_WORKER_MEMORY_MIB),
+            "min_tasks": int(min(tasks)),
+            "max_tasks": int(max(tasks)),
+            "monthly_cost": monthly_cost(task_cpu, task_memory, avg_tasks),
+        })
+    return report
+
+
+def format_report(report):
+    """Render the recommendations and config.domains override snippets."""
+    lines = []
+    for item in report:
+        lines.append(
+            f"{item['service']}: {item['datapoints']} datapoints, "
+            f"p95 cpu {item['cpu_p95']:.0f} units/task, peak memory {item['memory_peak']:.0f} MiB/task, "
+            f"tasks {item['min_tasks']}-{item['max_tasks']}"
+        )
+        lines.append(
+            f"  recommend {item['cpu']} cpu / {item['memory']} MiB "
+            f"(~${item['monthly_cost']:.2f}/month at average task count)"
+        )
+        lines.append(
+            f'  "cpu": {item["cpu"]}, "memory": {item["memory"]}, '
+            f'"php_fpm_workers": {item["php_fpm_workers"]},'
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python compute/sizing.py utilization.csv [more.csv ...]")
+    print(format_report(build_report(load_datapoints(sys.argv[1:]))))
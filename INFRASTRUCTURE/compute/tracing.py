@@ -0,0 +1,90 @@
+"""
+OpenTelemetry tracing for ECS tasks (config.tracing).
+
+When enabled, every task definition gets an ADOT collector sidecar and the
+application container gets OTEL_* settings pointing at it over localhost
+(tasks use awsvpc networking, so containers share one network namespace).
+The collector receives OTLP and exports traces to X-Ray and metrics to
+CloudWatch via EMF. With tracing disabled the SDK is switched off so
+instrumented apps don't try to reach a collector that isn't there.
+"""
+
+from config import project_name, env, tracing, aws_region
+
+COLLECTOR_CONTAINER = "aws-otel-collector"
+OTLP_HTTP_ENDPOINT = "http://localhost:4318"
+
+# Task role permissions needed by the collector's awsxray and awsemf exporters
+collector_policy_document = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": [
+                "xray:PutTraceSegments",
+                "xray:PutTelemetryRecords",
+                "xray:GetSamplingRules",
+                "xray:GetSamplingTargets",
+                "xray:GetSamplingStatisticSummaries",
+            ],
+            "Resource": "*",
+        },
+        {
+            "Effect": "Allow",
+            "Action": [
+                "logs:CreateLogGroup",
+                "logs:CreateLogStream",
+                "logs:PutLogEvents",
+                "logs:DescribeLogStreams",
+                "logs:DescribeLogGroups",
+            ],
+            "Resource": f"arn:aws:logs:{aws_region}:*:log-group:/aws/ecs/application/metrics*",
+        },
+    ],
+}
+
+
+def otel_environment(service_name: str) -> list:
+    """OTEL_* container environment for an application container."""
+    if not tracing["enabled"]:
+        return [{"name": "OTEL_SDK_DISABLED", "value": "true"}]
+    return [
+        {"name": "OTEL_SERVICE_NAME", "value": service_name},
+        {"name": "OTEL_RESOURCE_ATTRIBUTES",
+         "value": f"deployment.environment={env},service.namespace={project_name}"},
+        {"name": "OTEL_EXPORTER_OTLP_ENDPOINT", "value": OTLP_HTTP_ENDPOINT},
+        {"name": "OTEL_EXPORTER_OTLP_PROTOCOL", "value": "http/protobuf"},
+        {"name": "OTEL_PROPAGATORS", "value": "tracecontext,baggage"},
+        {"name": "OTEL_TRACES_SAMPLER", "value": "parentbased_traceidratio"},
+        {"name": "OTEL_TRACES_SAMPLER_ARG", "value": str(tracing["sampling_rate"])},
+        {"name": "OTEL_PHP_AUTOLOAD_ENABLED", "value": "true"},
+    ]
+
+
+def collector_dependency() -> dict:
+    """dependsOn for the application container, so early spans aren't dropped."""
+    if not tracing["enabled"]:
+        return {}
+    return {"dependsOn": [{"containerName": COLLECTOR_CONTAINER, "condition": "START"}]}
+
+
+def collector_containers(log_group_name: str) -> list:
+    """The collector sidecar definition (empty when tracing is disabled)."""
+    if not tracing["enabled"]:
+        return []
+    return [{
+        "name": COLLECTOR_CONTAINER,
+        "image": tracing["collector_image"],
+        # Losing the collector costs spans, not requests
+        "essential": False,
+        "command": [f"--config={tracing['collector_config']}"],
+        "memoryReservation": tracing["collector_memory_reservation"],
+        "logConfiguration": {
+            "logDriver": "awslogs",
+            "options": {
+                "awslogs-group": log_group_name,
+                "awslogs-region": aws_region,
+                "awslogs-stream-prefix": "otel",
+            },
+        },
+    }]
@@ -5,6 +5,8 @@ Environment-aware configuration that scales resources appropriately
 for dev, staging, and production environments.
 """
 
+import re
+
 import pulumi
 
 # Get current stack (environment) name
@@ -25,6 +27,20 @@ common_tags = {
 }
 
 
+def laravel_slug(value: str, separator: str = "_") -> str:
+    """Laravel's Str::slug for ASCII input, used for names Laravel derives from APP_NAME."""
+    value = value.replace("-" if separator == "_" else "_", separator).replace("@", f"{separator}at{separator}")
+    value = re.sub(rf"[^{re.escape(separator)}\w\s]+", "", value.lower())
+    value = re.sub(rf"[{re.escape(separator)}\s]+", separator, value)
+    return value.strip(separator)
+
+
+# APP_NAME the application image runs with (config/app.php default: "Laravel").
+# Laravel derives the session cookie and Redis key prefix from it.
+app_name = pulumi.Config().get("app_name") or "Laravel"
+session_cookie = pulumi.Config().get("session_cookie") or f"{laravel_slug(app_name)}_session"
+
+
 # =============================================================================
 # NETWORKING CONFIGURATION
 # =============================================================================
@@ -35,6 +51,13 @@ networking = {
     "private_subnet_cidrs": ["10.0.10.0/24", "10.0.20.0/24"] if not is_production else ["10.0.10.0/24", "10.0.20.0/24", "10.0.30.0/24"],
     "enable_nat_gateway": True,
     "single_nat_gateway": not is_production,  # Cost saving for non-prod
+    # VPC endpoints keep AWS API traffic off the NAT gateway. The S3 gateway
+    # endpoint is free; interface endpoints are billed per AZ-hour and per GB.
+    "vpc_endpoints": {
+        "s3_gateway": True,
+        "interface_enabled": True,
+        "interface_services": ["ecr.api", "ecr.dkr", "secretsmanager", "logs", "monitoring", "ecs"],
+    },
 }
 
 
@@ -53,6 +76,22 @@ database = {
     "skip_final_snapshot": not is_production,
     "deletion_protection": is_production,
     "performance_insights_enabled": is_production or is_staging,
+    # Cross-AZ read replicas behind a weighted DNS reader endpoint (DB_READ_HOST)
+    "read_replica_count": 2 if is_production else (1 if is_staging else 0),
+    "read_replica_instance_class": "db.r6g.large" if is_production else "db.t3.small",
+    # Custom parameter group (database/parameters.py derives memory settings from instance_class)
+    "parameter_overrides": {},
+    "maintenance_window": "sun:04:00-sun:05:00",  # UTC
+    # One-time reboot to apply static parameters, e.g. "at(2026-11-01T04:00:00)"; None = reboot manually
+    "static_parameter_reboot_at": None,
+    # RDS Proxy pooling in front of the writer; DB_HOST points at the proxy when enabled
+    "proxy": {
+        "enabled": is_production or is_staging,
+        "max_connections_percent": 90 if is_production else 75,  # Of the instance's max_connections
+        "max_idle_connections_percent": 50 if is_production else 25,
+        "connection_borrow_timeout": 30,  # Seconds a client waits for a pooled connection
+        "idle_client_timeout": 1800,  # Seconds
+    },
 }
 
 
@@ -63,8 +102,37 @@ cache = {
     "engine": "redis",
     "engine_version": "7.0",
     "node_type": "cache.r6g.large" if is_production else ("cache.t3.small" if is_staging else "cache.t3.micro"),
-    "num_cache_nodes": 2 if is_production else 1,
+    "num_cache_nodes": 2 if is_production else 1,  # Primary + replicas when cluster mode is disabled
     "automatic_failover_enabled": is_production,
+    # Cluster mode (sharding) for the cache group: num_node_groups shards, each
+    # with replicas_per_node_group replicas. Off by default; turning it on needs
+    # separate_roles (Horizon and the queue metrics collector can't follow
+    # MOVED redirects) and switches the app's cache store to the cache_cluster
+    # connection in config/database.php.
+    "cluster_mode_enabled": False,
+    "num_node_groups": 2 if is_production else 1,
+    "replicas_per_node_group": 1 if is_production else 0,
+    # Redis roles. With separate_roles, queue and session data get their own
+    # replication groups so cache pressure can't evict jobs or sessions and hot
+    # cache keys don't slow queue pops. Otherwise every role shares the cache
+    # group, which then uses shared_maxmemory_policy.
+    "separate_roles": is_production or is_staging,
+    "shared_maxmemory_policy": "volatile-lru",
+    "roles": {
+        "cache": {
+            "maxmemory_policy": "allkeys-lru",
+        },
+        "queue": {
+            "maxmemory_policy": "noeviction",
+            "node_type": "cache.r6g.large" if is_production else "cache.t3.micro",
+            "num_cache_nodes": 2 if is_production else 1,
+        },
+        "session": {
+            "maxmemory_policy": "volatile-lru",
+            "node_type": "cache.t4g.medium" if is_production else "cache.t3.micro",
+            "num_cache_nodes": 2 if is_production else 1,
+        },
+    },
     "at_rest_encryption_enabled": True,
     "transit_encryption_enabled": True,
 }
@@ -82,8 +150,30 @@ ecs = {
     "health_check_grace_period": 60,
     "deployment_minimum_healthy_percent": 50 if is_production else 0,
     "deployment_maximum_percent": 200,
+    "php_fpm_workers": 10 if is_production else 5,  # pm.max_children, passed as PHP_FPM_PM_MAX_CHILDREN (serversideup/php)
+    # Graviton where web runs on-demand; Fargate Spot only runs X86_64, so the
+    # Spot-backed dev/staging web services stay on x86 (images are multi-arch)
+    "cpu_architecture": "ARM64" if is_production else "X86_64",
+}
+
+# Rollout profile: ALB drain/health-check cadence and the deployment circuit
+# breaker (compute/rollout.py estimates rollout duration from these plus the
+# ecs deployment percentages)
+rollout = {
+    "circuit_breaker": True,  # Stop and roll back deployments whose tasks keep failing
+    "deregistration_delay": 30 if is_production else 10,  # Seconds to drain in-flight requests
+    "health_check_interval": 10,  # Seconds
+    "health_check_timeout": 5,  # Seconds
+    "healthy_threshold": 2,
+    "unhealthy_threshold": 3,
+    "task_startup_seconds": 45,  # Image pull + boot, for the duration estimate only
 }
 
+# Keys a site in `domains` may set to override the shared `ecs` profile
+web_service_override_keys = (
+    "cpu", "memory", "desired_count", "min_capacity", "max_capacity", "php_fpm_workers", "cpu_architecture",
+)
+
 # Inertia SSR specific
 ecs_ssr = {
     "cpu": 256,
@@ -92,6 +182,13 @@ ecs_ssr = {
     "min_capacity": 2 if is_production else 1,
     "max_capacity": 10 if is_production else 2,
     "port": 13714,
+    # How web reaches SSR. "service_connect": ECS Service Connect (Envoy sidecar)
+    # with pooled connections, retries, outlier ejection and per-request
+    # metrics. "dns": Cloud Map MULTIVALUE A records (fallback).
+    "discovery_mode": "service_connect",
+    "request_timeout": 15,  # Seconds per render through Service Connect
+    "cpu_architecture": "X86_64",  # Runs on Fargate Spot (see capacity_providers)
+    "stop_timeout": 30,  # Seconds between SIGTERM and SIGKILL
 }
 
 # Horizon (queue worker)
@@ -101,6 +198,80 @@ ecs_horizon = {
     "desired_count": 1,
     "min_capacity": 1,
     "max_capacity": 4 if is_production else 2,
+    "cpu_architecture": "X86_64",  # Runs on Fargate Spot (see capacity_providers)
+    # Seconds Horizon gets to finish in-flight jobs after SIGTERM (Fargate max 120,
+    # matching the Spot interruption notice). Keep supervisor timeouts below this.
+    "stop_timeout": 120,
+}
+
+# Fargate capacity providers per service role. `base` tasks always run
+# on-demand; beyond that, tasks split FARGATE:FARGATE_SPOT by weight.
+# Spot only suits roles that tolerate interruption: SSR is stateless and
+# Horizon drains on SIGTERM, so both lean on Spot everywhere; web stays
+# on-demand in production. Fargate Spot has no ARM64 capacity: a role with a
+# spot_weight must use X86_64 (checked at the end of this file).
+capacity_providers = {
+    "enabled": True,
+    "strategies": {
+        "web": {
+            "base": 0,
+            "on_demand_weight": 1 if is_production else 0,
+            "spot_weight": 0 if is_production else 1,
+        },
+        "ssr": {
+            "base": 1 if is_production else 0,
+            "on_demand_weight": 1 if is_production else 0,
+            "spot_weight": 3 if is_production else 1,
+        },
+        "horizon": {
+            "base": 1 if is_production else 0,
+            "on_demand_weight": 1 if is_production else 0,
+            "spot_weight": 3 if is_production else 1,
+        },
+    },
+}
+
+# Horizon queue backlog metrics (collector Lambda in compute/queue_metrics.py)
+# When enabled, Horizon scales on backlog per task instead of CPU/memory
+queue_metrics = {
+    "enabled": True,
+    "namespace": "Fibonacco/Queues",
+    "schedule": "rate(1 minute)",
+    "key_prefix": f"{laravel_slug(app_name)}_database_",  # Laravel REDIS_PREFIX default
+    "queues": [
+        "default",
+        "collection",
+        "classification",
+        "refresh",
+        "rollout",
+        "breaking",
+        "emergency-critical",
+    ],
+    # Acceptable waiting jobs per Horizon task (latency target / avg job time)
+    "backlog_per_task_target": 50 if is_production else 100,
+}
+
+# Application Auto Scaling (bounds come from min_capacity/max_capacity above)
+autoscaling = {
+    "enabled": True,
+    "cpu_target": 60,  # Target tracking: average CPU %
+    "memory_target": 75,  # Target tracking: average memory %
+    "requests_per_target": 1000 if is_production else 500,  # ALB RequestCountPerTarget (web only)
+    "scale_out_cooldown": 60,  # Seconds
+    "scale_in_cooldown": 300,  # Seconds
+    # Step scaling on CPU for bursts that target tracking reacts to too slowly
+    "step_scaling": {
+        "enabled": True,
+        "cpu_threshold": 85,
+        "period": 60,
+        "evaluation_periods": 1,
+        "cooldown": 60,
+        # Bounds are relative to cpu_threshold; None means unbounded
+        "steps": [
+            {"lower": 0, "upper": 10, "adjustment": 1},
+            {"lower": 10, "upper": None, "adjustment": 3},
+        ],
+    },
 }
 
 
@@ -114,6 +285,19 @@ storage = {
         "glacier_after_days": 365,
         "deep_archive_after_days": 1825,  # 5 years
     },
+    # ALB access logs under a prefix of the archive bucket, queried with Athena
+    # (loadbalancing/access_logs.py). They expire before DEEP_ARCHIVE, which
+    # Athena can't read.
+    "alb_access_logs": {
+        "enabled": True,
+        "prefix": "alb-access-logs",
+        "expire_after_days": 365 if is_production else 30,
+        # First day of the Glue partition projection (yyyy/MM/dd)
+        "projection_start": "2026/10/01",
+    },
+    # Athena query results, also in the archive bucket
+    "athena_results_prefix": "athena-results",
+    "athena_results_expire_after_days": 7,
 }
 
 
@@ -126,6 +310,59 @@ cdn = {
     "default_ttl": 300,  # 5 minutes
     "max_ttl": 3600,  # 1 hour
     "min_ttl": 0,
+    "static_ttl": 31536000,  # 1 year for hashed /build assets and media
+    # Paths served from app_bucket (CI syncs public/build to s3://<app bucket>/build/)
+    "s3_paths": ["/build/*", "/media/*"],
+    # Request headers that vary cached pages besides Host. Inertia visits send
+    # these and get a JSON page object (or a partial one) instead of HTML at the
+    # same URL; CloudFront ignores Vary, so they must be in the cache key.
+    "cache_key_headers": [
+        "X-Inertia",
+        "X-Inertia-Version",
+        "X-Inertia-Partial-Component",
+        "X-Inertia-Partial-Data",
+        "X-Inertia-Partial-Except",
+    ],
+    # Cookies that vary cached pages; web containers get SESSION_COOKIE set to this
+    "cache_key_cookies": [session_cookie],
+    # How CloudFront reaches the ALB. The ALB needs a forwarding listener for
+    # it (loadbalancing/alb.py alb_origin_protocols), otherwise no distributions
+    # are created; switch to "https-only" once the HTTPS listener exists.
+    "origin_protocol_policy": "http-only",
+    "origin_shield_region": "us-east-1",
+    # ACM certificate ARNs (us-east-1) by domain key. Sites without one get no
+    # distribution: without the alias, the ALB would see the CloudFront hostname
+    "certificate_arns": pulumi.Config().get_object("cdn_certificate_arns") or {},
+}
+
+
+# =============================================================================
+# CI/CD CONFIGURATION
+# =============================================================================
+# Every image is built natively on each architecture and merged into one
+# multi-arch manifest, so services can switch cpu_architecture freely.
+builds = {
+    "architectures": {
+        "X86_64": {
+            "platform": "linux/amd64",
+            "environment_type": "LINUX_CONTAINER",
+            "image": "aws/codebuild/standard:7.0",
+            "compute_type": "BUILD_GENERAL1_MEDIUM",
+        },
+        "ARM64": {
+            "platform": "linux/arm64",
+            "environment_type": "ARM_CONTAINER",
+            "image": "aws/codebuild/amazonlinux-aarch64-standard:3.0",
+            "compute_type": "BUILD_GENERAL1_LARGE",
+        },
+    },
+    # Task definitions reference the digest behind deployed_tag instead of a
+    # tag. The pipeline moves deployed_tag only after a service's ECS deploy
+    # succeeds, so a `pulumi up` between the Manifest and Deploy stages keeps
+    # the running images (SSR-first ordering and the skew check still hold).
+    # Repositories without the tag yet (new stack) fall back to :latest.
+    "pin_image_digests": True,
+    "deployed_tag": "deployed",
 }
 
 
@@ -134,6 +371,9 @@ cdn = {
 # =============================================================================
 # All 5 applications share the same infrastructure but use different domains
 # Domain-based routing in Laravel handles app selection
+# Sites may override the ecs profile with any of web_service_override_keys,
+# e.g. "cpu": 1024 if is_production else 256. compute/sizing.py recommends
+# values from exported CloudWatch utilization.
 domains = {
     "goeventcity": {
         "domain": "goeventcity.com" if is_production else f"{env}.goeventcity.com",
@@ -174,6 +414,44 @@ monitoring = {
     "db_cpu_alarm_threshold": 80,
     "db_connections_alarm_threshold": 100,
     "cache_evictions_alarm_threshold": 1000,
+    # Per-site SLOs over ALB target metrics, alarmed by burn rate (monitoring/slo.py).
+    # Latency: latency_target % of requests within latency_threshold_seconds
+    # (the p99 objective when the target is 99).
+    "slo": {
+        "availability_target": 99.9,
+        "latency_target": 99.0,
+        "latency_threshold_seconds": 1.0 if is_production else 2.0,
+        # Windows with fewer requests than this don't count against the budget
+        "min_requests": 100,
+        # Burn rate = budget spend speed; both windows must exceed it to alarm
+        "burn_rates": {
+            "fast": {"burn_rate": 14.4, "long_window": 3600, "short_window": 300},
+            "slow": {"burn_rate": 6, "long_window": 21600, "short_window": 1800},
+        },
+    },
+    # Horizon: alarm when backlog per task stays this many times the scaling target
+    "horizon_backlog_alarm_factor": 3,
+    "queue_age_alarm_seconds": 900,
+    # Metrics from structured request logs (monitoring/request_metrics.py)
+    "request_metrics": {
+        "enabled": True,
+        "namespace": "Fibonacco/Requests",
+        # Requests running at least this many queries are N+1 suspects
+        "n_plus_one_query_threshold": 20,
+    },
+}
+
+# Distributed tracing: ADOT collector sidecar in every task (compute/tracing.py).
+# Apps export OTLP to the sidecar, which forwards traces to X-Ray and metrics to
+# CloudWatch (EMF). Sampling is parent-based, so SSR renders and queued jobs
+# follow the decision of the web request that started them.
+tracing = {
+    "enabled": True,
+    "sampling_rate": 1.0 if is_dev else (0.25 if is_staging else 0.05),
+    "collector_image": "public.ecr.aws/aws-observability/aws-otel-collector:v0.43.1",
+    # OTLP (gRPC 4317, HTTP 4318) -> awsxray + awsemf, shipped in the image
+    "collector_config": "/etc/ecs/ecs-default-config.yaml",
+    "collector_memory_reservation": 64,
 }
 
 
@@ -183,6 +461,48 @@ monitoring = {
 automation = {
     "enabled": is_production or is_staging,
     "max_auto_scale_ceiling": 50,  # Hard limit for automatic scaling
-    "scale_up_percentage": 50,  # Increase by 50% when auto-scaling
+    "scale_up_percentage": 50,  # Max increase per scaling action (proportional to the breach)
     "cooldown_minutes": 5,
+    # Only alarms named "<project>-<env>-...<suffix>" trigger the controller. Alarms
+    # that already drive Application Auto Scaling policies (e.g. the cpu-burst
+    # step alarms) must not use it, or the service gets scaled twice.
+    "alarm_suffix": "-auto-remediate",
+    # Sustained saturation alarms on each CPU/memory-scaled ECS service
+    # (compute/autoscaling.py). Services with the cpu-burst step policy get the
+    # memory alarm only; queue workers scaled on backlog get none.
+    "alarms": {
+        "cpu": {"metric_name": "CPUUtilization", "threshold": 90, "period": 60, "evaluation_periods": 3},
+        "memory": {"metric_name": "MemoryUtilization", "threshold": 90, "period": 60, "evaluation_periods": 3},
+    },
 }
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+def _check_spot_architectures():
+    """Fargate Spot only places X86_64 tasks; reject ARM64 services with a Spot weight."""
+    if not capacity_providers["enabled"]:
+        return
+    profiles = [("ssr", "ssr", ecs_ssr), ("horizon", "horizon", ecs_horizon)] + [
+        (name, "web", {**ecs, **domain_config}) for name, domain_config in domains.items()
+    ]
+    for name, role, profile in profiles:
+        if profile["cpu_architecture"] == "ARM64" and capacity_providers["strategies"][role]["spot_weight"]:
+            raise ValueError(
+                f"{name}: cpu_architecture ARM64 can't run on FARGATE_SPOT "
+                f"(capacity_providers['strategies']['{role}']['spot_weight'] > 0); use X86_64 or drop the Spot weight"
+            )
+
+
+def _check_redis_cluster_mode():
+    """Only the cache role can be sharded; queue and session data must stay on single-shard groups."""
+    if cache["cluster_mode_enabled"] and not cache["separate_roles"]:
+        raise ValueError(
+            "cache['cluster_mode_enabled'] requires cache['separate_roles']: queue and session data would share "
+            "the sharded cache group, which Horizon and the queue metrics collector can't use"
+        )
+
+
+_check_spot_architectures()
+_check_redis_cluster_mode()
@@ -4,12 +4,18 @@ Database module for Fibonacco infrastructure.
 Exports:
     db_instance: RDS PostgreSQL instance
     db_endpoint: RDS endpoint URL
+    db_read_host: Reader host (replicas, or the writer when there are none)
+    db_proxy_endpoint: RDS Proxy endpoint (None when pooling is disabled)
     redis_cluster: ElastiCache Redis cluster
     redis_endpoint: Redis endpoint URL
+    redis_reader_endpoint: Redis reader endpoint URL (replicas)
+    redis_clusters: Redis replication groups by role (cache, queue, session)
+    redis_endpoints: Redis write endpoints by role
 """
 
-from .rds import db_instance, db_endpoint
-from .elasticache import redis_cluster, redis_endpoint
+from .rds import db_instance, db_endpoint, db_read_host
+from .proxy import db_proxy, db_proxy_endpoint
+from .elasticache import redis_cluster, redis_endpoint, redis_reader_endpoint, redis_clusters, redis_endpoints
 
-__all__ = ["db_instance", "db_endpoint", "redis_cluster", "redis_endpoint"]
+__all__ = ["db_instance", "db_endpoint", "db_read_host", "db_proxy", "db_proxy_endpoint", "redis_cluster", "redis_endpoint", "redis_reader_endpoint", "redis_clusters", "redis_endpoints"]
 
@@ -1,5 +1,17 @@
 """
 ElastiCache Redis configuration.
+
+Cache, queue and session data can live in separate replication groups
+(config.cache["separate_roles"]), each with a role-appropriate eviction
+policy. The cache group supports two topologies via
+config.cache["cluster_mode_enabled"]:
+- Disabled (default): one shard with num_cache_nodes nodes (primary + read
+  replicas). Writes go to the primary endpoint; the reader endpoint is
+  REDIS_READ_HOST, used by the app's redis_read cache store.
+- Enabled: num_node_groups shards with replicas_per_node_group replicas each.
+  Clients connect to the configuration endpoint and route by hash slot; the
+  app's cache stores use the cache_cluster connection. Requires
+  separate_roles (checked in config.py).
 """
 
 import pulumi
@@ -39,40 +51,112 @@ cache_security_group = aws.ec2.SecurityGroup(
     tags={**common_tags, "Name": f"{project_name}-{env}-cache-sg"},
 )
 
-# Parameter Group for Redis
-cache_parameter_group = aws.elasticache.ParameterGroup(
-    f"{project_name}-{env}-cache-params",
-    family=f"redis{cache['engine_version'].split('.')[0]}",
-    parameters=[
+cluster_mode_enabled = cache["cluster_mode_enabled"]
+redis_family = f"redis{cache['engine_version'].split('.')[0]}"
+
+
+def create_redis_group(role: str, resource_prefix: str, params_name: str, maxmemory_policy: str,
+                       node_type: str, topology: dict, sharded: bool = False):
+    """
+    Create a parameter group and replication group for one Redis role.
+
+    Returns:
+        Tuple of (replication group, write endpoint, read endpoint)
+    """
+    parameters = [
         aws.elasticache.ParameterGroupParameterArgs(
             name="maxmemory-policy",
-            value="allkeys-lru",
+            value=maxmemory_policy,
         ),
-    ],
-    tags={**common_tags, "Name": f"{project_name}-{env}-cache-params"},
-)
+    ]
+    if sharded:
+        parameters.append(
+            aws.elasticache.ParameterGroupParameterArgs(
+                name="cluster-enabled",
+                value="yes",
+            )
+        )
 
-# ElastiCache Replication Group (for high availability)
-redis_cluster = aws.elasticache.ReplicationGroup(
-    f"{project_name}-{env}-redis",
-    replication_group_id=f"{project_name}-{env}-redis",
-    description=f"Redis cluster for {project_name} {env}",
-    engine=cache["engine"],
-    engine_version=cache["engine_version"],
+    parameter_group = aws.elasticache.ParameterGroup(
+        params_name,
+        family=redis_family,
+        parameters=parameters,
+        tags={**common_tags, "Name": params_name, "RedisRole": role},
+    )
+
+    group = aws.elasticache.ReplicationGroup(
+        resource_prefix,
+        replication_group_id=resource_prefix,
+        description=f"Redis {role} cluster for {project_name} {env}",
+        engine=cache["engine"],
+        engine_version=cache["engine_version"],
+        node_type=node_type,
+        port=6379,
+        parameter_group_name=parameter_group.name,
+        subnet_group_name=cache_subnet_group.name,
+        security_group_ids=[cache_security_group.id],
+        at_rest_encryption_enabled=cache["at_rest_encryption_enabled"],
+        transit_encryption_enabled=cache["transit_encryption_enabled"],
+        # Cluster mode requires automatic failover
+        automatic_failover_enabled=cache["automatic_failover_enabled"] or sharded,
+        tags={**common_tags, "Name": resource_prefix, "RedisRole": role},
+        **topology,
+    )
+
+    # Cluster mode exposes a single configuration endpoint for reads and writes;
+    # otherwise writes go to the primary and reads are spread over replicas
+    if sharded:
+        return group, group.configuration_endpoint_address, group.configuration_endpoint_address
+    return group, group.primary_endpoint_address, group.reader_endpoint_address
+
+
+# Cache role (the original cluster; keeps its resource names). Cluster mode
+# applies only here: Horizon queues need single-slot keys and sessions are small.
+if cluster_mode_enabled:
+    cache_topology = {
+        "num_node_groups": cache["num_node_groups"],
+        "replicas_per_node_group": cache["replicas_per_node_group"],
+    }
+else:
+    cache_topology = {"num_cache_clusters": cache["num_cache_nodes"]}
+
+redis_cluster, redis_endpoint, redis_reader_endpoint = create_redis_group(
+    role="cache",
+    resource_prefix=f"{project_name}-{env}-redis",
+    params_name=f"{project_name}-{env}-cache-params",
+    maxmemory_policy=(
+        cache["roles"]["cache"]["maxmemory_policy"] if cache["separate_roles"]
+        else cache["shared_maxmemory_policy"]
+    ),
     node_type=cache["node_type"],
-    num_cache_clusters=cache["num_cache_nodes"],
-    port=6379,
-    parameter_group_name=cache_parameter_group.name,
-    subnet_group_name=cache_subnet_group.name,
-    security_group_ids=[cache_security_group.id],
-    at_rest_encryption_enabled=cache["at_rest_encryption_enabled"],
-    transit_encryption_enabled=cache["transit_encryption_enabled"],
-    automatic_failover_enabled=cache["automatic_failover_enabled"],
-    tags={**common_tags, "Name": f"{project_name}-{env}-redis"},
+    topology=cache_topology,
+    sharded=cluster_mode_enabled,
 )
 
-redis_endpoint = redis_cluster.configuration_endpoint_address or redis_cluster.primary_endpoint_address
+# Per-role clusters and write endpoints ("cache", "queue", "session")
+redis_clusters = {"cache": redis_cluster}
+redis_endpoints = {"cache": redis_endpoint}
+
+for role, role_config in cache["roles"].items():
+    if role == "cache":
+        continue
+    if not cache["separate_roles"]:
+        # Logical sharing: the role points at the cache cluster
+        redis_clusters[role] = redis_cluster
+        redis_endpoints[role] = redis_endpoint
+        continue
+    group, endpoint, _ = create_redis_group(
+        role=role,
+        resource_prefix=f"{project_name}-{env}-redis-{role}",
+        params_name=f"{project_name}-{env}-redis-{role}-params",
+        maxmemory_policy=role_config["maxmemory_policy"],
+        node_type=role_config["node_type"],
+        topology={"num_cache_clusters": role_config["num_cache_nodes"]},
+    )
+    redis_clusters[role] = group
+    redis_endpoints[role] = endpoint
 
 pulumi.export("redis_endpoint", redis_endpoint)
+pulumi.export("redis_reader_endpoint", redis_reader_endpoint)
 pulumi.export("redis_port", redis_cluster.port)
-
+pulumi.export("redis_role_endpoints", redis_endpoints)
@@ -0,0 +1,147 @@
+"""
+PostgreSQL parameter group builder.
+
+Derives memory-based settings from the RDS instance class through a lookup
+table and adds fixed tuning for gp3 storage, autovacuum and
+pg_stat_statements. Pure Python (no Pulumi imports) so the effective values
+can be inspected offline:
+
+    python database/parameters.py db.r6g.large
+
+Units follow the RDS parameter group conventions: shared_buffers and
+effective_cache_size in 8 kB pages, work_mem and maintenance_work_mem in kB.
+"""
+
+import sys
+
+# Instance class -> (memory GiB, vCPUs)
+INSTANCE_CLASSES = {
+    "db.t3.micro": (1, 2),
+    "db.t3.small": (2, 2),
+    "db.t3.medium": (4, 2),
+    "db.t3.large": (8, 2),
+    "db.t4g.micro": (1, 2),
+    "db.t4g.small": (2, 2),
+    "db.t4g.medium": (4, 2),
+    "db.t4g.large": (8, 2),
+    "db.m6g.large": (8, 2),
+    "db.m6g.xlarge": (16, 4),
+    "db.m6g.2xlarge": (32, 8),
+    "db.r6g.large": (16, 2),
+    "db.r6g.xlarge": (32, 4),
+    "db.r6g.2xlarge": (64, 8),
+    "db.r6g.4xlarge": (128, 16),
+}
+
+# Stock RDS PostgreSQL 15 values, for the preview diff
+RDS_DEFAULTS = {
+    "shared_buffers": "{DBInstanceClassMemory/32768}",
+    "effective_cache_size": "{DBInstanceClassMemory/16384}",
+    "work_mem": "4096",
+    "maintenance_work_mem": "GREATEST({DBInstanceClassMemory*1024/63963136},65536)",
+    "random_page_cost": "4",
+    "effective_io_concurrency": "1",
+    "autovacuum_max_workers": "3",
+    "autovacuum_naptime": "15",
+    "autovacuum_vacuum_scale_factor": "0.1",
+    "autovacuum_analyze_scale_factor": "0.05",
+    "autovacuum_vacuum_cost_limit": "-1",
+    "shared_preload_libraries": "pg_stat_statements",
+    "pg_stat_statements.max": "5000",
+    "pg_stat_statements.track": "top",
+    "track_io_timing": "0",
+    "log_min_duration_statement": "-1",
+}
+
+# Parameters that only take effect after a reboot
+STATIC_PARAMETERS = {
+    "shared_buffers",
+    "autovacuum_max_workers",
+    "shared_preload_libraries",
+    "pg_stat_statements.max",
+}
+
+KB_PER_GIB = 1024 * 1024
+PAGE_KB = 8
+
+
+def instance_profile(instance_class):
+    """Return (memory GiB, vCPUs) for an RDS instance class."""
+    try:
+        return INSTANCE_CLASSES[instance_class]
+    except KeyError:
+        raise ValueError(
+            f"Unknown RDS instance class {instance_class!r}; add it to INSTANCE_CLASSES in database/parameters.py"
+        ) from None
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def build_parameters(instance_class, overrides=None):
+    """
+    Compute tuned parameters for an instance class.
+
+    Returns:
+        Dict of name -> {"value": str, "apply_method": "immediate" | "pending-reboot"}
+    """
+    memory_gib, vcpus = instance_profile(instance_class)
+    memory_kb = memory_gib * KB_PER_GIB
+
+    values = {
+        # 25% of RAM for Postgres buffers, 75% assumed available as OS cache
+        "shared_buffers": memory_kb // 4 // PAGE_KB,
+        "effective_cache_size": memory_kb * 3 // 4 // PAGE_KB,
+        # Per sort/hash node; pooled connections keep concurrency bounded
+        "work_mem": _clamp(memory_kb // 512, 4096, 65536),
+        "maintenance_work_mem": _clamp(memory_kb // 20, 65536, 2 * KB_PER_GIB),
+        # gp3 is SSD: random reads cost about the same as sequential
+        "random_page_cost": "1.1",
+        "effective_io_concurrency": 200,
+        # Vacuum large, write-heavy tables sooner and faster
+        "autovacuum_max_workers": max(3, vcpus),
+        "autovacuum_naptime": 15,
+        "autovacuum_vacuum_scale_factor": "0.05",
+        "autovacuum_analyze_scale_factor": "0.02",
+        "autovacuum_vacuum_cost_limit": 2000,
+        # Query statistics
+        "shared_preload_libraries": "pg_stat_statements",
+        "pg_stat_statements.max": 10000,
+        "pg_stat_statements.track": "all",
+        "track_io_timing": 1,
+        "log_min_duration_statement": 1000,  # ms
+    }
+    values.update(overrides or {})
+
+    return {
+        name: {
+            "value": str(value),
+            "apply_method": "pending-reboot" if name in STATIC_PARAMETERS else "immediate",
+        }
+        for name, value in values.items()
+    }
+
+
+def format_parameter_diff(instance_class, parameters):
+    """Render an RDS-default vs effective table for preview output."""
+    rows = [("parameter", "rds default", "effective", "apply")]
+    for name in sorted(parameters):
+        rows.append((
+            name,
+            RDS_DEFAULTS.get(name, "-"),
+            parameters[name]["value"],
+            parameters[name]["apply_method"],
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = [f"PostgreSQL parameters for {instance_class}:"]
+    for row in rows:
+        lines.append("  " + "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    classes = sys.argv[1:] or ["db.t3.micro", "db.t3.small", "db.r6g.large"]
+    for name in classes:
+        print(format_parameter_diff(name, build_parameters(name)))
+        print()
@@ -0,0 +1,111 @@
+"""
+RDS Proxy connection pooling for PostgreSQL.
+
+Web, SSR and Horizon tasks each hold their own PHP-FPM/worker connections;
+at full scale-out that is far more than the writer can sustain. The proxy
+multiplexes them onto a bounded pool sized per environment in
+config.database["proxy"].
+"""
+
+import json
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, database
+from networking import private_subnets
+from .rds import db_instance, db_password, db_security_group
+
+proxy_config = database["proxy"]
+
+if proxy_config["enabled"]:
+    # Credentials secret in the username/password shape RDS Proxy expects
+    proxy_credentials = aws.secretsmanager.Secret(
+        f"{project_name}-{env}-db-proxy-credentials",
+        name=f"fibonacco/{env}/db-proxy-credentials",
+        description=f"RDS Proxy credentials for {project_name} {env}",
+        tags=common_tags,
+    )
+
+    aws.secretsmanager.SecretVersion(
+        f"{project_name}-{env}-db-proxy-credentials-version",
+        secret_id=proxy_credentials.id,
+        secret_string=pulumi.Output.all(password=db_password).apply(lambda args: json.dumps({
+            "username": "postgres",
+            "password": args["password"],
+        })),
+    )
+
+    # IAM Role allowing the proxy to read its credentials
+    proxy_role = aws.iam.Role(
+        f"{project_name}-{env}-db-proxy-role",
+        assume_role_policy=pulumi.Output.from_input({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Action": "sts:AssumeRole",
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": "rds.amazonaws.com",
+                },
+            }],
+        }),
+        tags=common_tags,
+    )
+
+    aws.iam.RolePolicy(
+        f"{project_name}-{env}-db-proxy-policy",
+        role=proxy_role.id,
+        policy=proxy_credentials.arn.apply(lambda arn: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Action": ["secretsmanager:GetSecretValue"],
+                "Resource": arn,
+            }],
+        })),
+    )
+
+    # The DB security group already admits 5432 from the VPC
+    db_proxy = aws.rds.Proxy(
+        f"{project_name}-{env}-db-proxy",
+        name=f"{project_name}-{env}-db-proxy",
+        engine_family="POSTGRESQL",
+        role_arn=proxy_role.arn,
+        vpc_subnet_ids=[subnet.id for subnet in private_subnets],
+        vpc_security_group_ids=[db_security_group.id],
+        require_tls=True,
+        idle_client_timeout=proxy_config["idle_client_timeout"],
+        auths=[
+            aws.rds.ProxyAuthArgs(
+                auth_scheme="SECRETS",
+                iam_auth="DISABLED",
+                secret_arn=proxy_credentials.arn,
+            )
+        ],
+        tags={**common_tags, "Name": f"{project_name}-{env}-db-proxy"},
+    )
+
+    aws.rds.ProxyDefaultTargetGroup(
+        f"{project_name}-{env}-db-proxy-target-group",
+        db_proxy_name=db_proxy.name,
+        connection_pool_config=aws.rds.ProxyDefaultTargetGroupConnectionPoolConfigArgs(
+            max_connections_percent=proxy_config["max_connections_percent"],
+            max_idle_connections_percent=proxy_config["max_idle_connections_percent"],
+            connection_borrow_timeout=proxy_config["connection_borrow_timeout"],
+            # Laravel issues SET statements on connect; don't pin sessions for them
+            session_pinning_filters=["EXCLUDE_VARIABLE_SETS"],
+        ),
+    )
+
+    aws.rds.ProxyTarget(
+        f"{project_name}-{env}-db-proxy-target",
+        db_proxy_name=db_proxy.name,
+        target_group_name="default",
+        db_instance_identifier=db_instance.identifier,
+    )
+
+    db_proxy_endpoint = db_proxy.endpoint
+
+    pulumi.export("db_proxy_endpoint", db_proxy_endpoint)
+
+else:
+    db_proxy = None
+    db_proxy_endpoint = None
@@ -1,11 +1,22 @@
 """
 RDS PostgreSQL database configuration.
+
+Optional read replicas (config.database["read_replica_count"]) are spread
+across availability zones. Their addresses sit behind a weighted CNAME in a
+private hosted zone so the app sees a single reader host (DB_READ_HOST);
+without replicas the reader host is the writer.
+
+The writer and the replicas each get a tuned parameter group built by
+parameters.py for their own instance class; preview logs the effective
+values against the RDS defaults.
 """
 
+import json
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags, database
+from config import project_name, env, common_tags, database, networking
 from networking import vpc, private_subnets
+from .parameters import build_parameters, format_parameter_diff
 
 # Subnet Group for RDS
 db_subnet_group = aws.rds.SubnetGroup(
@@ -40,10 +51,33 @@ db_security_group = aws.ec2.SecurityGroup(
     tags={**common_tags, "Name": f"{project_name}-{env}-db-sg"},
 )
 
-# RDS Parameter Group
-# Using default parameter group to avoid static parameter issues
-# Custom parameters can be set later via RDS console or separate parameter group
-db_parameter_group = None  # Use default parameter group
+# RDS Parameter Groups
+# Dynamic parameters apply immediately; static ones (shared_buffers,
+# shared_preload_libraries, ...) are pending-reboot and take effect at the
+# next reboot, optionally scheduled via static_parameter_reboot_at below.
+def create_parameter_group(name, instance_class, parameters):
+    """Parameter group holding `parameters` built for `instance_class`."""
+    if pulumi.runtime.is_dry_run():
+        pulumi.log.info(format_parameter_diff(instance_class, parameters))
+
+    return aws.rds.ParameterGroup(
+        f"{project_name}-{env}-{name}",
+        family=f"{database['engine']}{database['engine_version']}",
+        description=f"Tuned PostgreSQL parameters for {project_name} {env} ({instance_class})",
+        parameters=[
+            aws.rds.ParameterGroupParameterArgs(
+                name=parameter_name,
+                value=parameter["value"],
+                apply_method=parameter["apply_method"],
+            )
+            for parameter_name, parameter in sorted(parameters.items())
+        ],
+        tags={**common_tags, "Name": f"{project_name}-{env}-{name}"},
+    )
+
+
+db_parameters = build_parameters(database["instance_class"], database["parameter_overrides"])
+db_parameter_group = create_parameter_group("db-params", database["instance_class"], db_parameters)
 
 # Get database password from config (should be set as secret)
 config = pulumi.Config()
@@ -65,7 +99,9 @@ db_instance = aws.rds.Instance(
     password=db_password,
     db_subnet_group_name=db_subnet_group.name,
     vpc_security_group_ids=[db_security_group.id],
-    # parameter_group_name=db_parameter_group.name if db_parameter_group else None,  # Use default
+    parameter_group_name=db_parameter_group.name,
+    maintenance_window=database["maintenance_window"],
+    apply_immediately=False,
     multi_az=database["multi_az"],
     backup_retention_period=database["backup_retention_period"],
     skip_final_snapshot=database["skip_final_snapshot"],
@@ -78,6 +114,120 @@ db_instance = aws.rds.Instance(
 
 db_endpoint = db_instance.endpoint
 
+# Controlled one-time reboot to pick up pending static parameters
+if database["static_parameter_reboot_at"]:
+    reboot_role = aws.iam.Role(
+        f"{project_name}-{env}-db-reboot-role",
+        assume_role_policy=pulumi.Output.from_input({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Action": "sts:AssumeRole",
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": "scheduler.amazonaws.com",
+                },
+            }],
+        }),
+        tags=common_tags,
+    )
+
+    aws.iam.RolePolicy(
+        f"{project_name}-{env}-db-reboot-policy",
+        role=reboot_role.id,
+        policy=db_instance.arn.apply(lambda arn: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Action": ["rds:RebootDBInstance"],
+                "Resource": arn,
+            }],
+        })),
+    )
+
+    aws.scheduler.Schedule(
+        f"{project_name}-{env}-db-parameter-reboot",
+        name=f"{project_name}-{env}-db-parameter-reboot",
+        description="Reboot the writer once to apply static parameter group changes",
+        schedule_expression=database["static_parameter_reboot_at"],
+        schedule_expression_timezone="UTC",
+        flexible_time_window=aws.scheduler.ScheduleFlexibleTimeWindowArgs(mode="OFF"),
+        target=aws.scheduler.ScheduleTargetArgs(
+            arn="arn:aws:scheduler:::aws-sdk:rds:rebootDBInstance",
+            role_arn=reboot_role.arn,
+            input=db_instance.identifier.apply(lambda identifier: json.dumps({
+                "DbInstanceIdentifier": identifier,
+            })),
+        ),
+    )
+
+# Read Replicas (cross-AZ), with memory settings sized for their own class
+availability_zones = networking["availability_zones"]
+db_replicas = []
+if database["read_replica_count"]:
+    db_replica_parameters = build_parameters(database["read_replica_instance_class"], database["parameter_overrides"])
+    db_replica_parameter_group = create_parameter_group(
+        "db-replica-params", database["read_replica_instance_class"], db_replica_parameters,
+    )
+else:
+    db_replica_parameter_group = None
+
+for idx in range(database["read_replica_count"]):
+    replica = aws.rds.Instance(
+        f"{project_name}-{env}-db-replica-{idx+1}",
+        identifier=f"{project_name}-{env}-db-replica-{idx+1}",
+        replicate_source_db=db_instance.identifier,
+        parameter_group_name=db_replica_parameter_group.name,
+        instance_class=database["read_replica_instance_class"],
+        # RDS places the writer itself (and Multi-AZ failover moves it), so this
+        # only spreads replicas over the zones; one may share the writer's AZ
+        availability_zone=availability_zones[(idx + 1) % len(availability_zones)],
+        storage_type=database["storage_type"],
+        max_allocated_storage=database["max_allocated_storage"],
+        vpc_security_group_ids=[db_security_group.id],
+        backup_retention_period=0,
+        skip_final_snapshot=True,
+        performance_insights_enabled=database["performance_insights_enabled"],
+        publicly_accessible=False,
+        tags={**common_tags, "Name": f"{project_name}-{env}-db-replica-{idx+1}", "Role": "reader"},
+    )
+    db_replicas.append(replica)
+
+if len(db_replicas) > 1:
+    # Private zone with a weighted CNAME spreading reads over all replicas
+    db_private_zone = aws.route53.Zone(
+        f"{project_name}-{env}-db-zone",
+        name=f"db.{project_name}-{env}.internal",
+        comment=f"Database endpoints for {project_name} {env}",
+        vpcs=[aws.route53.ZoneVpcArgs(vpc_id=vpc.id)],
+        tags=common_tags,
+    )
+
+    for idx, replica in enumerate(db_replicas):
+        aws.route53.Record(
+            f"{project_name}-{env}-db-reader-{idx+1}",
+            zone_id=db_private_zone.zone_id,
+            name=f"reader.db.{project_name}-{env}.internal",
+            type="CNAME",
+            ttl=5,
+            records=[replica.address],
+            set_identifier=f"replica-{idx+1}",
+            weighted_routing_policies=[
+                aws.route53.RecordWeightedRoutingPolicyArgs(weight=1),
+            ],
+        )
+
+    db_read_host = pulumi.Output.from_input(f"reader.db.{project_name}-{env}.internal")
+elif db_replicas:
+    db_read_host = db_replicas[0].address
+else:
+    db_read_host = db_instance.address
+
 pulumi.export("db_endpoint", db_endpoint)
 pulumi.export("db_instance_id", db_instance.id)
+pulumi.export("db_parameter_group", db_parameter_group.name)
+pulumi.export("db_parameters", {name: parameter["value"] for name, parameter in db_parameters.items()})
+if db_replica_parameter_group:
+    pulumi.export("db_replica_parameter_group", db_replica_parameter_group.name)
+pulumi.export("db_read_host", db_read_host)
+pulumi.export("db_replica_ids", [replica.id for replica in db_replicas])
 
@@ -5,9 +5,14 @@ Exports:
     alb: Application Load Balancer
     alb_dns_name: ALB DNS name
     target_groups: Dictionary of target groups by service name
+    alb_resource_labels: Dictionary of ALB/target group resource labels for autoscaling
+    alb_origin_protocols: Protocols ("http", "https") with a listener forwarding to the target groups
+    access_log_table: Glue table over the ALB access logs (None when access logging is disabled)
 """
 
-from .alb import alb, alb_dns_name, target_groups
+from .alb import alb, alb_dns_name, target_groups, alb_resource_labels, alb_origin_protocols
+from .access_logs import access_log_table
 
-__all__ = ["alb", "alb_dns_name", "target_groups"]
+__all__ = ["alb", "alb_dns_name", "target_groups", "alb_resource_labels", "alb_origin_protocols",
+           "access_log_table"]
 
@@ -0,0 +1,166 @@
+"""
+ALB access log format, shared by the Glue table and offline analysis.
+
+COLUMNS and LOG_PATTERN define the table in loadbalancing/access_logs.py
+(RegexSerDe: one capture group per column, full-line match). The same
+pattern parses logs locally (tests/test_access_log_parser.py checks it
+against sample lines). Pure Python (no Pulumi imports):
+
+    python loadbalancing/access_log_parser.py stats <file.log[.gz]> [...]
+
+`stats` prints the offline equivalent of the named Athena queries:
+per-host p99, request vs target processing time, and the slowest paths.
+Processing times are -1 when the ALB got no response from a target (or
+did not forward the request); those are excluded from latency figures.
+"""
+
+import gzip
+import math
+import re
+import sys
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# (name, Hive type) in log field order
+COLUMNS = [
+    ("type", "string"),
+    ("time", "string"),
+    ("elb", "string"),
+    ("client_ip", "string"),
+    ("client_port", "int"),
+    ("target_ip", "string"),
+    ("target_port", "int"),
+    ("request_processing_time", "double"),
+    ("target_processing_time", "double"),
+    ("response_processing_time", "double"),
+    ("elb_status_code", "int"),
+    ("target_status_code", "string"),
+    ("received_bytes", "bigint"),
+    ("sent_bytes", "bigint"),
+    ("request_verb", "string"),
+    ("request_url", "string"),
+    ("request_proto", "string"),
+    ("user_agent", "string"),
+    ("ssl_cipher", "string"),
+    ("ssl_protocol", "string"),
+    ("target_group_arn", "string"),
+    ("trace_id", "string"),
+    ("domain_name", "string"),
+    ("chosen_cert_arn", "string"),
+    ("matched_rule_priority", "string"),
+    ("request_creation_time", "string"),
+    ("actions_executed", "string"),
+    ("redirect_url", "string"),
+    ("lambda_error_reason", "string"),
+    ("target_port_list", "string"),
+    ("target_status_code_list", "string"),
+    ("classification", "string"),
+    ("classification_reason", "string"),
+    ("conn_trace_id", "string"),
+]
+
+# Java (RegexSerDe) and Python compatible; trailing fields AWS may append are ignored
+LOG_PATTERN = (
+    r'([^ ]*) ([^ ]*) ([^ ]*) ([^ ]*):([0-9]*) ([^ ]*)[:-]([0-9]*) '
+    r'([-.0-9]*) ([-.0-9]*) ([-.0-9]*) (|[-0-9]*) (-|[-0-9]*) ([-0-9]*) ([-0-9]*) '
+    r'"([^ ]*) (.*) (- |[^ ]*)" "([^"]*)" ([-_A-Z0-9]+) ([-.A-Za-z0-9]*) ([^ ]*) '
+    r'"([^"]*)" "([^"]*)" "([^"]*)" ([-.0-9]*) ([^ ]*) "([^"]*)" "([^"]*)" "([^ ]*)" '
+    r'"([^"]*)" "([^"]*)" "([^ ]*)" "([^ ]*)" ?([^ ]*)(?: .*)?'
+)
+
+LINE_REGEX = re.compile(LOG_PATTERN)
+
+_CONVERTERS = {"int": int, "bigint": int, "double": float}
+
+def parse_line(line):
+    """Parse one access log line into a dict keyed by column name, or None if it doesn't match."""
+    match = LINE_REGEX.fullmatch(line.rstrip("\n"))
+    if not match:
+        return None
+    record = {}
+    for (name, column_type), value in zip(COLUMNS, match.groups()):
+        convert = _CONVERTERS.get(column_type)
+        if convert:
+            # Hive reads empty or "-" numeric fields as NULL
+            record[name] = convert(value) if value not in ("", "-") else None
+        else:
+            record[name] = value
+    return record
+
+
+def read_log(path):
+    """Yield parsed records from a plain or gzipped log file, skipping unparsable lines."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", errors="replace") as handle:
+        for line in handle:
+            record = parse_line(line)
+            if record:
+                yield record
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def _answered(record):
+    seconds = record["target_processing_time"]
+    return seconds is not None and seconds >= 0
+
+
+def host_latency(records):
+    """{host: (requests, p99 target seconds, avg request s, avg target s, avg response s)}"""
+    by_host = defaultdict(list)
+    for record in records:
+        if _answered(record):
+            by_host[record["domain_name"]].append(record)
+    summary = {}
+    for host, items in by_host.items():
+        count = len(items)
+        summary[host] = (
+            count,
+            percentile([item["target_processing_time"] for item in items], 99),
+            sum(item["request_processing_time"] for item in items) / count,
+            sum(item["target_processing_time"] for item in items) / count,
+            sum(item["response_processing_time"] for item in items) / count,
+        )
+    return summary
+
+
+def slow_paths(records, limit=20, min_requests=1):
+    """[(p95 target seconds, requests, host, path)] slowest first."""
+    by_path = defaultdict(list)
+    for record in records:
+        if _answered(record):
+            by_path[(record["domain_name"], urlsplit(record["request_url"]).path)].append(
+                record["target_processing_time"]
+            )
+    ranked = [
+        (percentile(times, 95), len(times), host, path)
+        for (host, path), times in by_path.items()
+        if len(times) >= min_requests
+    ]
+    return sorted(ranked, reverse=True)[:limit]
+
+
+def format_stats(records):
+    """Render host latency and slow paths for the given records."""
+    lines = ["host                          requests  p99 target  avg request  avg target  avg response"]
+    for host, (count, p99, request, target, response) in sorted(host_latency(records).items()):
+        lines.append(f"{host:30}{count:8}  {p99:9.3f}s  {request:10.4f}s  {target:9.3f}s  {response:11.4f}s")
+    lines.append("")
+    lines.append("slowest paths (p95 target time)")
+    for p95, count, host, path in slow_paths(records):
+        lines.append(f"  {p95:8.3f}s  {count:6}  {host}{path[:80]}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+
+    if command == "stats" and args:
+        print(format_stats([record for path in args for record in read_log(path)]))
+
+    else:
+        sys.exit(__doc__)
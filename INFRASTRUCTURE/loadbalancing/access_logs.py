@@ -0,0 +1,165 @@
+"""
+ALB access logs in the archive bucket, queryable with Athena.
+
+The ALB writes gzipped logs to
+s3://<archive>/<prefix>/AWSLogs/<account>/elasticloadbalancing/<region>/yyyy/MM/dd/
+(config.storage["alb_access_logs"]; expiry is part of the archive bucket's
+lifecycle in storage/s3.py). The Glue table uses partition projection on the
+day path segment, so no crawler or MSCK REPAIR is needed. Always filter on
+`day` ('yyyy/MM/dd' strings) to keep scans small.
+
+Column layout and regex live in access_log_parser.py, shared with offline
+analysis. Named queries run in a dedicated Athena
+workgroup whose results go to the archive bucket.
+"""
+
+import json
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, storage, aws_region
+from storage import archive_bucket
+from .access_log_parser import COLUMNS, LOG_PATTERN
+
+access_logs = storage["alb_access_logs"]
+account_id = aws.get_caller_identity().account_id
+
+# Regional Elastic Load Balancing account that delivers the logs
+elb_service_account = aws.elb.get_service_account()
+
+NAMED_QUERIES = {
+    "host-p99-latency": (
+        "p50/p99 target and total response time per host over the last day",
+        """SELECT domain_name,
+       count(*) AS requests,
+       approx_percentile(target_processing_time, 0.5) AS p50_target_s,
+       approx_percentile(target_processing_time, 0.99) AS p99_target_s,
+       approx_percentile(request_processing_time + target_processing_time + response_processing_time, 0.99) AS p99_total_s
+FROM alb_access_logs
+WHERE day >= date_format(current_date - interval '1' day, '%Y/%m/%d')
+  AND target_processing_time >= 0
+GROUP BY domain_name
+ORDER BY p99_target_s DESC""",
+    ),
+    "request-vs-target-time": (
+        "Hourly time spent in the ALB (request/response) versus the target, per host",
+        """SELECT domain_name,
+       date_trunc('hour', from_iso8601_timestamp(time)) AS hour,
+       count(*) AS requests,
+       avg(request_processing_time) AS avg_request_s,
+       avg(target_processing_time) AS avg_target_s,
+       avg(response_processing_time) AS avg_response_s,
+       approx_percentile(request_processing_time, 0.99) AS p99_request_s,
+       approx_percentile(target_processing_time, 0.99) AS p99_target_s
+FROM alb_access_logs
+WHERE day >= date_format(current_date - interval '1' day, '%Y/%m/%d')
+  AND target_processing_time >= 0
+GROUP BY 1, 2
+ORDER BY 2 DESC, 1""",
+    ),
+    "top-slow-paths": (
+        "Slowest paths by p95 target time over the last day (at least 10 requests)",
+        """SELECT domain_name,
+       url_extract_path(request_url) AS path,
+       count(*) AS requests,
+       approx_percentile(target_processing_time, 0.95) AS p95_target_s,
+       max(target_processing_time) AS max_target_s,
+       sum(sent_bytes) AS sent_bytes
+FROM alb_access_logs
+WHERE day >= date_format(current_date - interval '1' day, '%Y/%m/%d')
+  AND target_processing_time >= 0
+GROUP BY 1, 2
+HAVING count(*) >= 10
+ORDER BY p95_target_s DESC
+LIMIT 50""",
+    ),
+}
+
+if access_logs["enabled"]:
+    # Allow ELB log delivery into the access log prefix only
+    access_log_bucket_policy = aws.s3.BucketPolicy(
+        f"{project_name}-{env}-archive-alb-logs-policy",
+        bucket=archive_bucket.id,
+        policy=archive_bucket.arn.apply(lambda arn: json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Sid": "AlbAccessLogDelivery",
+                "Effect": "Allow",
+                "Principal": {"AWS": elb_service_account.arn},
+                "Action": "s3:PutObject",
+                "Resource": f"{arn}/{access_logs['prefix']}/AWSLogs/{account_id}/*",
+            }],
+        })),
+    )
+
+    log_location = pulumi.Output.concat(
+        "s3://", archive_bucket.bucket, f"/{access_logs['prefix']}/AWSLogs/{account_id}/elasticloadbalancing/{aws_region}",
+    )
+
+    access_log_database = aws.glue.CatalogDatabase(
+        f"{project_name}-{env}-logs-db",
+        name=f"{project_name}_{env}_logs",
+        description=f"Log tables for {project_name} {env}",
+    )
+
+    access_log_table = aws.glue.CatalogTable(
+        f"{project_name}-{env}-alb-access-logs-table",
+        name="alb_access_logs",
+        database_name=access_log_database.name,
+        table_type="EXTERNAL_TABLE",
+        parameters={
+            "EXTERNAL": "TRUE",
+            "projection.enabled": "true",
+            "projection.day.type": "date",
+            "projection.day.range": f"{access_logs['projection_start']},NOW",
+            "projection.day.format": "yyyy/MM/dd",
+            "projection.day.interval": "1",
+            "projection.day.interval.unit": "DAYS",
+            "storage.location.template": pulumi.Output.concat(log_location, "/${day}"),
+        },
+        partition_keys=[aws.glue.CatalogTablePartitionKeyArgs(name="day", type="string")],
+        storage_descriptor=aws.glue.CatalogTableStorageDescriptorArgs(
+            location=log_location,
+            input_format="org.apache.hadoop.mapred.TextInputFormat",
+            output_format="org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+            ser_de_info=aws.glue.CatalogTableStorageDescriptorSerDeInfoArgs(
+                serialization_library="org.apache.hadoop.hive.serde2.RegexSerDe",
+                parameters={"serialization.format": "1", "input.regex": LOG_PATTERN},
+            ),
+            columns=[
+                aws.glue.CatalogTableStorageDescriptorColumnArgs(name=name, type=column_type)
+                for name, column_type in COLUMNS
+            ],
+        ),
+    )
+
+    athena_workgroup = aws.athena.Workgroup(
+        f"{project_name}-{env}-analytics",
+        name=f"{project_name}-{env}-analytics",
+        configuration=aws.athena.WorkgroupConfigurationArgs(
+            enforce_workgroup_configuration=True,
+            result_configuration=aws.athena.WorkgroupConfigurationResultConfigurationArgs(
+                output_location=pulumi.Output.concat("s3://", archive_bucket.bucket, f"/{storage['athena_results_prefix']}/"),
+            ),
+        ),
+        force_destroy=True,
+        tags=common_tags,
+    )
+
+    for query_name, (description, query) in NAMED_QUERIES.items():
+        aws.athena.NamedQuery(
+            f"{project_name}-{env}-alb-{query_name}",
+            name=f"alb-{query_name}",
+            description=description,
+            database=access_log_database.name,
+            workgroup=athena_workgroup.id,
+            query=query,
+            opts=pulumi.ResourceOptions(depends_on=[access_log_table]),
+        )
+
+    pulumi.export("alb_access_log_location", log_location)
+    pulumi.export("athena_workgroup", athena_workgroup.name)
+
+else:
+    access_log_bucket_policy = None
+    access_log_table = None
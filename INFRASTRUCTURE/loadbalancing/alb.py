@@ -4,8 +4,10 @@ Application Load Balancer configuration.
 
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags, domains, is_production
+from config import project_name, env, common_tags, domains, is_production, rollout, storage
 from networking import vpc, public_subnets
+from storage import archive_bucket
+from .access_logs import access_log_bucket_policy
 
 # Security Group for ALB
 alb_security_group = aws.ec2.SecurityGroup(
@@ -48,7 +50,14 @@ alb = aws.lb.LoadBalancer(
     security_groups=[alb_security_group.id],
     enable_deletion_protection=False,
     idle_timeout=300,  # 5 minutes to match PHP-FPM timeout
+    access_logs=aws.lb.LoadBalancerAccessLogsArgs(
+        bucket=archive_bucket.id,
+        prefix=storage["alb_access_logs"]["prefix"],
+        enabled=True,
+    ) if access_log_bucket_policy else None,
     tags={**common_tags, "Name": f"{project_name}-{env}-alb"},
+    # The ALB checks it can write to the bucket when logging is enabled
+    opts=pulumi.ResourceOptions(depends_on=[access_log_bucket_policy] if access_log_bucket_policy else None),
 )
 
 # Target Groups for each service
@@ -62,20 +71,28 @@ for service_name, domain_config in domains.items():
         protocol="HTTP",
         vpc_id=vpc.id,
         target_type="ip",
+        # PHP requests finish well within this; the 300s default stalls every rollout wave
+        deregistration_delay=rollout["deregistration_delay"],
         health_check=aws.lb.TargetGroupHealthCheckArgs(
             enabled=True,
             path=domain_config["health_check_path"],
             protocol="HTTP",
-            healthy_threshold=2,
-            unhealthy_threshold=3,
-            timeout=15,
-            interval=30,
+            healthy_threshold=rollout["healthy_threshold"],
+            unhealthy_threshold=rollout["unhealthy_threshold"],
+            timeout=rollout["health_check_timeout"],
+            interval=rollout["health_check_interval"],
             matcher="200",
         ),
         tags={**common_tags, "Name": f"{project_name}-{env}-{service_name}-tg"},
     )
     target_groups[service_name] = tg
 
+# Resource labels for ALBRequestCountPerTarget autoscaling ("<alb suffix>/<tg suffix>")
+alb_resource_labels = {
+    service_name: pulumi.Output.concat(alb.arn_suffix, "/", tg.arn_suffix)
+    for service_name, tg in target_groups.items()
+}
+
 # HTTP Listener
 # For dev/staging: Forward directly to target groups
 # For production: Redirect to HTTPS
@@ -186,6 +203,11 @@ else:
 
 alb_dns_name = alb.dns_name
 
+# Origin protocols with a listener that forwards to the target groups. Production
+# port 80 only redirects and its HTTPS listener is still pending certificates, so
+# nothing there can serve CloudFront yet.
+alb_origin_protocols = set() if is_production else {"http"}
+
 # Add security group rule to allow ALB to reach ECS tasks
 # Import ECS security group here to avoid circular imports
 from compute.cluster import ecs_security_group
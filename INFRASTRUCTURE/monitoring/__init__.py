@@ -3,10 +3,17 @@ Monitoring module for Fibonacco infrastructure.
 
 Exports:
     alert_topic: SNS topic for alerts
-    dashboard: CloudWatch dashboard
+    dashboard: CloudWatch dashboard generated from config.domains and the target groups
+    slo_alarms: Per-site burn-rate composite alarms by SLO (availability, latency) and speed (fast, slow)
+    saturation_alarms: RDS connection, Redis memory/eviction and Horizon backlog alarms by name
+    request_metric_filters: Per-site log metric filters for request duration, DB queries and memory
+    request_queries: Per-site saved Logs Insights queries (top slow routes, N+1 suspects)
 """
 
-from .cloudwatch import alert_topic, dashboard
+from .cloudwatch import alert_topic
+from .dashboards import dashboard
+from .slo import slo_alarms, saturation_alarms
+from .request_metrics import request_metric_filters, request_queries
 
-__all__ = ["alert_topic", "dashboard"]
+__all__ = ["alert_topic", "dashboard", "slo_alarms", "saturation_alarms", "request_metric_filters", "request_queries"]
 
@@ -24,60 +24,6 @@ if monitoring["alarm_email"]:
         endpoint=monitoring["alarm_email"],
     )
 
-# CloudWatch Dashboard
-import json
-
-dashboard_body = json.dumps({
-    "widgets": [
-        {
-            "type": "metric",
-            "properties": {
-                "metrics": [
-                    ["AWS/ECS", "CPUUtilization", {"stat": "Average", "label": "ECS CPU"}],
-                    ["AWS/ECS", "MemoryUtilization", {"stat": "Average", "label": "ECS Memory"}],
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-east-1",
-                "title": "ECS Metrics",
-            },
-        },
-        {
-            "type": "metric",
-            "properties": {
-                "metrics": [
-                    ["AWS/RDS", "CPUUtilization", {"stat": "Average", "label": "RDS CPU"}],
-                    ["AWS/RDS", "DatabaseConnections", {"stat": "Average", "label": "DB Connections"}],
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-east-1",
-                "title": "RDS Metrics",
-            },
-        },
-        {
-            "type": "metric",
-            "properties": {
-                "metrics": [
-                    ["AWS/ElastiCache", "CPUUtilization", {"stat": "Average", "label": "Redis CPU"}],
-                    ["AWS/ElastiCache", "CacheHits", {"stat": "Sum", "label": "Cache Hits"}],
-                    ["AWS/ElastiCache", "CacheMisses", {"stat": "Sum", "label": "Cache Misses"}],
-                ],
-                "period": 300,
-                "stat": "Average",
-                "region": "us-east-1",
-                "title": "ElastiCache Metrics",
-            },
-        },
-    ],
-})
-
-dashboard = aws.cloudwatch.Dashboard(
-    f"{project_name}-{env}-dashboard",
-    dashboard_name=f"{project_name}-{env}",
-    dashboard_body=dashboard_body,
-)
-
 # Alarms
 # ECS CPU Alarm
 aws.cloudwatch.MetricAlarm(
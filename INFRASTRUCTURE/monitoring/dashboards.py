@@ -0,0 +1,157 @@
+"""
+CloudWatch dashboard generated from the service registry.
+
+Widgets are derived from config.domains, the ALB target groups and the ECS
+service naming scheme ({project}-{env}-{name}), so a new site gets its own
+section without editing the dashboard. Layout:
+- Overview: p99 latency, request count and 5xx rate of every site side by
+  side, plus the shared SSR and Horizon services.
+- One section per site: TargetResponseTime p50/p90/p99, requests, target and
+  ALB 5xx rate, and the web service's CPU/memory and running task count.
+
+Task counts come from Container Insights (enabled on the cluster).
+"""
+
+import json
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, domains, aws_region
+from compute import cluster
+from loadbalancing import alb, target_groups
+
+# Seconds per datapoint
+PERIOD = 60
+# Dashboard grid is 24 units wide
+GRID_WIDTH = 24
+WIDGET_HEIGHT = 6
+
+# ECS services shared by every site
+SHARED_SERVICES = ["ssr", "horizon"]
+
+
+def ecs_service_name(name):
+    """ECS service name for a site or shared service (see compute/services.py)."""
+    return f"{project_name}-{env}-{name}"
+
+
+def _metric_widget(title, metrics, x, y, width, stat="Average", y_label=None):
+    properties = {
+        "title": title,
+        "metrics": metrics,
+        "view": "timeSeries",
+        "stat": stat,
+        "period": PERIOD,
+        "region": aws_region,
+    }
+    if y_label:
+        properties["yAxis"] = {"left": {"label": y_label, "showUnits": False, "min": 0}}
+    return {"type": "metric", "x": x, "y": y, "width": width, "height": WIDGET_HEIGHT, "properties": properties}
+
+
+def _text_widget(markdown, y):
+    return {"type": "text", "x": 0, "y": y, "width": GRID_WIDTH, "height": 1, "properties": {"markdown": markdown}}
+
+
+def _row(y, *widgets):
+    """Lay out (title, metrics, kwargs) specs side by side in one row."""
+    width = GRID_WIDTH // len(widgets)
+    return [
+        _metric_widget(title, metrics, x=index * width, y=y, width=width, **kwargs)
+        for index, (title, metrics, kwargs) in enumerate(widgets)
+    ]
+
+
+def _target_metric(metric, alb_suffix, tg_suffix, **options):
+    return ["AWS/ApplicationELB", metric, "LoadBalancer", alb_suffix, "TargetGroup", tg_suffix, options]
+
+
+def _error_rate(site, alb_suffix, tg_suffix, label):
+    """Target 5xx as a percentage of requests (metric math, ids unique per site)."""
+    return [
+        _target_metric("HTTPCode_Target_5XX_Count", alb_suffix, tg_suffix, id=f"e_{site}", stat="Sum", visible=False),
+        _target_metric("RequestCount", alb_suffix, tg_suffix, id=f"r_{site}", stat="Sum", visible=False),
+        [{"expression": f"100 * FILL(e_{site}, 0) / r_{site}", "label": label, "id": f"rate_{site}"}],
+    ]
+
+
+def _ecs_metrics(cluster_name, names):
+    service_dims = [("ClusterName", cluster_name, "ServiceName", ecs_service_name(name)) for name in names]
+    cpu_memory = []
+    tasks = []
+    for name, dims in zip(names, service_dims):
+        cpu_memory.append(["AWS/ECS", "CPUUtilization", *dims, {"label": f"{name} CPU"}])
+        cpu_memory.append(["AWS/ECS", "MemoryUtilization", *dims, {"label": f"{name} memory"}])
+        tasks.append(["ECS/ContainerInsights", "RunningTaskCount", *dims, {"label": f"{name} running"}])
+        tasks.append(["ECS/ContainerInsights", "DesiredTaskCount", *dims, {"label": f"{name} desired"}])
+    return cpu_memory, tasks
+
+
+def build_dashboard_body(cluster_name, alb_suffix, target_group_suffixes):
+    """
+    Render the dashboard JSON.
+
+    Args:
+        cluster_name: ECS cluster name
+        alb_suffix: ALB arn_suffix ("app/<name>/<id>")
+        target_group_suffixes: {site: target group arn_suffix}, in display order
+    """
+    widgets = [_text_widget(f"# {project_name} {env}: overview", 0)]
+    y = 1
+
+    latency, requests, errors = [], [], []
+    for site, tg_suffix in target_group_suffixes.items():
+        latency.append(_target_metric("TargetResponseTime", alb_suffix, tg_suffix, stat="p99", label=site))
+        requests.append(_target_metric("RequestCount", alb_suffix, tg_suffix, label=site))
+        errors.extend(_error_rate(site, alb_suffix, tg_suffix, site))
+    errors.append(["AWS/ApplicationELB", "HTTPCode_ELB_5XX_Count", "LoadBalancer", alb_suffix,
+                   {"stat": "Sum", "label": "ALB 5xx (count)", "yAxis": "right"}])
+    widgets += _row(
+        y,
+        ("p99 latency by site", latency, {"y_label": "seconds"}),
+        ("Requests by site", requests, {"stat": "Sum"}),
+        ("5xx rate by site (%)", errors, {"y_label": "%"}),
+    )
+    y += WIDGET_HEIGHT
+
+    cpu_memory, tasks = _ecs_metrics(cluster_name, SHARED_SERVICES)
+    widgets += _row(
+        y,
+        ("SSR / Horizon CPU and memory (%)", cpu_memory, {"y_label": "%"}),
+        ("SSR / Horizon tasks", tasks, {}),
+    )
+    y += WIDGET_HEIGHT
+
+    for site, tg_suffix in target_group_suffixes.items():
+        widgets.append(_text_widget(f"## {site}: {domains[site]['domain']}", y))
+        y += 1
+        cpu_memory, tasks = _ecs_metrics(cluster_name, [site])
+        widgets += _row(
+            y,
+            ("Latency p50 / p90 / p99", [
+                _target_metric("TargetResponseTime", alb_suffix, tg_suffix, stat=stat, label=stat)
+                for stat in ("p50", "p90", "p99")
+            ], {"y_label": "seconds"}),
+            ("Requests", [_target_metric("RequestCount", alb_suffix, tg_suffix, label="requests")], {"stat": "Sum"}),
+            ("5xx rate (%)", _error_rate(site, alb_suffix, tg_suffix, "target 5xx %"), {"y_label": "%"}),
+            ("CPU / memory (%)", cpu_memory, {"y_label": "%"}),
+            ("Tasks", tasks, {}),
+        )
+        y += WIDGET_HEIGHT
+
+    return json.dumps({"widgets": widgets})
+
+
+site_names = [site for site in domains if site in target_groups]
+
+dashboard_body = pulumi.Output.all(
+    cluster.name, alb.arn_suffix, *[target_groups[site].arn_suffix for site in site_names]
+).apply(lambda values: build_dashboard_body(values[0], values[1], dict(zip(site_names, values[2:]))))
+
+dashboard = aws.cloudwatch.Dashboard(
+    f"{project_name}-{env}-dashboard",
+    dashboard_name=f"{project_name}-{env}",
+    dashboard_body=dashboard_body,
+)
+
+pulumi.export("dashboard_name", dashboard.dashboard_name)
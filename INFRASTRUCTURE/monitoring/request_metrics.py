@@ -0,0 +1,106 @@
+"""
+Per-route request metrics from structured web logs.
+
+Web containers log JSON to stderr (Monolog JsonFormatter). The app's
+terminating middleware (app/Http/Middleware/LogRequestMetrics.php) writes one
+line per request:
+
+    {"message": "request", "context": {"site": "daynews", "route": "daynews.articles.show",
+     "status": 200, "duration_ms": 182.4, "db_queries": 14, "memory_peak_mb": 38.5}, ...}
+
+`site` is the config.domains key, passed to each web service as
+REQUEST_METRICS_SITE. `route` is the route name or URI pattern, not the raw
+path, to keep metric cardinality bounded. Metric filters on each site's log group publish
+RequestDuration (ms), DbQueryCount and MemoryPeak (MiB) to
+config.monitoring["request_metrics"]["namespace"], once per site
+(dimension Site) and once per route (dimensions Site, Route). Metric filter
+values are kept as raw samples, so p50/p90/p99 work on both.
+
+Each site also gets saved Logs Insights queries for its slowest routes and
+N+1 suspects (routes running many queries per request).
+"""
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, monitoring
+from compute.services import web_log_groups
+
+request_metrics = monitoring["request_metrics"]
+
+REQUEST_FILTER = '{{ $.message = "request" && $.context.{field} = * }}'
+
+# Metric name -> (log field, unit)
+REQUEST_METRICS = {
+    "RequestDuration": ("duration_ms", "Milliseconds"),
+    "DbQueryCount": ("db_queries", "Count"),
+    "MemoryPeak": ("memory_peak_mb", "Megabytes"),
+}
+
+DIMENSION_LEVELS = {
+    "site": {"Site": "$.context.site"},
+    "route": {"Site": "$.context.site", "Route": "$.context.route"},
+}
+
+TOP_SLOW_ROUTES_QUERY = """fields @timestamp, context.route, context.duration_ms
+| filter message = "request"
+| stats count(*) as requests,
+        avg(context.duration_ms) as avg_ms,
+        pct(context.duration_ms, 50) as p50_ms,
+        pct(context.duration_ms, 95) as p95_ms,
+        pct(context.duration_ms, 99) as p99_ms,
+        max(context.memory_peak_mb) as peak_mb
+  by context.route
+| sort p95_ms desc
+| limit 25"""
+
+N_PLUS_ONE_QUERY = """fields @timestamp, context.route, context.db_queries
+| filter message = "request" and context.db_queries >= {threshold}
+| stats count(*) as requests,
+        avg(context.db_queries) as avg_queries,
+        max(context.db_queries) as max_queries,
+        pct(context.duration_ms, 95) as p95_ms
+  by context.route
+| sort avg_queries desc
+| limit 25"""
+
+# {site: [LogMetricFilter, ...]}
+request_metric_filters = {}
+# {site: {"top-slow-routes" | "n-plus-one-suspects": QueryDefinition}}
+request_queries = {}
+
+if request_metrics["enabled"]:
+    for site, log_group in web_log_groups.items():
+        filters = []
+        for metric, (field, unit) in REQUEST_METRICS.items():
+            for level, dimensions in DIMENSION_LEVELS.items():
+                filters.append(aws.cloudwatch.LogMetricFilter(
+                    f"{project_name}-{env}-{site}-{field.replace('_', '-')}-by-{level}",
+                    name=f"{project_name}-{env}-{site}-{metric}-by-{level}",
+                    log_group_name=log_group.name,
+                    pattern=REQUEST_FILTER.format(field=field),
+                    metric_transformation=aws.cloudwatch.LogMetricFilterMetricTransformationArgs(
+                        name=metric,
+                        namespace=request_metrics["namespace"],
+                        value=f"$.context.{field}",
+                        unit=unit,
+                        dimensions=dimensions,
+                    ),
+                ))
+        request_metric_filters[site] = filters
+
+        request_queries[site] = {
+            "top-slow-routes": aws.cloudwatch.QueryDefinition(
+                f"{project_name}-{env}-{site}-top-slow-routes-query",
+                name=f"{project_name}/{env}/{site}/top-slow-routes",
+                log_group_names=[log_group.name],
+                query_string=TOP_SLOW_ROUTES_QUERY,
+            ),
+            "n-plus-one-suspects": aws.cloudwatch.QueryDefinition(
+                f"{project_name}-{env}-{site}-n-plus-one-query",
+                name=f"{project_name}/{env}/{site}/n-plus-one-suspects",
+                log_group_names=[log_group.name],
+                query_string=N_PLUS_ONE_QUERY.format(threshold=request_metrics["n_plus_one_query_threshold"]),
+            ),
+        }
+
+    pulumi.export("request_metrics_namespace", request_metrics["namespace"])
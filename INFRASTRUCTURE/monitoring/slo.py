@@ -0,0 +1,228 @@
+"""
+SLO burn-rate and saturation alarms.
+
+Per site (config.domains), two SLOs over the site's ALB target group:
+- availability: share of requests answered without a target 5xx
+- latency: share of requests faster than latency_threshold_seconds, measured
+  with the TargetResponseTime percentile rank statistic PR(:threshold)
+
+Each SLO gets a fast and a slow burn-rate alert (config.monitoring["slo"]).
+A burn rate of N means the error budget (100% - target) is being spent N
+times faster than the SLO allows. Each alert is a composite alarm that fires
+only while both its long window (sustained) and short window (still
+happening) exceed the burn rate; the window alarms themselves notify no one.
+
+Saturation alarms cover RDS connections, Redis memory and evictions per
+replication group, and Horizon backlog per task and oldest job age.
+Everything notifies alert_topic.
+"""
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, monitoring, domains, cache, queue_metrics
+from database import db_instance
+from loadbalancing import alb, target_groups
+from .cloudwatch import alert_topic
+
+slo = monitoring["slo"]
+budgets = {
+    "availability": 100 - slo["availability_target"],
+    "latency": 100 - slo["latency_target"],
+}
+
+
+def _target_query(query_id, metric, tg, period, stat):
+    return aws.cloudwatch.MetricAlarmMetricQueryArgs(
+        id=query_id,
+        metric=aws.cloudwatch.MetricAlarmMetricQueryMetricArgs(
+            namespace="AWS/ApplicationELB",
+            metric_name=metric,
+            dimensions={"LoadBalancer": alb.arn_suffix, "TargetGroup": tg.arn_suffix},
+            period=period,
+            stat=stat,
+        ),
+        return_data=False,
+    )
+
+
+def _bad_request_queries(kind, tg, period):
+    """Metric queries whose `bad` expression is the % of requests outside the SLO."""
+    if kind == "availability":
+        measure = _target_query("errors", "HTTPCode_Target_5XX_Count", tg, period, "Sum")
+        bad = "100 * FILL(errors, 0) / requests"
+    else:
+        measure = _target_query("fast", "TargetResponseTime", tg, period, f"PR(:{slo['latency_threshold_seconds']})")
+        bad = "100 - fast"
+    return [
+        _target_query("requests", "RequestCount", tg, period, "Sum"),
+        measure,
+        aws.cloudwatch.MetricAlarmMetricQueryArgs(
+            id="bad",
+            expression=f"IF(requests >= {slo['min_requests']}, {bad}, 0)",
+            label=f"{kind} budget spend (%)",
+            return_data=True,
+        ),
+    ]
+
+
+def create_burn_rate_alarm(site, kind, speed, tg):
+    """Composite alarm: both windows of one burn-rate alert above threshold."""
+    spec = slo["burn_rates"][speed]
+    threshold = spec["burn_rate"] * budgets[kind]
+    prefix = f"{project_name}-{env}-{site}-{kind}-{speed}-burn"
+
+    windows = []
+    for window in ("long", "short"):
+        seconds = spec[f"{window}_window"]
+        windows.append(aws.cloudwatch.MetricAlarm(
+            f"{prefix}-{window}",
+            name=f"{prefix}-{window}",
+            comparison_operator="GreaterThanThreshold",
+            evaluation_periods=1,
+            threshold=threshold,
+            treat_missing_data="notBreaching",
+            metric_queries=_bad_request_queries(kind, tg, seconds),
+            alarm_description=f"{site} {kind}: over {threshold:g}% bad requests in {seconds // 60}m",
+            tags=common_tags,
+        ))
+
+    return aws.cloudwatch.CompositeAlarm(
+        prefix,
+        alarm_name=prefix,
+        alarm_rule=pulumi.Output.format('ALARM("{0}") AND ALARM("{1}")', windows[0].name, windows[1].name),
+        alarm_description=(
+            f"{domains[site]['domain']} is burning its {kind} error budget at over "
+            f"{spec['burn_rate']:g}x (SLO {slo[kind + '_target']}%)"
+        ),
+        alarm_actions=[alert_topic.arn],
+        ok_actions=[alert_topic.arn],
+        tags=common_tags,
+    )
+
+
+# {site: {"availability" | "latency": {"fast" | "slow": CompositeAlarm}}}
+slo_alarms = {
+    site: {
+        kind: {speed: create_burn_rate_alarm(site, kind, speed, target_groups[site]) for speed in slo["burn_rates"]}
+        for kind in budgets
+    }
+    for site in domains
+    if site in target_groups
+}
+
+
+def _saturation_alarm(name, description, threshold, metric_queries=None, evaluation_periods=3, **metric):
+    return aws.cloudwatch.MetricAlarm(
+        f"{project_name}-{env}-{name}",
+        name=f"{project_name}-{env}-{name}",
+        comparison_operator="GreaterThanThreshold",
+        evaluation_periods=evaluation_periods,
+        threshold=threshold,
+        metric_queries=metric_queries,
+        alarm_description=description,
+        alarm_actions=[alert_topic.arn],
+        ok_actions=[alert_topic.arn],
+        tags=common_tags,
+        **metric,
+    )
+
+
+def redis_member_ids(group_id, role):
+    """Node cluster ids ElastiCache assigns in a replication group, from config.cache."""
+    if role == "cache" and cache["cluster_mode_enabled"]:
+        return [
+            f"{group_id}-{shard:04d}-{node:03d}"
+            for shard in range(1, cache["num_node_groups"] + 1)
+            for node in range(1, cache["replicas_per_node_group"] + 2)
+        ]
+    nodes = cache["num_cache_nodes"] if role == "cache" else cache["roles"][role]["num_cache_nodes"]
+    return [f"{group_id}-{node:03d}" for node in range(1, nodes + 1)]
+
+
+def _redis_group_queries(member_ids, metric, stat, combine):
+    queries = [
+        aws.cloudwatch.MetricAlarmMetricQueryArgs(
+            id=f"n{index}",
+            metric=aws.cloudwatch.MetricAlarmMetricQueryMetricArgs(
+                namespace="AWS/ElastiCache",
+                metric_name=metric,
+                dimensions={"CacheClusterId": member_id},
+                period=300,
+                stat=stat,
+            ),
+            return_data=False,
+        )
+        for index, member_id in enumerate(member_ids)
+    ]
+    ids = ", ".join(query.id for query in queries)
+    queries.append(aws.cloudwatch.MetricAlarmMetricQueryArgs(
+        id="group",
+        expression=f"{combine}(FILL([{ids}], 0))",
+        label=f"{metric} ({combine.lower()} over nodes)",
+        return_data=True,
+    ))
+    return queries
+
+
+saturation_alarms = {
+    "db_connections": _saturation_alarm(
+        "rds-connections-high",
+        "RDS connections near the instance limit",
+        monitoring["db_connections_alarm_threshold"],
+        namespace="AWS/RDS",
+        metric_name="DatabaseConnections",
+        dimensions={"DBInstanceIdentifier": db_instance.id},
+        period=300,
+        statistic="Maximum",
+    ),
+}
+
+# One set per replication group; roles sharing the cache group are covered by it
+redis_roles = list(cache["roles"]) if cache["separate_roles"] else ["cache"]
+for role in redis_roles:
+    group_id = f"{project_name}-{env}-redis" if role == "cache" else f"{project_name}-{env}-redis-{role}"
+    members = redis_member_ids(group_id, role)
+    saturation_alarms[f"redis_{role}_memory"] = _saturation_alarm(
+        f"redis-{role}-memory-high",
+        f"Redis {role} memory above {monitoring['memory_alarm_threshold']}% on a node",
+        monitoring["memory_alarm_threshold"],
+        metric_queries=_redis_group_queries(members, "DatabaseMemoryUsagePercentage", "Maximum", "MAX"),
+    )
+    if cache["roles"][role]["maxmemory_policy"] != "noeviction":
+        saturation_alarms[f"redis_{role}_evictions"] = _saturation_alarm(
+            f"redis-{role}-evictions-high",
+            f"Redis {role} evicting keys under memory pressure",
+            monitoring["cache_evictions_alarm_threshold"],
+            metric_queries=_redis_group_queries(members, "Evictions", "Sum", "SUM"),
+        )
+
+if queue_metrics["enabled"]:
+    backlog_threshold = queue_metrics["backlog_per_task_target"] * monitoring["horizon_backlog_alarm_factor"]
+    saturation_alarms["horizon_backlog"] = _saturation_alarm(
+        "horizon-backlog-high",
+        f"Horizon backlog above {backlog_threshold} jobs per task; scaling is not keeping up",
+        backlog_threshold,
+        evaluation_periods=15,
+        namespace=queue_metrics["namespace"],
+        metric_name="BacklogPerTask",
+        dimensions={"Environment": env, "ServiceName": f"{project_name}-{env}-horizon"},
+        period=60,
+        statistic="Average",
+    )
+    for queue in queue_metrics["queues"]:
+        saturation_alarms[f"queue_{queue}_age"] = _saturation_alarm(
+            f"queue-{queue}-age-high",
+            f"Oldest job on the {queue} queue waiting over {monitoring['queue_age_alarm_seconds']}s",
+            monitoring["queue_age_alarm_seconds"],
+            evaluation_periods=5,
+            namespace=queue_metrics["namespace"],
+            metric_name="OldestJobAgeSeconds",
+            dimensions={"Environment": env, "Queue": queue},
+            period=60,
+            statistic="Maximum",
+        )
+
+pulumi.export("slo_alarm_names", {
+    site: {kind: {speed: alarm.alarm_name for speed, alarm in speeds.items()} for kind, speeds in kinds.items()}
+    for site, kinds in slo_alarms.items()
+})
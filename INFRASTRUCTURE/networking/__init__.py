@@ -5,10 +5,14 @@ Exports:
     vpc: VPC resource
     public_subnets: List of public subnet resources
     private_subnets: List of private subnet resources
-    nat_gateway_ip: NAT Gateway public IP
+    nat_gateway_ip: Public IP of the first NAT Gateway
+    nat_gateway_ips: Dict of availability zone -> NAT Gateway public IP
+    vpc_endpoints: Dict of service name -> VPC endpoint resource
+    endpoint_security_group: Security group shared by interface endpoints
 """
 
-from .vpc import vpc, public_subnets, private_subnets, nat_gateway_ip
-
-__all__ = ["vpc", "public_subnets", "private_subnets", "nat_gateway_ip"]
+from .vpc import vpc, public_subnets, private_subnets, nat_gateway_ip, nat_gateway_ips
+from .endpoints import vpc_endpoints, endpoint_security_group
 
+__all__ = ["vpc", "public_subnets", "private_subnets", "nat_gateway_ip", "nat_gateway_ips",
+           "vpc_endpoints", "endpoint_security_group"]
@@ -0,0 +1,116 @@
+"""
+VPC endpoints for AWS APIs used by the private subnets.
+
+Without endpoints, ECR image pulls, S3 object I/O, Secrets Manager lookups at
+task start and CloudWatch Logs/metrics all leave through the NAT gateway.
+config.networking["vpc_endpoints"] controls:
+- s3_gateway: S3 gateway endpoint on the private route tables (no hourly cost).
+  ECR image layers are served from S3, so this also carries most pull bytes.
+- interface_enabled / interface_services: interface endpoints in each private
+  subnet with private DNS, so the default SDK hostnames resolve to them.
+
+Endpoint policies only admit principals from this account. The S3 policy also
+allows reads from the AWS-owned ECR layer bucket, which ECR hands out as
+pre-signed URLs signed outside this account. Anonymous reads of third-party
+public buckets from private subnets are denied by the S3 gateway policy.
+"""
+
+import json
+
+import pulumi
+import pulumi_aws as aws
+from config import project_name, env, common_tags, networking, aws_region
+from .vpc import vpc, private_subnets, private_route_tables
+
+endpoint_config = networking["vpc_endpoints"]
+account_id = aws.get_caller_identity().account_id
+
+# Shared security group for all interface endpoints
+endpoint_security_group = aws.ec2.SecurityGroup(
+    f"{project_name}-{env}-endpoint-sg",
+    description="Security group for VPC interface endpoints",
+    vpc_id=vpc.id,
+    ingress=[
+        aws.ec2.SecurityGroupIngressArgs(
+            description="HTTPS from VPC",
+            from_port=443,
+            to_port=443,
+            protocol="tcp",
+            cidr_blocks=[vpc.cidr_block],
+        )
+    ],
+    egress=[
+        aws.ec2.SecurityGroupEgressArgs(
+            from_port=0,
+            to_port=0,
+            protocol="-1",
+            cidr_blocks=["0.0.0.0/0"],
+        )
+    ],
+    tags={**common_tags, "Name": f"{project_name}-{env}-endpoint-sg"},
+)
+
+account_statement = {
+    "Sid": "AccountPrincipals",
+    "Effect": "Allow",
+    "Principal": "*",
+    "Action": "*",
+    "Resource": "*",
+    "Condition": {"StringEquals": {"aws:PrincipalAccount": account_id}},
+}
+
+interface_endpoint_policy = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [account_statement],
+})
+
+s3_endpoint_policy = json.dumps({
+    "Version": "2012-10-17",
+    "Statement": [
+        account_statement,
+        {
+            "Sid": "EcrImageLayers",
+            "Effect": "Allow",
+            "Principal": "*",
+            "Action": ["s3:GetObject"],
+            "Resource": [f"arn:aws:s3:::prod-{aws_region}-starport-layer-bucket/*"],
+        },
+    ],
+})
+
+# {service: VpcEndpoint}, e.g. "s3", "ecr.api", "logs"
+vpc_endpoints = {}
+
+if endpoint_config["s3_gateway"]:
+    vpc_endpoints["s3"] = aws.ec2.VpcEndpoint(
+        f"{project_name}-{env}-s3-endpoint",
+        vpc_id=vpc.id,
+        service_name=f"com.amazonaws.{aws_region}.s3",
+        vpc_endpoint_type="Gateway",
+        route_table_ids=[route_table.id for route_table in private_route_tables],
+        policy=s3_endpoint_policy,
+        tags={**common_tags, "Name": f"{project_name}-{env}-s3-endpoint"},
+    )
+
+if endpoint_config["interface_enabled"]:
+    for service in endpoint_config["interface_services"]:
+        resource_name = service.replace(".", "-")
+        vpc_endpoints[service] = aws.ec2.VpcEndpoint(
+            f"{project_name}-{env}-{resource_name}-endpoint",
+            vpc_id=vpc.id,
+            service_name=f"com.amazonaws.{aws_region}.{service}",
+            vpc_endpoint_type="Interface",
+            subnet_ids=[subnet.id for subnet in private_subnets],
+            security_group_ids=[endpoint_security_group.id],
+            private_dns_enabled=True,
+            policy=interface_endpoint_policy,
+            tags={**common_tags, "Name": f"{project_name}-{env}-{resource_name}-endpoint"},
+        )
+
+# Export values
+pulumi.export("vpc_endpoint_ids", {service: endpoint.id for service, endpoint in vpc_endpoints.items()})
+pulumi.export("vpc_endpoint_dns", {
+    service: endpoint.dns_entries.apply(lambda entries: entries[0].dns_name if entries else None)
+    for service, endpoint in vpc_endpoints.items()
+    if service != "s3"
+})
@@ -50,23 +50,31 @@ for idx, (az, cidr) in enumerate(zip(availability_zones, networking["private_sub
     )
     private_subnets.append(subnet)
 
-# Elastic IP for NAT Gateway
-nat_eip = aws.ec2.Eip(
-    f"{project_name}-{env}-nat-eip",
-    domain="vpc",
-    tags={**common_tags, "Name": f"{project_name}-{env}-nat-eip"},
-    opts=pulumi.ResourceOptions(depends_on=[igw]),
-)
-
-# NAT Gateway (in first public subnet)
-nat_gateway = aws.ec2.NatGateway(
-    f"{project_name}-{env}-nat",
-    allocation_id=nat_eip.id,
-    subnet_id=public_subnets[0].id,
-    tags={**common_tags, "Name": f"{project_name}-{env}-nat"},
-)
+# NAT Gateways: one per AZ (each in that AZ's public subnet) unless
+# single_nat_gateway, in which case every private subnet shares the first.
+# The first NAT keeps the original resource names so existing stacks keep it.
+nat_count = 1 if networking["single_nat_gateway"] else len(public_subnets)
+nat_eips = []
+nat_gateways = []
+for idx in range(nat_count):
+    suffix = "" if idx == 0 else f"-{idx+1}"
+    eip = aws.ec2.Eip(
+        f"{project_name}-{env}-nat-eip{suffix}",
+        domain="vpc",
+        tags={**common_tags, "Name": f"{project_name}-{env}-nat-eip{suffix}"},
+        opts=pulumi.ResourceOptions(depends_on=[igw]),
+    )
+    nat_eips.append(eip)
+    nat_gateways.append(aws.ec2.NatGateway(
+        f"{project_name}-{env}-nat{suffix}",
+        allocation_id=eip.id,
+        subnet_id=public_subnets[idx].id,
+        tags={**common_tags, "Name": f"{project_name}-{env}-nat{suffix}"},
+    ))
 
-nat_gateway_ip = nat_eip.public_ip
+nat_gateway_ip = nat_eips[0].public_ip
+# {availability zone: egress IP} for every AZ with a NAT
+nat_gateway_ips = {availability_zones[idx]: eip.public_ip for idx, eip in enumerate(nat_eips)}
 
 # Route Table for Public Subnets
 public_route_table = aws.ec2.RouteTable(
@@ -89,29 +97,34 @@ for idx, subnet in enumerate(public_subnets):
         route_table_id=public_route_table.id,
     )
 
-# Route Table for Private Subnets
-private_route_table = aws.ec2.RouteTable(
-    f"{project_name}-{env}-private-rt",
-    vpc_id=vpc.id,
-    routes=[
-        aws.ec2.RouteTableRouteArgs(
-            cidr_block="0.0.0.0/0",
-            nat_gateway_id=nat_gateway.id,
-        )
-    ],
-    tags={**common_tags, "Name": f"{project_name}-{env}-private-rt"},
-)
+# Route Tables for Private Subnets: one per NAT gateway, so each AZ egresses
+# through its own NAT when there is one
+private_route_tables = []
+for idx, nat in enumerate(nat_gateways):
+    suffix = "" if idx == 0 else f"-{idx+1}"
+    private_route_tables.append(aws.ec2.RouteTable(
+        f"{project_name}-{env}-private-rt{suffix}",
+        vpc_id=vpc.id,
+        routes=[
+            aws.ec2.RouteTableRouteArgs(
+                cidr_block="0.0.0.0/0",
+                nat_gateway_id=nat.id,
+            )
+        ],
+        tags={**common_tags, "Name": f"{project_name}-{env}-private-rt{suffix}"},
+    ))
 
-# Associate Private Subnets with Private Route Table
+# Associate each Private Subnet with its AZ's route table (or the shared one)
 for idx, subnet in enumerate(private_subnets):
     aws.ec2.RouteTableAssociation(
         f"{project_name}-{env}-private-rta-{idx+1}",
         subnet_id=subnet.id,
-        route_table_id=private_route_table.id,
+        route_table_id=private_route_tables[min(idx, len(private_route_tables) - 1)].id,
     )
 
 # Export values
 pulumi.export("vpc_id", vpc.id)
 pulumi.export("public_subnet_ids", [s.id for s in public_subnets])
 pulumi.export("private_subnet_ids", [s.id for s in private_subnets])
+pulumi.export("nat_gateway_ips", nat_gateway_ips)
 
@@ -5,16 +5,26 @@ AWS Secrets Manager configuration for application secrets.
 import json
 import pulumi
 import pulumi_aws as aws
-from config import project_name, env, common_tags
-from database import db_endpoint, db_instance
-from database.elasticache import redis_endpoint, redis_cluster
+from config import project_name, env, common_tags, database
+from database import db_endpoint, db_read_host, db_proxy_endpoint
+from database.elasticache import redis_endpoint, redis_reader_endpoint, redis_cluster, redis_endpoints
 
 # Parse database endpoint
 db_host = db_endpoint.apply(lambda e: e.split(":")[0] if ":" in str(e) else str(e))
 db_port = db_endpoint.apply(lambda e: e.split(":")[1] if ":" in str(e) else "5432")
 
+# Route writes (and reads, when there are no replicas) through RDS Proxy
+# when connection pooling is enabled
+if db_proxy_endpoint is not None:
+    db_host = db_proxy_endpoint
+app_db_read_host = (
+    db_proxy_endpoint if db_proxy_endpoint is not None and database["read_replica_count"] == 0
+    else db_read_host
+)
+
 # Parse Redis endpoint
 redis_host = redis_endpoint
+redis_read_host = redis_reader_endpoint
 redis_port = redis_cluster.port
 
 # Get database password from Pulumi config
@@ -30,18 +40,28 @@ app_key = config.get_secret("app_key") or pulumi.Output.secret("base64:ChangeMe1
 secret_string = pulumi.Output.all(
     db_host=db_host,
     db_port=db_port,
+    db_read_host=app_db_read_host,
     db_password=db_password,
     redis_host=redis_host,
+    redis_read_host=redis_read_host,
+    redis_cache_host=redis_endpoints["cache"],
+    redis_queue_host=redis_endpoints["queue"],
+    redis_session_host=redis_endpoints["session"],
     redis_port=redis_port,
     app_key=app_key,
 ).apply(lambda args: json.dumps({
     "DB_CONNECTION": "pgsql",
     "DB_HOST": args["db_host"],
+    "DB_READ_HOST": args["db_read_host"],
     "DB_PORT": args["db_port"],
     "DB_DATABASE": "fibonacco",
     "DB_USERNAME": "postgres",
     "DB_PASSWORD": args["db_password"],
     "REDIS_HOST": args["redis_host"],
+    "REDIS_READ_HOST": args["redis_read_host"],
+    "REDIS_CACHE_HOST": args["redis_cache_host"],
+    "REDIS_QUEUE_HOST": args["redis_queue_host"],
+    "REDIS_SESSION_HOST": args["redis_session_host"],
     "REDIS_PORT": str(args["redis_port"]),
     "REDIS_PASSWORD": "",
     "APP_KEY": args["app_key"],
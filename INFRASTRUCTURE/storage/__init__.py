@@ -5,10 +5,11 @@ Exports:
     app_bucket: S3 bucket for application storage
     archive_bucket: S3 bucket for archive storage
     repositories: ECR repositories
+    cache_repositories: ECR repositories holding BuildKit layer cache
 """
 
 from .s3 import app_bucket, archive_bucket
-from .ecr import repositories
+from .ecr import repositories, cache_repositories
 
-__all__ = ["app_bucket", "archive_bucket", "repositories"]
+__all__ = ["app_bucket", "archive_bucket", "repositories", "cache_repositories"]
 
@@ -2,6 +2,7 @@
 ECR repositories for container images.
 """
 
+import json
 import pulumi
 import pulumi_aws as aws
 from config import project_name, env, common_tags
@@ -17,6 +18,7 @@ repo_names = [
     "alphasite",
     "inertia-ssr",
     "base-app",  # For Horizon and Scheduler
+    "web",  # Shared web build, promoted by digest to the site repositories
 ]
 
 for repo_name in repo_names:
@@ -36,5 +38,46 @@ for repo_name in repo_names:
     )
     repositories[repo_name] = repo
 
+# BuildKit layer cache for each image CI builds (site repositories only
+# receive promoted web images), tagged per architecture. Kept apart from the
+# image repositories so cache manifests are not scanned and can be expired
+# independently.
+built_repo_names = ["web", "inertia-ssr", "base-app"]
+cache_repositories = {}
+
+for repo_name in built_repo_names:
+    cache_repo = aws.ecr.Repository(
+        f"{project_name}-{env}-{repo_name}-build-cache",
+        name=f"{project_name}/{env}/build-cache/{repo_name}",
+        image_tag_mutability="MUTABLE",
+        force_delete=True,
+        encryption_configurations=[
+            aws.ecr.RepositoryEncryptionConfigurationArgs(
+                encryption_type="AES256",
+            )
+        ],
+        tags={**common_tags, "Name": f"{project_name}-{env}-{repo_name}-build-cache"},
+    )
+
+    # Each cache export re-tags; drop the superseded manifests
+    aws.ecr.LifecyclePolicy(
+        f"{project_name}-{env}-{repo_name}-build-cache-lifecycle",
+        repository=cache_repo.name,
+        policy=json.dumps({
+            "rules": [{
+                "rulePriority": 1,
+                "description": "Expire superseded cache manifests",
+                "selection": {
+                    "tagStatus": "untagged",
+                    "countType": "sinceImagePushed",
+                    "countUnit": "days",
+                    "countNumber": 7,
+                },
+                "action": {"type": "expire"},
+            }],
+        }),
+    )
+    cache_repositories[repo_name] = cache_repo
+
 pulumi.export("ecr_repositories", {k: v.repository_url for k, v in repositories.items()})
 
@@ -62,6 +62,26 @@ aws.s3.BucketLifecycleConfigurationV2(
                 ),
             ],
         ),
+        aws.s3.BucketLifecycleConfigurationV2RuleArgs(
+            id="expire-alb-access-logs",
+            status="Enabled" if storage["alb_access_logs"]["enabled"] else "Disabled",
+            filter=aws.s3.BucketLifecycleConfigurationV2RuleFilterArgs(
+                prefix=f"{storage['alb_access_logs']['prefix']}/",
+            ),
+            expiration=aws.s3.BucketLifecycleConfigurationV2RuleExpirationArgs(
+                days=storage["alb_access_logs"]["expire_after_days"],
+            ),
+        ),
+        aws.s3.BucketLifecycleConfigurationV2RuleArgs(
+            id="expire-athena-results",
+            status="Enabled",
+            filter=aws.s3.BucketLifecycleConfigurationV2RuleFilterArgs(
+                prefix=f"{storage['athena_results_prefix']}/",
+            ),
+            expiration=aws.s3.BucketLifecycleConfigurationV2RuleExpirationArgs(
+                days=storage["athena_results_expire_after_days"],
+            ),
+        ),
     ],
 )
 
@@ -0,0 +1,21 @@
+"""
+Tests run from INFRASTRUCTURE/ module paths, the way `pulumi up` imports them.
+
+Pure-Python helpers are imported the way they run standalone, from their
+own directory, so importing them doesn't pull in the package's resources.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STANDALONE_DIRS = [
+    "loadbalancing",
+    "automation/scaling_controller",
+    "cicd_scripts",
+    "compute",
+]
+
+sys.path.insert(0, ROOT)
+sys.path.extend(os.path.join(ROOT, directory) for directory in STANDALONE_DIRS)
@@ -0,0 +1,46 @@
+"""
+Pulumi mocks shared by the stack tests.
+
+Mocks echo resource inputs back as outputs and record them by resource
+name, so tests read exactly what would be sent to AWS. The runtime is set
+up once per process for STACK, before any stack module is imported.
+"""
+
+import json
+
+import pulumi
+
+STACK = "production"
+
+
+class Mocks(pulumi.runtime.Mocks):
+    def __init__(self):
+        self.resources = {}
+
+    def new_resource(self, args):
+        self.resources[args.name] = (args.typ, args.inputs)
+        outputs = {
+            key: json.dumps(value) if isinstance(value, dict) and key in ("assumeRolePolicy", "policy") else value
+            for key, value in args.inputs.items()
+        }
+        if args.typ == "aws:elasticache/replicationGroup:ReplicationGroup":
+            outputs.update({
+                "primaryEndpointAddress": f"master.{args.name}.cache.amazonaws.com",
+                "readerEndpointAddress": f"replica.{args.name}.cache.amazonaws.com",
+                "configurationEndpointAddress": f"clustercfg.{args.name}.cache.amazonaws.com",
+            })
+        return [f"{args.name}-id", {"name": args.name, "arn": f"arn:aws:mock::{args.name}", **outputs}]
+
+    def call(self, args):
+        return {"json": "{}"}
+
+
+mocks = Mocks()
+pulumi.runtime.set_mocks(mocks, project="fibonacco-infrastructure", stack=STACK, preview=False)
+
+
+def resource_inputs(name, typ):
+    """Inputs of the recorded resource `{project}-{STACK}-{name}`, checking its type."""
+    resource_type, inputs = mocks.resources[f"fibonacco-{STACK}-{name}"]
+    assert resource_type == typ
+    return inputs
@@ -0,0 +1,84 @@
+"""
+ALB access log parsing: the Glue table regex against real log line shapes.
+"""
+
+import gzip
+
+import pytest
+
+from access_log_parser import (
+    COLUMNS, LINE_REGEX, format_stats, host_latency, parse_line, percentile, read_log, slow_paths,
+)
+
+# One line per request shape and fields it must parse to
+LINES = [
+    (
+        'https 2026-10-01T14:03:12.482113Z app/fibonacco-production-alb/50dc6c495c0c9188 '
+        '203.0.113.17:51234 10.0.10.44:8000 0.001 0.184 0.000 200 200 812 48211 '
+        '"GET https://day.news:443/articles/city-council-vote?ref=home HTTP/2.0" '
+        '"Mozilla/5.0 (X11; Linux x86_64) Firefox/131.0" ECDHE-RSA-AES128-GCM-SHA256 TLSv1.2 '
+        'arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/fibonacco-production-daynews/73e2d6bc24d8a067 '
+        '"Root=1-66fc0130-2f7c1a0e1b7d44e48f2c9d11" "day.news" '
+        '"arn:aws:acm:us-east-1:123456789012:certificate/12345678-1234-1234-1234-123456789012" '
+        '3 2026-10-01T14:03:12.297000Z "forward" "-" "-" "10.0.10.44:8000" "200" "-" "-" TID_1a2b3c4d5e6f',
+        {"domain_name": "day.news", "target_processing_time": 0.184, "elb_status_code": 200,
+         "request_url": "https://day.news:443/articles/city-council-vote?ref=home", "target_port": 8000,
+         "conn_trace_id": "TID_1a2b3c4d5e6f"},
+    ),
+    (
+        'https 2026-10-01T14:03:15.001932Z app/fibonacco-production-alb/50dc6c495c0c9188 '
+        '198.51.100.4:40022 10.0.20.12:8000 0.000 -1 -1 502 - 377 277 '
+        '"POST https://goeventcity.com:443/events/search HTTP/1.1" "curl/8.5.0" '
+        'ECDHE-RSA-AES128-GCM-SHA256 TLSv1.3 '
+        'arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/fibonacco-production-goeventcity/1a2b3c4d5e6f7a8b '
+        '"Root=1-66fc0133-0b8e0f9d4a2b4c6d8e0f1a2b" "goeventcity.com" '
+        '"arn:aws:acm:us-east-1:123456789012:certificate/12345678-1234-1234-1234-123456789012" '
+        '1 2026-10-01T14:02:15.000000Z "forward" "-" "-" "10.0.20.12:8000" "-" "-" "-" TID_9f8e7d6c5b4a',
+        {"elb_status_code": 502, "target_status_code": "-", "target_processing_time": -1.0,
+         "request_verb": "POST", "domain_name": "goeventcity.com"},
+    ),
+    (
+        'http 2026-10-01T14:03:16.120000Z app/fibonacco-production-alb/50dc6c495c0c9188 '
+        '192.0.2.55:60100 - -1 -1 -1 301 - 120 402 '
+        '"GET http://downtownsguide.com:80/ HTTP/1.1" "Googlebot/2.1" - - - '
+        '"Root=1-66fc0134-5c6d7e8f9a0b1c2d3e4f5a6b" "-" "-" '
+        '0 2026-10-01T14:03:16.119000Z "redirect" "https://downtownsguide.com:443/" "-" "-" "-" "-" "-"',
+        {"target_ip": "", "target_port": None, "elb_status_code": 301, "actions_executed": "redirect",
+         "redirect_url": "https://downtownsguide.com:443/", "conn_trace_id": ""},
+    ),
+]
+
+
+def test_one_capture_group_per_column():
+    assert LINE_REGEX.groups == len(COLUMNS)
+
+
+@pytest.mark.parametrize("line, expected", LINES, ids=["forwarded", "target-502", "redirect"])
+def test_parses_line(line, expected):
+    record = parse_line(line)
+    assert record is not None
+    assert {field: record[field] for field in expected} == expected
+
+
+def test_rejects_unrelated_lines():
+    assert parse_line("not an access log line") is None
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 99) == 99
+    assert percentile(values, 50) == 50
+    assert percentile([7], 99) == 7
+
+
+def test_stats_skip_unanswered_requests(tmp_path):
+    path = tmp_path / "access.log.gz"
+    with gzip.open(path, "wt") as handle:
+        handle.write("\n".join(line for line, _ in LINES) + "\ngarbage\n")
+    records = list(read_log(str(path)))
+    assert len(records) == 3
+
+    # The 502 and the redirect never got a target response
+    assert host_latency(records) == {"day.news": (1, 0.184, 0.001, 0.184, 0.0)}
+    assert slow_paths(records) == [(0.184, 1, "day.news", "/articles/city-council-vote")]
+    assert "day.news" in format_stats(records)
@@ -0,0 +1,100 @@
+"""
+Autoscaling for a web service and for Horizon, against Pulumi mocks.
+"""
+
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+pytest.importorskip("pulumi_aws")
+
+from pulumi_mocks import STACK, mocks, resource_inputs  # noqa: E402
+from config import autoscaling, domains, ecs_horizon, queue_metrics  # noqa: E402
+from compute.services import create_web_service, horizon_autoscaling, web_service_profile  # noqa: E402
+
+ALB_RESOURCE_LABEL = "app/fibonacco-production-alb/50dc6c495c0c9188/targetgroup/fibonacco-production-daynews/73e2d6bc24d8a067"
+
+
+@pulumi.runtime.test
+def _create_daynews():
+    return create_web_service(
+        "daynews", domains["daynews"], "arn:aws:elasticloadbalancing:mock", alb_resource_label=ALB_RESOURCE_LABEL,
+    ).id
+
+
+@pytest.fixture(scope="module")
+def resources():
+    # Horizon's resources are created at import; this also waits for them
+    _create_daynews()
+    return mocks.resources
+
+
+def _tracking(resources, name):
+    inputs = resource_inputs(name, "aws:appautoscaling/policy:Policy")
+    assert inputs["policyType"] == "TargetTrackingScaling"
+    assert inputs["resourceId"] == f"service/fibonacco-{STACK}/fibonacco-{STACK}-{name.rsplit('-', 2)[0]}"
+    configuration = inputs["targetTrackingScalingPolicyConfiguration"]
+    assert configuration["scaleInCooldown"] == autoscaling["scale_in_cooldown"]
+    assert configuration["scaleOutCooldown"] == autoscaling["scale_out_cooldown"]
+    return configuration
+
+
+def test_web_service_target_is_bounded_by_its_profile(resources):
+    target = resource_inputs("daynews-scaling-target", "aws:appautoscaling/target:Target")
+    profile = web_service_profile(domains["daynews"])
+    assert target["resourceId"] == f"service/fibonacco-{STACK}/fibonacco-{STACK}-daynews"
+    assert target["scalableDimension"] == "ecs:service:DesiredCount"
+    assert (target["minCapacity"], target["maxCapacity"]) == (profile["min_capacity"], profile["max_capacity"])
+
+
+def test_web_service_tracks_cpu_memory_and_requests(resources):
+    cpu = _tracking(resources, "daynews-cpu-tracking")
+    memory = _tracking(resources, "daynews-memory-tracking")
+    requests = _tracking(resources, "daynews-requests-tracking")
+
+    assert cpu["predefinedMetricSpecification"]["predefinedMetricType"] == "ECSServiceAverageCPUUtilization"
+    assert cpu["targetValue"] == autoscaling["cpu_target"]
+    assert memory["predefinedMetricSpecification"]["predefinedMetricType"] == "ECSServiceAverageMemoryUtilization"
+    assert memory["targetValue"] == autoscaling["memory_target"]
+    assert requests["predefinedMetricSpecification"] == {
+        "predefinedMetricType": "ALBRequestCountPerTarget",
+        "resourceLabel": ALB_RESOURCE_LABEL,
+    }
+    assert requests["targetValue"] == autoscaling["requests_per_target"]
+
+
+def test_web_service_steps_on_cpu_bursts(resources):
+    step = autoscaling["step_scaling"]
+    policy = resource_inputs("daynews-cpu-step", "aws:appautoscaling/policy:Policy")
+    configuration = policy["stepScalingPolicyConfiguration"]
+    assert policy["policyType"] == "StepScaling"
+    assert configuration["cooldown"] == step["cooldown"]
+    assert [adjustment["scalingAdjustment"] for adjustment in configuration["stepAdjustments"]] == [
+        item["adjustment"] for item in step["steps"]
+    ]
+
+    alarm = resource_inputs("daynews-cpu-step-alarm", "aws:cloudwatch/metricAlarm:MetricAlarm")
+    assert alarm["threshold"] == step["cpu_threshold"]
+    assert alarm["alarmActions"] == [f"arn:aws:mock::fibonacco-{STACK}-daynews-cpu-step"]
+    assert alarm["dimensions"] == {"ClusterName": f"fibonacco-{STACK}", "ServiceName": f"fibonacco-{STACK}-daynews"}
+
+
+def test_horizon_scales_on_backlog_only(resources):
+    assert queue_metrics["enabled"]
+    assert list(horizon_autoscaling["policies"]) == ["backlog"]
+
+    target = resource_inputs("horizon-scaling-target", "aws:appautoscaling/target:Target")
+    assert (target["minCapacity"], target["maxCapacity"]) == (ecs_horizon["min_capacity"], ecs_horizon["max_capacity"])
+
+    backlog = _tracking(resources, "horizon-backlog-tracking")
+    assert backlog["targetValue"] == queue_metrics["backlog_per_task_target"]
+    metric = backlog["customizedMetricSpecification"]
+    assert (metric["namespace"], metric["metricName"], metric["statistic"]) == (
+        queue_metrics["namespace"], "BacklogPerTask", "Average",
+    )
+    assert metric["dimensions"] == [
+        {"name": "Environment", "value": STACK},
+        {"name": "ServiceName", "value": f"fibonacco-{STACK}-horizon"},
+    ]
+    # CPU tracking or burst steps would fight the backlog policy
+    assert f"fibonacco-{STACK}-horizon-cpu-tracking" not in resources
+    assert f"fibonacco-{STACK}-horizon-cpu-step-alarm" not in resources
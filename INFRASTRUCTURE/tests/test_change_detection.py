@@ -0,0 +1,47 @@
+"""
+Changed paths to images CI rebuilds, and the bundle fingerprint.
+"""
+
+import pytest
+
+from change_detection import SERVICE_PATHS, affected_services, detect, fingerprint, variable_name
+
+
+@pytest.mark.parametrize("paths, expected", [
+    (["resources/js/Pages/Home.tsx"], {"web", "inertia-ssr"}),
+    (["app/Jobs/ProcessArticle.php"], {"web", "base-app"}),
+    (["docker/Dockerfile.inertia-ssr"], {"inertia-ssr"}),
+    (["resources/views/emails/digest.blade.php"], {"web", "base-app"}),
+    (["composer.lock"], {"web", "base-app"}),
+    (["README.md", "INFRASTRUCTURE/cicd.py", "tests/Feature/HomeTest.php"], set()),
+    # Unknown paths rebuild everything
+    (["some-new-dir/file.php"], set(SERVICE_PATHS)),
+    ([], set()),
+])
+def test_affected_services(paths, expected):
+    assert affected_services(paths) == expected
+
+
+def test_variable_name():
+    assert variable_name("inertia-ssr") == "INERTIA_SSR"
+
+
+def test_detect_without_a_diff():
+    # No API calls: unknown bases rebuild, bases at head don't
+    assert detect("owner/name", "abc", {"web": "", "inertia-ssr": "abc", "base-app": "abc"}) == {
+        "web": True, "inertia-ssr": False, "base-app": False,
+    }
+
+
+def test_fingerprint_covers_bundle_inputs_only(tmp_path):
+    (tmp_path / "resources/js").mkdir(parents=True)
+    (tmp_path / "resources/js/app.tsx").write_text("render()")
+    (tmp_path / "package.json").write_text("{}")
+    before = fingerprint(str(tmp_path))
+
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app/Model.php").write_text("<?php")
+    assert fingerprint(str(tmp_path)) == before
+
+    (tmp_path / "resources/js/app.tsx").write_text("render(2)")
+    assert fingerprint(str(tmp_path)) != before
@@ -0,0 +1,75 @@
+"""
+RDS writer and read replicas, against Pulumi mocks.
+"""
+
+import json
+
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+pytest.importorskip("pulumi_aws")
+
+from pulumi_mocks import resource_inputs  # noqa: E402
+from config import database  # noqa: E402
+from database.parameters import build_parameters  # noqa: E402
+from database.rds import db_replicas  # noqa: E402
+
+PARAMETER_GROUP = "aws:rds/parameterGroup:ParameterGroup"
+
+
+@pulumi.runtime.test
+def _wait_for_replicas():
+    return pulumi.Output.all(*[replica.id for replica in db_replicas])
+
+
+@pytest.fixture(scope="module", autouse=True)
+def replicas():
+    _wait_for_replicas()
+
+
+def _built(instance_class):
+    parameters = build_parameters(instance_class, database["parameter_overrides"])
+    return {name: parameter["value"] for name, parameter in parameters.items()}
+
+
+def _values(parameter_group):
+    return {parameter["name"]: parameter["value"] for parameter in parameter_group["parameters"]}
+
+
+def test_replicas_get_a_parameter_group_sized_for_their_class():
+    assert database["read_replica_count"] == len(db_replicas) > 0
+    writer = resource_inputs("db-params", PARAMETER_GROUP)
+    replica_group = resource_inputs("db-replica-params", PARAMETER_GROUP)
+
+    assert _values(writer) == _built(database["instance_class"])
+    assert _values(replica_group) == _built(database["read_replica_instance_class"])
+
+    for idx in range(1, len(db_replicas) + 1):
+        replica = resource_inputs(f"db-replica-{idx}", "aws:rds/instance:Instance")
+        assert replica["parameterGroupName"] == "fibonacco-production-db-replica-params"
+        assert replica["instanceClass"] == database["read_replica_instance_class"]
+
+
+def test_redis_cluster_mode_requires_separate_roles(monkeypatch):
+    import config
+
+    monkeypatch.setitem(config.cache, "cluster_mode_enabled", True)
+    config._check_redis_cluster_mode()
+
+    monkeypatch.setitem(config.cache, "separate_roles", False)
+    with pytest.raises(ValueError, match="separate_roles"):
+        config._check_redis_cluster_mode()
+
+
+def test_app_secret_points_cache_reads_at_the_reader_endpoint():
+    from secrets import secret_string
+
+    @pulumi.runtime.test
+    def check():
+        def verify(value):
+            secret = json.loads(value)
+            assert secret["REDIS_CACHE_HOST"] == "master.fibonacco-production-redis.cache.amazonaws.com"
+            assert secret["REDIS_READ_HOST"] == "replica.fibonacco-production-redis.cache.amazonaws.com"
+        return secret_string.apply(verify)
+
+    check()
@@ -0,0 +1,69 @@
+"""
+Scaling controller wiring: the alarms created per service must reach the
+controller through the EventBridge rule, against Pulumi mocks.
+"""
+
+import json
+import re
+
+import pytest
+
+pulumi = pytest.importorskip("pulumi")
+pytest.importorskip("pulumi_aws")
+
+from pulumi_mocks import STACK, resource_inputs  # noqa: E402
+from config import automation, domains  # noqa: E402
+from compute.autoscaling import remediation_alarms  # noqa: E402
+from compute.services import create_web_service  # noqa: E402
+from automation.remediation import capacity_warning_rule  # noqa: E402
+
+METRIC_ALARM = "aws:cloudwatch/metricAlarm:MetricAlarm"
+
+
+@pulumi.runtime.test
+def _create_goeventcity():
+    service = create_web_service("goeventcity", domains["goeventcity"], "arn:aws:elasticloadbalancing:mock")
+    return pulumi.Output.all(service.id, capacity_warning_rule.id)
+
+
+@pytest.fixture(scope="module")
+def event_pattern():
+    assert automation["enabled"]
+    _create_goeventcity()
+    return json.loads(resource_inputs("capacity-warning-rule", "aws:cloudwatch/eventRule:EventRule")["eventPattern"])
+
+
+def _matches(wildcard, name):
+    """EventBridge wildcard match: `*` is the only special character."""
+    return re.fullmatch(".*".join(re.escape(part) for part in wildcard.split("*")), name) is not None
+
+
+@pytest.mark.parametrize("service, kinds", [
+    # Both have the cpu-burst step policy, so memory only
+    ("goeventcity", ["memory"]),
+    ("ssr", ["memory"]),
+])
+def test_service_alarms_reach_the_controller(event_pattern, service, kinds):
+    assert list(remediation_alarms[service]) == kinds
+    (wildcard,) = [item["wildcard"] for item in event_pattern["detail"]["alarmName"]]
+
+    for kind in kinds:
+        alarm = resource_inputs(f"{service}-{kind}-remediation-alarm", METRIC_ALARM)
+        assert alarm["name"].endswith(automation["alarm_suffix"])
+        assert _matches(wildcard, alarm["name"])
+        assert alarm["namespace"] == "AWS/ECS"
+        assert alarm["metricName"] == automation["alarms"][kind]["metric_name"]
+        assert alarm["dimensions"] == {"ClusterName": f"fibonacco-{STACK}", "ServiceName": f"fibonacco-{STACK}-{service}"}
+
+
+def test_rule_ignores_other_alarms(event_pattern):
+    (wildcard,) = [item["wildcard"] for item in event_pattern["detail"]["alarmName"]]
+    assert event_pattern["detail"]["state"] == {"value": ["ALARM"]}
+
+    step_alarm = resource_inputs("goeventcity-cpu-step-alarm", METRIC_ALARM)
+    assert not _matches(wildcard, step_alarm["name"])
+    assert not _matches(wildcard, "fibonacco-staging-goeventcity-memory-saturated-auto-remediate")
+
+
+def test_backlog_scaled_horizon_has_no_remediation_alarms():
+    assert "horizon" not in remediation_alarms
@@ -0,0 +1,39 @@
+"""
+Rolling deployment wave sizes and duration estimates.
+"""
+
+import pytest
+
+from rollout import DEFAULT_TIMINGS, estimate_rollout_seconds, format_rollout_estimate, wave_size
+
+# Seconds per wave with DEFAULT_TIMINGS: 45 startup + 2 x 10 health checks + 30 drain
+WAVE_SECONDS = 95
+
+
+@pytest.mark.parametrize("desired, minimum_healthy, maximum, expected", [
+    (20, 50, 200, 30),  # 20 surge + 10 stopped early
+    (4, 100, 200, 4),   # surge only
+    (4, 100, 100, 1),   # no headroom still replaces one task at a time
+    (1, 100, 200, 1),
+])
+def test_wave_size(desired, minimum_healthy, maximum, expected):
+    assert wave_size(desired, minimum_healthy, maximum) == expected
+
+
+def test_estimate_counts_waves():
+    assert estimate_rollout_seconds(20, 50, 200, DEFAULT_TIMINGS) == (WAVE_SECONDS, 1)
+    assert estimate_rollout_seconds(4, 100, 100, DEFAULT_TIMINGS) == (4 * WAVE_SECONDS, 4)
+
+
+def test_profile_rolls_out_faster_than_previous_defaults():
+    # Previous defaults: 300s deregistration delay, 30s health check interval
+    previous = {**DEFAULT_TIMINGS, "health_check_interval": 30, "deregistration_delay": 300}
+    seconds, _ = estimate_rollout_seconds(4, 100, 200, DEFAULT_TIMINGS)
+    previous_seconds, _ = estimate_rollout_seconds(4, 100, 200, previous)
+    assert (seconds, previous_seconds) == (95, 405)
+
+
+def test_format_rollout_estimate():
+    assert format_rollout_estimate("daynews", 4, 100, 100, DEFAULT_TIMINGS) == (
+        "Rollout daynews: 4 tasks at 100-100% in 4 wave(s), ~6m20s"
+    )
@@ -0,0 +1,187 @@
+"""
+Scaling controller against stubbed ECS and Application Auto Scaling clients
+and in-memory cooldown state, replaying SNS, EventBridge alarm and
+scheduled restore payloads.
+"""
+
+import json
+
+import pytest
+
+from controller import ScalingController, parse_event, proportional_desired
+from state import InMemoryStateStore
+
+CLUSTER = "fibonacco-dev"
+ALARM_SUFFIX = "-auto-remediate"
+DAYNEWS = "fibonacco-dev-daynews"
+DAYNEWS_RESOURCE = f"service/{CLUSTER}/{DAYNEWS}"
+
+
+class StubEcs:
+    """Records calls and serves desired/pending counts from a dict."""
+
+    def __init__(self, services):
+        self.services = services
+        self.describe_calls = []
+        self.updates = []
+
+    def describe_services(self, cluster, services):
+        self.describe_calls.append((cluster, list(services)))
+        return {"services": [
+            {"serviceName": name, **self.services[name]} for name in services if name in self.services
+        ]}
+
+    def update_service(self, cluster, service, desiredCount):
+        self.updates.append((cluster, service, desiredCount))
+        self.services[service]["desiredCount"] = desiredCount
+
+
+class StubAutoscaling:
+    def __init__(self, max_capacity):
+        self.max_capacity = max_capacity
+        self.registered = []
+
+    def describe_scalable_targets(self, ServiceNamespace, ResourceIds, ScalableDimension):
+        return {"ScalableTargets": [{"ResourceId": r, "MaxCapacity": self.max_capacity} for r in ResourceIds]}
+
+    def register_scalable_target(self, ServiceNamespace, ResourceId, ScalableDimension, MaxCapacity):
+        self.registered.append((ResourceId, MaxCapacity))
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def sns_alarm_event(service, value, threshold):
+    message = {
+        "AlarmName": f"{service}-cpu{ALARM_SUFFIX}",
+        "NewStateValue": "ALARM",
+        "NewStateReason": (
+            f"Threshold Crossed: 1 datapoint [{value} (18/10/26 10:00:00)] "
+            f"was greater than or equal to the threshold ({threshold})."
+        ),
+        "Trigger": {
+            "MetricName": "CPUUtilization",
+            "Namespace": "AWS/ECS",
+            "Threshold": threshold,
+            "Dimensions": [
+                {"value": service, "name": "ServiceName"},
+                {"value": CLUSTER, "name": "ClusterName"},
+            ],
+        },
+    }
+    return {"Records": [{"Sns": {"Message": json.dumps(message)}}]}
+
+
+def eventbridge_alarm_event(services, value, threshold, state="ALARM", alarm_name=f"fibonacco-dev-web{ALARM_SUFFIX}"):
+    return {
+        "source": "aws.cloudwatch",
+        "detail-type": "CloudWatch Alarm State Change",
+        "detail": {
+            "alarmName": alarm_name,
+            "state": {
+                "value": state,
+                "reasonData": json.dumps({"recentDatapoints": [value], "threshold": threshold}),
+            },
+            "configuration": {"metrics": [
+                {"id": f"m{idx}", "metricStat": {"metric": {
+                    "namespace": "AWS/ECS",
+                    "name": "CPUUtilization",
+                    "dimensions": {"ClusterName": CLUSTER, "ServiceName": service},
+                }}}
+                for idx, service in enumerate(services)
+            ]},
+        },
+    }
+
+
+ECS_STEADY_STATE_EVENT = {
+    "source": "aws.ecs",
+    "detail-type": "ECS Service Action",
+    "detail": {"eventName": "SERVICE_STEADY_STATE"},
+}
+
+SCHEDULED_EVENT = {
+    "source": "aws.events",
+    "detail-type": "Scheduled Event",
+    "detail": {},
+}
+
+
+def make_controller(services, clock, ceiling=50, max_capacity=20):
+    ecs = StubEcs(services)
+    autoscaling = StubAutoscaling(max_capacity)
+    controller = ScalingController(
+        ecs=ecs, state=InMemoryStateStore(), autoscaling=autoscaling,
+        ceiling=ceiling, cooldown_minutes=5, max_step_percentage=50,
+        default_cluster=CLUSTER, alarm_suffix=ALARM_SUFFIX, clock=clock,
+    )
+    return controller, ecs, autoscaling
+
+
+@pytest.mark.parametrize("current, value, threshold, ceiling, max_step, expected", [
+    (4, 120, 80, 50, 50, 6),     # proportional to the breach
+    (4, 400, 80, 50, 50, 6),     # capped at 50% per action
+    (18, 160, 80, 20, 100, 20),  # capped at the ceiling
+    (4, 70, 80, 50, 50, 4),      # below threshold
+])
+def test_proportional_desired(current, value, threshold, ceiling, max_step, expected):
+    assert proportional_desired(current, value, threshold, ceiling=ceiling, max_step_percentage=max_step) == expected
+
+
+@pytest.mark.parametrize("event, alarm_suffix", [
+    (ECS_STEADY_STATE_EVENT, ""),
+    (eventbridge_alarm_event(["a"], 90, 80, state="OK"), ""),
+    (eventbridge_alarm_event(["a"], 90, 80, alarm_name="fibonacco-dev-a-cpu-burst"), ALARM_SUFFIX),
+], ids=["ecs-steady-state", "ok-transition", "no-remediation-suffix"])
+def test_ignored_events(event, alarm_suffix):
+    assert parse_event(event, CLUSTER, alarm_suffix) == []
+
+
+def test_alarm_scales_within_cooldown_and_restores_max():
+    clock = Clock()
+    controller, ecs, autoscaling = make_controller({DAYNEWS: {"desiredCount": 20, "pendingCount": 0}}, clock)
+
+    controller.handle(sns_alarm_event(DAYNEWS, 120.0, 80.0))
+    assert ecs.updates == [(CLUSTER, DAYNEWS, 30)]
+    assert autoscaling.registered == [(DAYNEWS_RESOURCE, 30)]
+
+    clock.now += 60
+    result = controller.handle(sns_alarm_event(DAYNEWS, 120.0, 80.0))
+    assert result["actions"][0]["result"] == "cooldown"
+    assert len(ecs.updates) == 1
+
+    clock.now += 5 * 60
+    controller.handle(sns_alarm_event(DAYNEWS, 120.0, 80.0))
+    assert ecs.updates[-1] == (CLUSTER, DAYNEWS, 45)
+
+    # Still inside the cooldown of the last scale-out
+    controller.handle(SCHEDULED_EVENT)
+    assert autoscaling.registered[-1] == (DAYNEWS_RESOURCE, 45)
+
+    clock.now += 5 * 60 + 1
+    controller.handle(SCHEDULED_EVENT)
+    assert autoscaling.registered[-1] == (DAYNEWS_RESOURCE, 20)
+    assert controller.handle(SCHEDULED_EVENT)["actions"] == []
+
+
+def test_eventbridge_alarm_over_many_services():
+    names = [f"fibonacco-dev-svc{i}" for i in range(12)]
+    services = {name: {"desiredCount": 2, "pendingCount": 0} for name in names}
+    services[names[0]]["pendingCount"] = 1
+    controller, ecs, _ = make_controller(services, Clock())
+
+    result = controller.handle(eventbridge_alarm_event(names + ["fibonacco-dev-missing"], 100.0, 80.0))
+    by_result = {}
+    for action in result["actions"]:
+        by_result.setdefault(action["result"], []).append(action["service"])
+
+    assert [len(services) for _, services in ecs.describe_calls] == [10, 3]
+    assert by_result["pending"] == [names[0]]
+    assert by_result["not_found"] == ["fibonacco-dev-missing"]
+    assert len(by_result["scaled"]) == 11
+    assert all(desired == 3 for _, _, desired in ecs.updates)
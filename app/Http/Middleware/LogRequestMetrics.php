@@ -0,0 +1,62 @@
+<?php
+
+declare(strict_types=1);
+
+namespace App\Http\Middleware;
+
+use Closure;
+use Illuminate\Http\Request;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Log;
+use Symfony\Component\HttpFoundation\Response;
+
+/**
+ * Writes one "request" log line per request after the response is sent.
+ *
+ * On AWS the stderr log is JSON, and CloudWatch metric filters turn these
+ * lines into per-site and per-route duration, query count and memory metrics
+ * (INFRASTRUCTURE/monitoring/request_metrics.py).
+ */
+final class LogRequestMetrics
+{
+    private const QUERY_COUNTER = 'request_metrics.queries';
+
+    // Load balancer health checks would drown out real traffic
+    private const SKIPPED_PATHS = ['healthcheck', 'health', 'Health', 'up'];
+
+    public function handle(Request $request, Closure $next): Response
+    {
+        if (config('app.observability.request_metrics.enabled', true)) {
+            // terminate() runs on a fresh middleware instance, so the counter travels on the request
+            $queries = (object) ['count' => 0];
+            DB::listen(static function () use ($queries): void {
+                $queries->count++;
+            });
+            $request->attributes->set(self::QUERY_COUNTER, $queries);
+        }
+
+        return $next($request);
+    }
+
+    public function terminate(Request $request, Response $response): void
+    {
+        $queries = $request->attributes->get(self::QUERY_COUNTER);
+        if ($queries === null || $request->is(...self::SKIPPED_PATHS)) {
+            return;
+        }
+
+        $route = $request->route();
+        $start = defined('LARAVEL_START') ? LARAVEL_START : $request->server('REQUEST_TIME_FLOAT');
+
+        Log::info('request', [
+            'site' => config('app.observability.request_metrics.site') ?? $request->attributes->get('app_domain', 'unknown'),
+            // Route name or URI pattern, never the raw path, to keep metric cardinality bounded
+            'route' => $route ? ($route->getName() ?? $route->uri()) : 'unmatched',
+            'method' => $request->getMethod(),
+            'status' => $response->getStatusCode(),
+            'duration_ms' => round((microtime(true) - $start) * 1000, 1),
+            'db_queries' => $queries->count,
+            'memory_peak_mb' => round(memory_get_peak_usage(true) / 1048576, 1),
+        ]);
+    }
+}
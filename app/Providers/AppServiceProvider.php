@@ -149,34 +149,36 @@ private function configureRedisClient(): void
         }
         config(['database.redis.default' => $defaultConfig]);
 
-        // Configure cache connection with TLS if enabled
-        $cacheConfig = config('database.redis.cache', []);
-        $cacheConfig['scheme'] = $redisScheme;
-        if ($redisTls || $redisScheme === 'tls') {
-            if ($client === 'phpredis') {
-                // phpredis uses 'scheme' => 'tls' and 'ssl' context options
-                $cacheConfig['scheme'] = 'tls';
-                $cacheConfig['ssl'] = [
-                    'verify_peer' => false,
-                    'verify_peer_name' => false,
-                    'allow_self_signed' => true,
-                ];
-            } else {
-                // predis uses 'scheme' => 'tls' and 'ssl' options
-                $cacheConfig['scheme'] = 'tls';
-                $cacheConfig['ssl'] = [
-                    'verify_peer' => false,
-                    'verify_peer_name' => false,
-                ];
+        // Configure cache connections (primary and replicas) with TLS if enabled
+        foreach (['cache', 'cache_read'] as $connection) {
+            $cacheConfig = config("database.redis.{$connection}", []);
+            $cacheConfig['scheme'] = $redisScheme;
+            if ($redisTls || $redisScheme === 'tls') {
+                if ($client === 'phpredis') {
+                    // phpredis uses 'scheme' => 'tls' and 'ssl' context options
+                    $cacheConfig['scheme'] = 'tls';
+                    $cacheConfig['ssl'] = [
+                        'verify_peer' => false,
+                        'verify_peer_name' => false,
+                        'allow_self_signed' => true,
+                    ];
+                } else {
+                    // predis uses 'scheme' => 'tls' and 'ssl' options
+                    $cacheConfig['scheme'] = 'tls';
+                    $cacheConfig['ssl'] = [
+                        'verify_peer' => false,
+                        'verify_peer_name' => false,
+                    ];
+                }
             }
+            if (! isset($cacheConfig['timeout'])) {
+                $cacheConfig['timeout'] = $timeout;
+            }
+            if (! isset($cacheConfig['read_timeout'])) {
+                $cacheConfig['read_timeout'] = $readTimeout;
+            }
+            config(["database.redis.{$connection}" => $cacheConfig]);
         }
-        if (! isset($cacheConfig['timeout'])) {
-            $cacheConfig['timeout'] = $timeout;
-        }
-        if (! isset($cacheConfig['read_timeout'])) {
-            $cacheConfig['read_timeout'] = $readTimeout;
-        }
-        config(['database.redis.cache' => $cacheConfig]);
     }
 
     /**
@@ -8,6 +8,7 @@
 use App\Http\Middleware\ForceHttps;
 use App\Http\Middleware\HandleAppearance;
 use App\Http\Middleware\HandleInertiaRequests;
+use App\Http\Middleware\LogRequestMetrics;
 use App\Http\Middleware\VerifyN8nApiKey;
 use App\Http\Middleware\WorkspaceMiddleware;
 use Illuminate\Foundation\Application;
@@ -129,6 +130,9 @@
         // In production behind a load balancer, we need to trust proxies to get correct client IP and protocol
         $middleware->trustProxies(at: '*');
 
+        // Per-request duration/query/memory log line for CloudWatch request metrics
+        $middleware->prepend(LogRequestMetrics::class);
+
         $middleware->encryptCookies(except: ['appearance', 'sidebar_state']);
 
         $middleware->validateCsrfTokens(except: [
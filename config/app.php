@@ -138,6 +138,12 @@
         'sentry' => [
             'enabled' => (bool) env('SENTRY_ENABLED', false),
         ],
+        // One structured "request" log line per request (LogRequestMetrics).
+        // site is the infrastructure's site key (e.g. daynews); set per ECS service.
+        'request_metrics' => [
+            'enabled' => (bool) env('REQUEST_METRICS_ENABLED', true),
+            'site' => env('REQUEST_METRICS_SITE'),
+        ],
     ],
 
     /*
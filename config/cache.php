@@ -79,6 +79,14 @@
             'lock_connection' => env('REDIS_CACHE_LOCK_CONNECTION', 'default'),
         ],
 
+        // Same keys as the redis store, read from the cache replicas. Replication
+        // is asynchronous, so use it for reads that tolerate slightly stale values.
+        'redis_read' => [
+            'driver' => 'redis',
+            'connection' => env('REDIS_CACHE_READ_CONNECTION', 'cache_read'),
+            'lock_connection' => env('REDIS_CACHE_LOCK_CONNECTION', 'default'),
+        ],
+
         'dynamodb' => [
             'driver' => 'dynamodb',
             'key' => env('AWS_ACCESS_KEY_ID'),
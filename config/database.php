@@ -179,9 +179,10 @@
                 'persistent' => env('REDIS_PERSISTENT', false),
             ],
 
+            // Queues, Horizon and locks (REDIS_QUEUE_HOST points at a noeviction cluster on AWS)
             'default' => [
                 'url' => $redisUrl,
-                'host' => $host,
+                'host' => env('REDIS_QUEUE_HOST', $host),
                 'username' => $username,
                 'password' => $password,
                 'port' => $port,
@@ -192,7 +193,7 @@
 
             'cache' => [
                 'url' => $redisUrl,
-                'host' => $host,
+                'host' => env('REDIS_CACHE_HOST', $host),
                 'username' => $username,
                 'password' => $password,
                 'port' => $port,
@@ -200,6 +201,47 @@
                 'scheme' => $scheme,
                 'ssl' => $ssl,
             ],
+
+            // Cache replicas (REDIS_READ_HOST is the ElastiCache reader endpoint),
+            // used by the redis_read cache store for read-mostly lookups
+            'cache_read' => [
+                'url' => $redisUrl,
+                'host' => env('REDIS_READ_HOST', $host),
+                'username' => $username,
+                'password' => $password,
+                'port' => $port,
+                'database' => env('REDIS_CACHE_DB', '1'),
+                'scheme' => $scheme,
+                'ssl' => $ssl,
+            ],
+
+            // Used when SESSION_CONNECTION=session
+            'session' => [
+                'url' => $redisUrl,
+                'host' => env('REDIS_SESSION_HOST', $host),
+                'username' => $username,
+                'password' => $password,
+                'port' => $port,
+                'database' => env('REDIS_SESSION_DB', '2'),
+                'scheme' => $scheme,
+                'ssl' => $ssl,
+            ],
+
+            // Sharded cache group (ElastiCache cluster mode), used when
+            // REDIS_CACHE_CONNECTION=cache_cluster. Redis Cluster only has database 0.
+            'clusters' => [
+                'cache_cluster' => [
+                    [
+                        'host' => env('REDIS_CACHE_HOST', $host),
+                        'username' => $username,
+                        'password' => $password,
+                        'port' => $port,
+                        'database' => 0,
+                        'scheme' => $scheme,
+                        'ssl' => $ssl,
+                    ],
+                ],
+            ],
         ];
     }),
 
@@ -0,0 +1,59 @@
+<?php
+
+declare(strict_types=1);
+
+use App\Http\Middleware\LogRequestMetrics;
+use Illuminate\Http\Request;
+use Illuminate\Http\Response;
+use Illuminate\Routing\Route;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Log;
+
+function handleWithMetrics(Request $request): void
+{
+    $middleware = new LogRequestMetrics;
+    $response = $middleware->handle($request, function () {
+        DB::select('select 1');
+        DB::select('select 2');
+
+        return new Response('ok');
+    });
+    $middleware->terminate($request, $response);
+}
+
+it('logs site, route, status and query count after the response', function () {
+    config(['app.observability.request_metrics.site' => 'daynews']);
+    Log::spy();
+
+    $request = Request::create('/articles/city-council-vote');
+    $request->setRouteResolver(fn () => (new Route('GET', 'articles/{slug}', fn () => null))->name('daynews.articles.show'));
+
+    handleWithMetrics($request);
+
+    Log::shouldHaveReceived('info')->once()->withArgs(fn (string $message, array $context) => $message === 'request'
+        && $context['site'] === 'daynews'
+        && $context['route'] === 'daynews.articles.show'
+        && $context['status'] === 200
+        && $context['db_queries'] === 2
+        && is_float($context['duration_ms'])
+        && is_float($context['memory_peak_mb']));
+});
+
+it('uses the URI pattern for unnamed routes', function () {
+    Log::spy();
+
+    $request = Request::create('/events/42');
+    $request->setRouteResolver(fn () => new Route('GET', 'events/{event}', fn () => null));
+
+    handleWithMetrics($request);
+
+    Log::shouldHaveReceived('info')->once()->withArgs(fn (string $message, array $context) => $context['route'] === 'events/{event}');
+});
+
+it('skips load balancer health checks', function () {
+    Log::spy();
+
+    handleWithMetrics(Request::create('/healthcheck'));
+
+    Log::shouldNotHaveReceived('info');
+});